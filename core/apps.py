@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # branche les signaux (invalidation des caches)
+        from core import signals  # noqa: F401
+        # disponibilité de FTS5 lue une fois, hors du chemin des requêtes (vues asynchrones)
+        from core.search import sqlite_has_fts5
+        sqlite_has_fts5()
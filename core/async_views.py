@@ -0,0 +1,118 @@
+# core/async_views.py
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotAuthenticated
+from core import membership
+from core.fast_json import FastJSONRenderer
+from core.views import CommentViewSet, IssueViewSet, ProjectViewSet
+from users.authentication import StatelessJWTAuthentication
+
+
+class AsyncReadView:
+    """
+    Variante asynchrone (ASGI) de list / retrieve d'un viewset de core, sans passage
+    par sync_to_async : authentification JWT, projets de l'utilisateur, pagination et
+    lecture des objets par l'ORM asynchrone (aiterator, acount, aget).
+
+    Le queryset, le serializer et les permissions restent ceux du viewset : une fois
+    les projets de l'utilisateur chargés, les permissions ne lisent plus la base et
+    la réponse JSON est identique à celle de la route synchrone. Ni ETag ni cache de
+    réponses : ces routes servent les lectures concurrentes des clients lents.
+    """
+    renderer = FastJSONRenderer()
+
+    def __init__(self, viewset_class, action):
+        self.viewset_class = viewset_class
+        self.action = action
+
+    def get_view(self, request, kwargs):
+        view = self.viewset_class(
+            action_map={"get": self.action, "head": self.action}, args=(), kwargs=kwargs, format_kwarg=None,
+            headers={}
+        )
+        # authentificateurs du viewset : même en-tête WWW-Authenticate en cas de 401
+        view.request = view.initialize_request(request)
+        return view
+
+    async def authenticate(self, request):
+        authenticator = StatelessJWTAuthentication()
+        result = await authenticator.aauthenticate(request._request)
+        # équivalent de Request._authenticate : successful_authenticator ne relance rien
+        if result is None:
+            request._authenticator = None
+            request.user, request.auth = AnonymousUser(), None
+        else:
+            request._authenticator = authenticator
+            request.user, request.auth = result
+
+    async def check_permissions(self, request, view):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        if not request.user.is_superuser:
+            # mémorisés sur la requête : les permissions du viewset ne lisent plus la base
+            await membership.aget_project_ids(request)
+        view.check_permissions(request)
+
+    async def get_object(self, request, view, queryset):
+        model = queryset.model
+        try:
+            obj = await queryset.aget(pk=view.kwargs["pk"])
+        except model.DoesNotExist:
+            raise Http404(f"No {model._meta.object_name} matches the given query.")
+        except (TypeError, ValueError, ValidationError):
+            # comme rest_framework.generics.get_object_or_404
+            raise Http404
+        view.check_object_permissions(request, obj)
+        return obj
+
+    async def get_data(self, request, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        if self.action == "retrieve":
+            return view.get_serializer(await self.get_object(request, view, queryset)).data
+        paginator = view.paginator
+        rows = view.get_row_serializer()
+        if rows is not None:
+            # rendu rapide (core.fast_lists), comme la route synchrone
+            page = await paginator.apaginate_queryset(rows.get_queryset(queryset), request, view=view)
+            return paginator.get_paginated_response(rows.to_representation(page)).data
+        page = await paginator.apaginate_queryset(queryset, request, view=view)
+        return paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+    def render(self, data, status_code, headers=()):
+        response = HttpResponse(self.renderer.render(data), content_type="application/json", status=status_code)
+        for header, value in headers:
+            response[header] = value
+        return response
+
+    async def __call__(self, request, **kwargs):
+        view = self.get_view(request, kwargs)
+        request = view.request
+        try:
+            await self.authenticate(request)
+            await self.check_permissions(request, view)
+            return self.render(await self.get_data(request, view), 200)
+        except (APIException, Http404) as exc:
+            # même corps et mêmes en-têtes (WWW-Authenticate) que la route synchrone
+            response = view.handle_exception(exc)
+            headers = [(header, value) for header, value in response.items() if header != "Content-Type"]
+            return self.render(response.data, response.status_code, headers)
+
+
+def async_view(viewset_class, action):
+    view = AsyncReadView(viewset_class, action)
+
+    @require_safe
+    async def async_read(request, **kwargs):
+        return await view(request, **kwargs)
+
+    return async_read
+
+
+project_list = async_view(ProjectViewSet, "list")
+project_detail = async_view(ProjectViewSet, "retrieve")
+issue_list = async_view(IssueViewSet, "list")
+issue_detail = async_view(IssueViewSet, "retrieve")
+comment_list = async_view(CommentViewSet, "list")
+comment_detail = async_view(CommentViewSet, "retrieve")
@@ -0,0 +1,256 @@
+# core/bulk.py
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from core import membership
+from core.counters import contributor_count, project_updates, update_project
+from core.models import Comment, Contributor, Issue, Project
+from core.serializers import IssueBulkItemSerializer, IssueListSerializer
+from users.authentication import get_full_user
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+
+def get_bulk_max_items():
+    return getattr(settings, "SOFTDESK_BULK_MAX_ITEMS", 5000)
+
+
+def read_items(data):
+    """Corps d'une requête en masse : une liste non vide, bornée par SOFTDESK_BULK_MAX_ITEMS."""
+    if not isinstance(data, list) or not data:
+        raise ValidationError("Expected a non-empty list.")
+    max_items = get_bulk_max_items()
+    if len(data) > max_items:
+        raise ValidationError(f"At most {max_items} items per request.")
+    return data
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BulkIssueMixin:
+    """
+    /projects/{project_pk}/issues/bulk/ : création (POST), mise à jour (PATCH) et
+    suppression (DELETE) d'un lot d'issues en une transaction, avec un résultat
+    par élément. Les assignees sont validés en une seule requête.
+    """
+
+    def get_bulk_contributors(self, project_id, items):
+        # utilisateurs du lot qui sont contributeurs du projet : {user_id: User}
+        user_ids = {as_int(item.get("assignee")) for item in items if isinstance(item, dict)}
+        user_ids.discard(None)
+        if not user_ids:
+            return {}
+        contributors = Contributor.objects.filter(project_id=project_id, user_id__in=user_ids).select_related("user")
+        return {contributor.user_id: contributor.user for contributor in contributors}
+
+    def get_bulk_issues(self, project_id, ids):
+        ids = {as_int(issue_id) for issue_id in ids}
+        ids.discard(None)
+        return Issue.objects.filter(project_id=project_id, id__in=ids).select_related("author", "assignee").in_bulk()
+
+    def can_write_issue(self, issue):
+        user = self.request.user
+        return user.is_superuser or issue.author_id == user.id
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request, project_pk=None):
+        if request.method == "POST":
+            return self.bulk_create(request, project_pk)
+        if request.method == "PATCH":
+            return self.bulk_update(request, project_pk)
+        return self.bulk_destroy(request, project_pk)
+
+    def bulk_create(self, request, project_id):
+        items = read_items(request.data)
+        contributors = self.get_bulk_contributors(project_id, items)
+        context = {**self.get_serializer_context(), "contributors": contributors}
+
+        author = get_full_user(request)
+        issues, errors = [], []
+        for index, item in enumerate(items):
+            serializer = IssueBulkItemSerializer(data=item, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            data = dict(serializer.validated_data)
+            # même règle que perform_create : l'auteur est assigné par défaut
+            assignee_id = data.pop("assignee", None)
+            assignee = contributors[assignee_id] if assignee_id is not None else author
+            issues.append(Issue(project_id=project_id, author=author, assignee=assignee, **data))
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            Issue.objects.bulk_create(issues, batch_size=BATCH_SIZE)
+            # bulk_create n'envoie pas de signaux : version et compteurs du projet
+            update_project(project_id, issues=Counter(issue.status for issue in issues))
+
+        return Response(
+            {"results": IssueListSerializer(issues, many=True, context=context).data},
+            status=status.HTTP_201_CREATED
+        )
+
+    def bulk_update(self, request, project_id):
+        items = read_items(request.data)
+        instances = self.get_bulk_issues(project_id, [item.get("id") for item in items if isinstance(item, dict)])
+        contributors = self.get_bulk_contributors(project_id, items)
+        context = {**self.get_serializer_context(), "contributors": contributors}
+
+        updated, fields, errors = [], set(), []
+        # issues changeant de statut : compteurs du projet
+        statuses = Counter()
+        for index, item in enumerate(items):
+            issue = instances.get(as_int(item.get("id"))) if isinstance(item, dict) else None
+            if issue is None:
+                errors.append({"index": index, "errors": {"id": ["Issue not found for this project."]}})
+                continue
+            if not self.can_write_issue(issue):
+                errors.append({"index": index, "errors": {"detail": "Only the author can update this issue."}})
+                continue
+            serializer = IssueBulkItemSerializer(issue, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            statuses[issue.status] -= 1
+            statuses[serializer.validated_data.get("status", issue.status)] += 1
+            for attr, value in serializer.validated_data.items():
+                if attr == "assignee":
+                    issue.assignee = contributors[value] if value is not None else None
+                else:
+                    setattr(issue, attr, value)
+                fields.add(attr)
+            updated.append(issue)
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if fields:
+                Issue.objects.bulk_update(updated, sorted(fields), batch_size=BATCH_SIZE)
+            update_project(project_id, issues=statuses)
+
+        return Response({"results": IssueListSerializer(updated, many=True, context=context).data})
+
+    def bulk_destroy(self, request, project_id):
+        ids = read_items(request.data)
+        instances = self.get_bulk_issues(project_id, ids)
+
+        errors = []
+        for index, issue_id in enumerate(ids):
+            issue = instances.get(as_int(issue_id))
+            if issue is None:
+                errors.append({"index": index, "errors": {"id": ["Issue not found for this project."]}})
+            elif not self.can_write_issue(issue):
+                errors.append({"index": index, "errors": {"detail": "Only the author can delete this issue."}})
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            # DELETE directs, sans Collector ni signal par ligne : commentaires (seule relation
+            # vers Issue) puis issues, et compteurs du projet en un seul UPDATE.
+            # _raw_delete est une API privée de Django, choisie sciemment : avec .delete(),
+            # issue_deleted ferait un UPDATE du projet par issue (il ne peut pas s'en abstenir
+            # pour un queryset d'issues, cf. la suppression en masse de l'admin) et relirait
+            # après le DELETE les champs différés par only("pk"). Version de Django bornée
+            # dans pyproject.toml ; BulkDestroyTests vérifie la signature à chaque montée.
+            issues = Issue.objects.filter(id__in=instances.keys())
+            Comment.objects.filter(issue_id__in=instances.keys())._raw_delete(issues.db)
+            issues._raw_delete(issues.db)
+            statuses = Counter(issue.status for issue in instances.values())
+            update_project(
+                project_id, issues={value: -n for value, n in statuses.items()},
+                comments=-sum(issue.comment_count for issue in instances.values()),
+            )
+
+        deleted = sorted(instances.keys())
+        return Response(
+            {"detail": f"{len(deleted)} issue(s) deleted from project (id={project_id}).", "deleted": deleted},
+            status=status.HTTP_200_OK
+        )
+
+
+class BulkContributorMixin:
+    """
+    /projects/{project_pk}/contributors/bulk/ : ajout (POST) et retrait (DELETE)
+    d'une liste d'ids d'utilisateurs, en une requête de lecture pour tout le lot.
+    """
+
+    def read_user_ids(self, data):
+        user_ids = [as_int(user_id) for user_id in read_items(data)]
+        if None in user_ids:
+            raise ValidationError("Expected a list of user ids.")
+        return list(dict.fromkeys(user_ids))
+
+    @action(detail=False, methods=["post", "delete"], url_path="bulk")
+    def bulk(self, request, project_pk=None):
+        if request.method == "POST":
+            return self.bulk_create(request, project_pk)
+        return self.bulk_destroy(request, project_pk)
+
+    def bulk_create(self, request, project_id):
+        user_ids = self.read_user_ids(request.data)
+        # utilisateurs existants et appartenance au projet, en une seule requête
+        users = dict(
+            User.objects.filter(id__in=user_ids)
+            .annotate(is_member=Exists(Contributor.objects.filter(project_id=project_id, user_id=OuterRef("pk"))))
+            .values_list("id", "is_member")
+        )
+        added = [user_id for user_id in user_ids if users.get(user_id) is False]
+
+        with transaction.atomic():
+            Contributor.objects.bulk_create(
+                [Contributor(project_id=project_id, user_id=user_id) for user_id in added],
+                batch_size=BATCH_SIZE, ignore_conflicts=True
+            )
+            # bulk_create n'envoie pas de signaux ; une ligne ajoutée entre-temps par une autre
+            # requête est ignorée (ignore_conflicts) : le compteur est recompté, pas incrémenté
+            if added:
+                Project.objects.filter(pk=project_id).update(
+                    **project_updates(), contributor_count=contributor_count()
+                )
+        for user_id in added:
+            membership.invalidate_user(user_id)
+
+        return Response(
+            {
+                "added": added,
+                "already_contributors": [user_id for user_id in user_ids if users.get(user_id) is True],
+                "unknown_users": [user_id for user_id in user_ids if user_id not in users],
+            },
+            status=status.HTTP_201_CREATED if added else status.HTTP_200_OK
+        )
+
+    def bulk_destroy(self, request, project_id):
+        user_ids = self.read_user_ids(request.data)
+        author_id = Project.objects.filter(pk=project_id).values_list("author_id", flat=True).first()
+        if author_id in user_ids:
+            raise PermissionDenied("You cannot remove the project's author from contributors.")
+
+        contributors = Contributor.objects.filter(project_id=project_id, user_id__in=user_ids)
+        with transaction.atomic():
+            removed = set(contributors.values_list("user_id", flat=True))
+            contributors.delete()
+
+        return Response(
+            {
+                "removed": [user_id for user_id in user_ids if user_id in removed],
+                "not_contributors": [user_id for user_id in user_ids if user_id not in removed],
+            },
+            status=status.HTTP_200_OK
+        )
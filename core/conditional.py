@@ -0,0 +1,121 @@
+# core/conditional.py
+import hashlib
+
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from core import membership
+from core.models import Project
+from core.timing import phase
+
+
+def bump_project_version(project_id):
+    """Invalide les ETags d'un projet : toute écriture sur ses ressources change la version."""
+    Project.objects.filter(pk=project_id).update(version=F("version") + 1)
+
+
+def get_project_version(project_id):
+    return Project.objects.filter(pk=project_id).values_list("version", flat=True).first()
+
+
+# attribut posé sur la requête lorsqu'un filtre lit son utilisateur (cf. request_user_id)
+USER_READ_ATTR = "_softdesk_reads_user"
+
+
+def request_user_id(request):
+    """
+    id de l'utilisateur de la requête, pour un filtre dont le résultat dépend de lui
+    (?assignee=me) : sans déclaration de la vue (depends_on_user), la réponse n'est
+    alors ni mise en cache ni servie avec un ETag.
+    """
+    setattr(getattr(request, "_request", request), USER_READ_ATTR, True)
+    return request.user.id
+
+
+def reads_user(request):
+    return getattr(getattr(request, "_request", request), USER_READ_ATTR, False)
+
+
+class ProjectVersionMixin:
+    """
+    Version du projet de la ressource demandée, lue au plus une fois par requête,
+    et contrôle d'accès minimal à ce projet avant de servir une réponse sans queryset.
+    """
+    project_kwarg = "project_pk"
+
+    def get_version_project_id(self):
+        try:
+            return int(self.kwargs.get(self.project_kwarg))
+        except (TypeError, ValueError):
+            return None
+
+    def get_project_version(self):
+        if not hasattr(self, "_project_version"):
+            project_id = self.get_version_project_id()
+            with phase(self.request, "queryset"):
+                self._project_version = get_project_version(project_id) if project_id is not None else None
+        return self._project_version
+
+    def depends_on_user(self, request):
+        """Réponse propre à l'utilisateur de la requête (filtre relatif à lui) : ETag et cache par utilisateur."""
+        return False
+
+    def get_scope(self, request):
+        # même réponse pour tous les contributeurs, sauf déclaration contraire de la vue
+        if self.depends_on_user(request):
+            return f"user{request.user.id}"
+        return "superuser" if request.user.is_superuser else "contributor"
+
+    def matches_scope(self, request):
+        # un filtre a lu l'utilisateur sans que la vue l'ait déclaré : réponse propre à lui
+        return self.depends_on_user(request) or not reads_user(request)
+
+    def can_read_project(self, request):
+        # ne rien révéler du projet à un non-contributeur (le 403 / 404 viendra ensuite)
+        project_id = self.get_version_project_id()
+        if project_id is None:
+            return False
+        with phase(request, "perm"):
+            return request.user.is_superuser or membership.is_contributor(request, project_id)
+
+
+class ConditionalGetMixin(ProjectVersionMixin):
+    """
+    GET conditionnel sur les ressources d'un projet.
+
+    L'ETag est dérivé de la version du projet (une lecture par clé primaire) et de
+    l'URL demandée : un `If-None-Match` correspondant renvoie 304 sans exécuter
+    le queryset ni le serializer.
+    """
+    etag_actions = ("list", "retrieve")
+
+    def get_etag(self, request):
+        if self.action not in self.etag_actions or not self.can_read_project(request):
+            return None
+        version = self.get_project_version()
+        if version is None:
+            return None
+        key = "|".join((
+            str(self.get_version_project_id()), str(version), self.get_scope(request), request.get_full_path(),
+            request.accepted_media_type,
+        ))
+        return quote_etag(hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200 and self.matches_scope(request):
+            response["ETag"] = etag
+            # le client doit revalider à chaque fois, sans cache partagé
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
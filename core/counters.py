@@ -0,0 +1,107 @@
+# core/counters.py
+"""
+Compteurs dénormalisés : issues par statut, contributeurs et commentaires d'un projet,
+commentaires d'une issue.
+
+Ils varient par UPDATE ... F(), dans la requête qui incrémente la version du projet
+(signaux de core.signals, écritures en masse de core.bulk, import_softdesk), et ne
+sont jamais réécrits par save(). Une écriture qui contourne ces chemins (SQL brut,
+QuerySet.update) les fausse : la commande recount les recalcule.
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from core.models import Comment, Contributor, Issue, Project
+
+
+def project_updates(issues=None, contributors=0, comments=0):
+    """Affectations d'un UPDATE de projet : version + 1 et variations des compteurs."""
+    updates = {"version": F("version") + 1}
+    for status, delta in (issues or {}).items():
+        if delta:
+            field = Project.ISSUE_COUNT_FIELDS[status]
+            updates[field] = F(field) + delta
+    if contributors:
+        updates["contributor_count"] = F("contributor_count") + contributors
+    if comments:
+        updates["comment_count"] = F("comment_count") + comments
+    return updates
+
+
+def update_project(project_id, issues=None, contributors=0, comments=0):
+    Project.objects.filter(pk=project_id).update(**project_updates(issues, contributors, comments))
+
+
+def update_issue_comment_counts(deltas):
+    """deltas : {id d'issue: variation} ; une requête par variation distincte."""
+    issue_ids = defaultdict(list)
+    for issue_id, delta in deltas.items():
+        if delta:
+            issue_ids[delta].append(issue_id)
+    for delta, ids in issue_ids.items():
+        Issue.objects.filter(pk__in=ids).update(comment_count=F("comment_count") + delta)
+
+
+# --- recomptage --------------------------------------------------------------
+
+def count(queryset, key):
+    # COUNT(*) corrélé ; sans ligne, la sous-requête ne renvoie rien (NULL)
+    return Coalesce(Subquery(queryset.order_by().values(key).annotate(n=Count("*")).values("n")), 0)
+
+
+def contributor_count(contributor_model=Contributor):
+    return count(contributor_model.objects.filter(project_id=OuterRef("pk")), "project_id")
+
+
+def project_counts(issue_model=Issue, contributor_model=Contributor, comment_model=Comment):
+    """Expressions des compteurs d'un projet (modèles historiques possibles, cf. migration 0010)."""
+    counts = {
+        field: count(issue_model.objects.filter(project_id=OuterRef("pk"), status=status), "project_id")
+        for status, field in Project.ISSUE_COUNT_FIELDS.items()
+    }
+    counts["contributor_count"] = contributor_count(contributor_model)
+    comments = comment_model.objects.filter(issue__project_id=OuterRef("pk"))
+    counts["comment_count"] = count(comments, "issue__project_id")
+    return counts
+
+
+def issue_counts(comment_model=Comment):
+    return {"comment_count": count(comment_model.objects.filter(issue_id=OuterRef("pk")), "issue_id")}
+
+
+def drifted(queryset, counts):
+    """Lignes du queryset dont un compteur diffère de son recomptage."""
+    expected = {f"expected_{field}": expression for field, expression in counts.items()}
+    return queryset.alias(**expected).filter(
+        reduce(or_, [~Q(**{field: F(f"expected_{field}")}) for field in counts])
+    )
+
+
+def recount(project_ids=None, batch_size=500):
+    """Recompte projets et issues par paquets de projets : (projets corrigés, issues corrigées)."""
+    projects = Project.objects.order_by("pk").values_list("pk", flat=True)
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    fixed_projects = fixed_issues = 0
+    last = 0
+    while True:
+        batch = list(projects.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return fixed_projects, fixed_issues
+        last = batch[-1]
+        with transaction.atomic():
+            issues = drifted(Issue.objects.filter(project_id__in=batch), issue_counts())
+            touched = set(issues.values_list("project_id", flat=True).distinct())
+            fixed_issues += issues.update(**issue_counts())
+            counts = drifted(Project.objects.filter(pk__in=batch), project_counts())
+            fixed = set(counts.values_list("pk", flat=True))
+            if fixed:
+                Project.objects.filter(pk__in=fixed).update(**project_counts())
+            # les réponses en cache contiennent les compteurs : nouvelle version
+            if touched | fixed:
+                Project.objects.filter(pk__in=touched | fixed).update(version=F("version") + 1)
+        fixed_projects += len(fixed)
@@ -0,0 +1,150 @@
+# core/export.py
+import csv
+import json
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from core import fast_json
+from core.models import Comment, Issue
+
+CSV_COLUMNS = (
+    "record", "id", "issue_id", "title", "description", "tag", "priority", "status",
+    "author_id", "author", "assignee_id", "assignee", "created_time",
+)
+USER_COLUMNS = ("author_id", "author__username")
+
+
+def get_export_chunk_size():
+    return getattr(settings, "SOFTDESK_EXPORT_CHUNK_SIZE", 500)
+
+
+def format_datetime(value):
+    # même format que les réponses de l'API (2024-01-01T12:00:00Z)
+    return JSONEncoder().default(value)
+
+
+def user_data(user_id, user):
+    if user_id is None:
+        return None
+    return {"id": user_id, "username": user.username}
+
+
+def issue_data(issue):
+    return {
+        "id": issue.id,
+        "title": issue.title,
+        "description": issue.description,
+        "tag": issue.tag,
+        "priority": issue.priority,
+        "status": issue.status,
+        "author": user_data(issue.author_id, issue.author),
+        "assignee": user_data(issue.assignee_id, issue.assignee),
+        "created_time": issue.created_time,
+        "comments": [
+            {
+                "id": comment.id,
+                "description": comment.description,
+                "author": user_data(comment.author_id, comment.author),
+                "created_time": comment.created_time,
+            }
+            for comment in issue.comments.all()
+        ],
+    }
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : writerow renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Une issue (et ses commentaires) par ligne JSON."""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def dumps(self, data):
+        content = fast_json.dumps(data)
+        if content is not None:
+            return content + b"\n"
+        data = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+        # comme JSONRenderer : U+2028 / U+2029 échappés, une ligne reste une ligne
+        return data.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029") + "\n"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # réponses d'erreur (403, 404…) : un seul objet
+        return "" if data is None else self.dumps(data)
+
+    def stream(self, issues):
+        for issue in issues:
+            yield self.dumps(issue_data(issue))
+
+
+class CSVRenderer(BaseRenderer):
+    """Une ligne par issue puis une par commentaire (colonne record), à plat."""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return ""
+        writer = csv.writer(Echo())
+        return writer.writerow(data.keys()) + writer.writerow(data.values())
+
+    def stream(self, issues):
+        writer = csv.writer(Echo())
+        yield writer.writerow(CSV_COLUMNS)
+        for issue in issues:
+            yield writer.writerow((
+                "issue", issue.id, issue.id, issue.title, issue.description, issue.tag, issue.priority,
+                issue.status, issue.author_id, issue.author.username, issue.assignee_id,
+                issue.assignee.username if issue.assignee_id is not None else "",
+                format_datetime(issue.created_time),
+            ))
+            for comment in issue.comments.all():
+                yield writer.writerow((
+                    "comment", comment.id, issue.id, "", comment.description, "", "", "",
+                    comment.author_id, comment.author.username, "", "", format_datetime(comment.created_time),
+                ))
+
+
+class ProjectExportMixin:
+    """
+    /projects/{pk}/export/?format=ndjson|csv : issues du projet avec leurs commentaires,
+    auteurs et assignees, envoyées au fil de l'eau (StreamingHttpResponse). Les issues
+    sont lues par paquets de SOFTDESK_EXPORT_CHUNK_SIZE, commentaires préchargés paquet
+    par paquet : la mémoire utilisée ne dépend pas de la taille du projet.
+    """
+
+    def get_export_queryset(self, project):
+        comments = Comment.objects.select_related("author").only(
+            "id", "description", "issue_id", "created_time", *USER_COLUMNS
+        ).order_by("created_time", "id")
+        return (
+            Issue.objects.filter(project_id=project.id)
+            .select_related("author", "assignee")
+            .only(
+                "id", "title", "description", "tag", "priority", "status", "created_time",
+                *USER_COLUMNS, "assignee_id", "assignee__username",
+            )
+            .prefetch_related(Prefetch("comments", queryset=comments))
+            .order_by("created_time", "id")
+        )
+
+    @action(detail=True, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None):
+        # contrôle d'accès du détail (IsProjectContributor)
+        project = self.get_object()
+        issues = self.get_export_queryset(project).iterator(chunk_size=get_export_chunk_size())
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(issues), content_type=f"{renderer.media_type}; charset={renderer.charset}"
+        )
+        response["Content-Disposition"] = f'attachment; filename="project-{project.id}.{renderer.format}"'
+        return response
@@ -0,0 +1,86 @@
+# core/fast_json.py
+"""
+Rendu et lecture JSON par orjson (extra "orjson"), à l'identique de JSONRenderer et
+JSONParser de DRF : mêmes octets, mêmes valeurs lues, mêmes erreurs.
+
+orjson écrit les dates, les UUID et les Decimal par l'encodeur de DRF (default), et
+encode le reste en UTF-8, comme UNICODE_JSON. Ce qu'il rend ou lit autrement passe par
+json (stdlib), comme sans orjson : types qu'il refuse, entiers hors 64 bits, flottants
+écrits sous une autre forme (1e16 au lieu de 1e+16, 0.00001 au lieu de 1e-05).
+Seule différence : NaN et infinis, refusés par STRICT_JSON, sont écrits null.
+"""
+import codecs
+import re
+from io import BytesIO
+
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# flottants qu'orjson écrit autrement que json : exposant (1e16, 2.5e-7) ou moins de
+# 1e-4 (0.00001). Les motifs commencent par un littéral, plus rapide à chercher ; une
+# chaîne qui leur ressemble renvoie simplement vers json.
+EXPONENTS = re.compile(rb"e(?<=\de)-?\d+(?![^,\]}])")
+SMALL_FLOATS = re.compile(rb"0\.0000(?<![^:,\[-]0\.0000)")
+# entier d'au moins 19 chiffres, qu'orjson lirait comme un flottant
+LONG_INTEGERS = re.compile(rb"\d{19}")
+
+ENCODER = JSONEncoder()
+
+
+def dumps(data):
+    """JSON compact en UTF-8, comme JSONRenderer ; None quand orjson ne garantit pas les mêmes octets."""
+    if orjson is None:
+        return None
+    try:
+        content = orjson.dumps(data, default=ENCODER.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    except orjson.JSONEncodeError:
+        return None
+    if EXPONENTS.search(content) or SMALL_FLOATS.search(content):
+        return None
+    # comme JSONRenderer : U+2028 / U+2029 échappés
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+def loads(content):
+    """Document JSON lu par orjson ; None quand json (stdlib) doit le lire."""
+    if orjson is None or LONG_INTEGERS.search(content):
+        return None
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer servi par orjson lorsque la réponse est compacte (sans indent=)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is not None and self.compact and not self.ensure_ascii and (
+            self.get_indent(accepted_media_type, renderer_context or {}) is None
+        ):
+            content = dumps(data)
+            if content is not None:
+                return content
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser servi par orjson pour les corps UTF-8."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = get_encoding(parser_context or {})
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        data = loads(content)
+        if data is None:
+            # même résultat, ou même ParseError, que JSONParser
+            return super().parse(BytesIO(content), media_type, parser_context)
+        return data
@@ -0,0 +1,189 @@
+# core/fast_lists.py
+"""
+Rendu rapide, en lecture seule, des listes de projets, d'issues et de commentaires.
+
+Au lieu d'instancier un modèle puis de passer chaque champ du serializer DRF,
+les lignes sont lues par values_list() (noms d'utilisateurs par jointure) et
+transformées en dicts par une fonction compilée une fois par forme de réponse
+(?fields= / ?expand=). La réponse est identique, octet pour octet, à celle des
+serializers de core.serializers, dont elle reprend l'ordre des champs.
+
+Activé par SOFTDESK_FAST_LISTS["ENABLED"], pour les viewsets qui déclarent un
+row_serializer_class ; les autres actions et ce qui n'est pas déclaré passent par DRF.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.fields import DateTimeField
+from rest_framework.response import Response
+from core.serializers import CommentListSerializer, IssueListSerializer, ProjectListSerializer
+from core.shaping import is_expanded, requested_fields
+
+
+def is_enabled():
+    return getattr(settings, "SOFTDESK_FAST_LISTS", {}).get("ENABLED", False)
+
+
+# --- champs ------------------------------------------------------------------
+# Chaque champ déclare les colonnes qu'il lit et la fonction qui le rend à partir
+# d'une ligne, connaissant les positions de ces colonnes dans la ligne.
+
+class Column:
+    """Valeur rendue telle quelle (texte, choix, entier, clé étrangère non développée)."""
+
+    def __init__(self, column):
+        self.column = column
+
+    def get_columns(self, expanded):
+        return (self.column,)
+
+    def get_getter(self, positions, expanded):
+        return itemgetter(positions[0])
+
+
+class DateTimeColumn(Column):
+    # même format que serializers.DateTimeField (DATETIME_FORMAT, fuseau courant)
+    def get_getter(self, positions, expanded):
+        to_representation = DateTimeField().to_representation
+        position = positions[0]
+        return lambda row: to_representation(row[position])
+
+
+class UUIDColumn(Column):
+    def get_getter(self, positions, expanded):
+        position = positions[0]
+        return lambda row: str(row[position])
+
+
+class UserColumn:
+    """Utilisateur lié : {"id", "username"} développé, son id sinon (cf. author_data)."""
+
+    def __init__(self, name, null=False):
+        self.name = name
+        self.null = null
+
+    def get_columns(self, expanded):
+        if expanded:
+            return (f"{self.name}_id", f"{self.name}__username")
+        return (f"{self.name}_id",)
+
+    def get_getter(self, positions, expanded):
+        if not expanded:
+            return itemgetter(positions[0])
+        user_id, username = positions
+        if self.null:
+            return lambda row: None if row[user_id] is None else {"id": row[user_id], "username": row[username]}
+        return lambda row: {"id": row[user_id], "username": row[username]}
+
+
+class RowSerializer:
+    """
+    Équivalent compilé d'un serializer de liste : fields associe chaque champ lisible
+    de serializer_class à sa déclaration. Les lignes commencent toujours par pk et
+    created_time, lus par la pagination par curseur (core.pagination).
+    """
+    serializer_class = None
+    fields = {}
+    _compiled = {}
+
+    @classmethod
+    def get_field_names(cls):
+        if "field_names" not in cls.__dict__:
+            names = [name for name, field in cls.serializer_class().fields.items() if not field.write_only]
+            missing = set(names) - cls.fields.keys()
+            if missing:
+                raise ImproperlyConfigured(f"{cls.__name__} does not declare {', '.join(sorted(missing))}.")
+            cls.field_names = names
+        return cls.field_names
+
+    @classmethod
+    def compile(cls, names, expanded):
+        key = (cls, names, expanded)
+        if key not in cls._compiled:
+            columns = ["pk", "created_time"]
+            for name in names:
+                columns.extend(
+                    column for column in cls.fields[name].get_columns(name in expanded) if column not in columns
+                )
+            index = {column: i for i, column in enumerate(columns)}
+            getters = []
+            for name in names:
+                field = cls.fields[name]
+                positions = [index[column] for column in field.get_columns(name in expanded)]
+                getters.append((name, field.get_getter(positions, name in expanded)))
+
+            def build(rows):
+                return [{name: get(row) for name, get in getters} for row in rows]
+
+            cls._compiled[key] = (tuple(columns), build)
+        return cls._compiled[key]
+
+    def __init__(self, request):
+        wanted = requested_fields(request)
+        names = tuple(name for name in self.get_field_names() if wanted is None or name in wanted)
+        expanded = frozenset(name for name in names if is_expanded(request, name))
+        self.columns, self.build = self.compile(names, expanded)
+
+    def get_queryset(self, queryset):
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, rows):
+        return self.build(rows)
+
+
+class ProjectRowSerializer(RowSerializer):
+    serializer_class = ProjectListSerializer
+    fields = {
+        "id": Column("pk"),
+        "title": Column("title"),
+        "description": Column("description"),
+        "type": Column("type"),
+        "author": UserColumn("author"),
+        "created_time": DateTimeColumn("created_time"),
+    }
+
+
+class IssueRowSerializer(RowSerializer):
+    serializer_class = IssueListSerializer
+    fields = {
+        "id": Column("pk"),
+        "title": Column("title"),
+        "tag": Column("tag"),
+        "priority": Column("priority"),
+        "status": Column("status"),
+        "author": UserColumn("author"),
+        "assignee": UserColumn("assignee", null=True),
+        "created_time": DateTimeColumn("created_time"),
+        "comment_count": Column("comment_count"),
+    }
+
+
+class CommentRowSerializer(RowSerializer):
+    serializer_class = CommentListSerializer
+    fields = {
+        "id": UUIDColumn("pk"),
+        "description": Column("description"),
+        "author": UserColumn("author"),
+        "created_time": DateTimeColumn("created_time"),
+    }
+
+
+class FastListMixin:
+    """Action list servie par row_serializer_class lorsque SOFTDESK_FAST_LISTS est activé."""
+    row_serializer_class = None
+
+    def get_row_serializer(self):
+        if self.action != "list" or self.row_serializer_class is None or not is_enabled():
+            return None
+        return self.row_serializer_class(self.request)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_row_serializer()
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+        queryset = rows.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page))
+        return Response(rows.to_representation(queryset))
@@ -0,0 +1,123 @@
+# core/filters.py
+"""
+Filtres et tri de la liste des issues d'un projet :
+
+- ?status=TODO,IN_PROGRESS (ou ?status=open), ?priority=HIGH, ?tag=BUG : une ou plusieurs valeurs ;
+- ?assignee=me, ?assignee=<id> ou ?assignee=none ;
+- ?created_after=2024-01-01 (ou date et heure ISO 8601) : créées à partir de cette date ;
+- ?ordering=-priority (HIGH d'abord) ou ?ordering=priority, puis du plus récent au plus ancien.
+
+Chaque combinaison courante a son index (cf. Issue.Meta.indexes) ; une valeur
+invalide renvoie une erreur 400.
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from core.conditional import request_user_id
+from core.models import Issue
+
+ORDERING_PARAM = "ordering"
+ORDERINGS = {
+    "priority": ("priority_rank", "-created_time", "-id"),
+    "-priority": ("-priority_rank", "-created_time", "-id"),
+}
+OPEN = "open"
+
+
+def _read_choices(request, name, choices):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    values = {item.strip().upper() for item in value.split(",") if item.strip()}
+    if not values or values - {choice for choice, _ in choices}:
+        raise ValidationError({name: [f'"{value}" is not a valid choice.']})
+    return [choice for choice, _ in choices if choice in values]
+
+
+def get_statuses(request):
+    value = request.query_params.get("status")
+    if value is not None and value.strip().lower() == OPEN:
+        return list(Issue.OPEN_STATUSES)
+    return _read_choices(request, "status", Issue.STATUSES)
+
+
+# valeurs de paramètres relatives à l'utilisateur de la requête
+USER_RELATIVE_PARAMS = {"assignee": ("me",)}
+
+
+def is_user_relative(request):
+    """Vrai si la liste filtrée dépend de l'utilisateur (?assignee=me)."""
+    return any(
+        (request.query_params.get(name) or "").strip().lower() in values
+        for name, values in USER_RELATIVE_PARAMS.items()
+    )
+
+
+def get_assignee(request):
+    """id de l'assignee demandé, None pour ?assignee=none ; False sans filtre."""
+    value = request.query_params.get("assignee")
+    if value is None:
+        return False
+    value = value.strip().lower()
+    if value == "me":
+        return request_user_id(request)
+    if value == "none":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({"assignee": ["Expected \"me\", \"none\" or a user id."]})
+
+
+def get_created_after(request):
+    value = request.query_params.get("created_after")
+    if value is None:
+        return None
+    try:
+        moment = parse_datetime(value.strip())
+        if moment is None:
+            day = parse_date(value.strip())
+            moment = datetime.combine(day, time.min) if day is not None else None
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError({"created_after": ["Expected an ISO 8601 date or date and time."]})
+    # sans fuseau : fuseau du projet (TIME_ZONE)
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+def get_ordering(request):
+    value = request.query_params.get(ORDERING_PARAM)
+    if value is None:
+        return None
+    if value.strip() not in ORDERINGS:
+        raise ValidationError({ORDERING_PARAM: [f"Expected one of {', '.join(ORDERINGS)}."]})
+    return ORDERINGS[value.strip()]
+
+
+def filter_issues(queryset, request):
+    statuses = get_statuses(request)
+    if statuses is not None and set(statuses) == set(Issue.OPEN_STATUSES):
+        # condition de l'index partiel issue_open_priority_idx
+        queryset = queryset.filter(is_open=True)
+    elif statuses is not None:
+        queryset = queryset.filter(status__in=statuses)
+    priorities = _read_choices(request, "priority", Issue.PRIORITIES)
+    if priorities is not None:
+        # rang plutôt que libellé : préfixe de issue_open_priority_idx
+        queryset = queryset.filter(priority_rank__in=[Issue.PRIORITY_RANKS[value] for value in priorities])
+    tags = _read_choices(request, "tag", Issue.TAGS)
+    if tags is not None:
+        queryset = queryset.filter(tag__in=tags)
+    assignee = get_assignee(request)
+    if assignee is not False:
+        queryset = queryset.filter(assignee_id=assignee)
+    created_after = get_created_after(request)
+    if created_after is not None:
+        queryset = queryset.filter(created_time__gte=created_after)
+    ordering = get_ordering(request)
+    if ordering is not None:
+        queryset = queryset.order_by(*ordering)
+    return queryset
@@ -0,0 +1,161 @@
+# core/importer.py
+"""
+Lecture et validation des lignes NDJSON de la commande import_softdesk.
+
+Ce module n'utilise ni l'ORM ni les settings : les lignes peuvent être analysées
+dans des processus séparés (--workers) sans configurer Django. Les choix et
+longueurs autorisés sont transmis par la commande (cf. get_schema).
+
+Une ligne est un objet JSON dont "record" vaut "project", "issue" ou "comment" ;
+sans "record", c'est une issue (format de /api/projects/{id}/export/).
+"""
+import json
+from datetime import datetime, timezone
+
+RECORDS = ("project", "issue", "comment")
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RecordError(ValueError):
+    pass
+
+
+def get_username(value, name, required=True):
+    # "alice" ou {"id": 1, "username": "alice"} (format de l'export)
+    if isinstance(value, dict):
+        value = value.get("username")
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or not value:
+        raise RecordError(f"{name}: expected a username.")
+    return value
+
+
+def get_text(data, name, max_length, required=True, default=""):
+    value = data.get(name)
+    if value is None:
+        if required:
+            raise RecordError(f"{name}: this field is required.")
+        return default
+    if not isinstance(value, str):
+        raise RecordError(f"{name}: expected a string.")
+    if required and not value:
+        raise RecordError(f"{name}: this field may not be blank.")
+    if len(value) > max_length:
+        raise RecordError(f"{name}: at most {max_length} characters.")
+    return value
+
+
+def get_choice(data, name, choices, default=None):
+    value = data.get(name, default)
+    if value not in choices:
+        raise RecordError(f"{name}: {value!r} is not a valid choice.")
+    return value
+
+
+def get_source_id(data, name, required=True):
+    value = data.get(name)
+    if value is None and not required:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int)) or value == "":
+        raise RecordError(f"{name}: expected an id.")
+    value = str(value)
+    if len(value) > 64:
+        raise RecordError(f"{name}: at most 64 characters.")
+    return value
+
+
+def get_created_time(data, earliest=None):
+    value = data.get("created_time")
+    if value is None:
+        return None
+    try:
+        value = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise RecordError("created_time: expected an ISO 8601 date and time.")
+    # heure sans fuseau : UTC, comme TIME_ZONE
+    value = value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    if earliest is not None and value < earliest:
+        raise RecordError(f"created_time: expected a date from {earliest.date().isoformat()}.")
+    return value
+
+
+def parse_comment(data, schema, issue=None):
+    return {
+        "record": "comment",
+        "issue": issue if issue is not None else get_source_id(data, "issue"),
+        "description": get_text(data, "description", schema["text_length"]),
+        "author": get_username(data.get("author"), "author"),
+        # la clé UUIDv7 du commentaire (core.uuids) est tirée de sa date
+        "created_time": get_created_time(data, earliest=UNIX_EPOCH),
+    }
+
+
+def parse_issue(data, schema):
+    source_id = get_source_id(data, "id")
+    comments = data.get("comments") or []
+    if not isinstance(comments, list) or not all(isinstance(comment, dict) for comment in comments):
+        raise RecordError("comments: expected a list of objects.")
+    return {
+        "record": "issue",
+        "id": source_id,
+        # sans "project" : projet cible de --project
+        "project": get_source_id(data, "project", required=False),
+        "title": get_text(data, "title", schema["title_length"]),
+        "description": get_text(data, "description", schema["text_length"], required=False),
+        "tag": get_choice(data, "tag", schema["tags"]),
+        "priority": get_choice(data, "priority", schema["priorities"]),
+        "status": get_choice(data, "status", schema["statuses"], default="TODO"),
+        "author": get_username(data.get("author"), "author"),
+        "assignee": get_username(data.get("assignee"), "assignee", required=False),
+        "created_time": get_created_time(data),
+        "comments": [parse_comment(comment, schema, issue=source_id) for comment in comments],
+    }
+
+
+def parse_project(data, schema):
+    contributors = data.get("contributors") or []
+    if not isinstance(contributors, list):
+        raise RecordError("contributors: expected a list of usernames.")
+    return {
+        "record": "project",
+        "id": get_source_id(data, "id"),
+        "title": get_text(data, "title", schema["title_length"]),
+        "description": get_text(data, "description", schema["text_length"], required=False),
+        "type": get_choice(data, "type", schema["project_types"]),
+        "author": get_username(data.get("author"), "author"),
+        "contributors": [get_username(username, "contributors") for username in contributors],
+        "created_time": get_created_time(data),
+    }
+
+
+PARSERS = {"project": parse_project, "issue": parse_issue, "comment": parse_comment}
+
+
+def parse_line(line, schema):
+    try:
+        data = json.loads(line)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise RecordError(f"invalid JSON ({exc}).")
+    if not isinstance(data, dict):
+        raise RecordError("expected a JSON object.")
+    record = data.get("record", "issue")
+    if record not in PARSERS:
+        raise RecordError(f"record: {record!r} is not one of {', '.join(RECORDS)}.")
+    return PARSERS[record](data, schema)
+
+
+def parse_lines(lines, first_line, schema):
+    """
+    Analyse un paquet de lignes (bytes) : liste de (numéro de ligne, enregistrement, erreur),
+    les lignes vides étant ignorées. Exécutée telle quelle dans les processus du pool.
+    """
+    results = []
+    for number, line in enumerate(lines, start=first_line):
+        if not line.strip():
+            continue
+        try:
+            results.append((number, parse_line(line, schema), None))
+        except RecordError as exc:
+            results.append((number, None, str(exc)))
+    return results
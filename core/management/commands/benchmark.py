@@ -0,0 +1,787 @@
+# core/management/commands/benchmark.py
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import uuid
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.apps.registry import Apps
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models import Count
+from django.http import QueryDict
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment
+)
+from django.test import AsyncClient
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from users.authentication import VersionedRefreshToken
+from core import fast_json
+from core.counters import recount
+from core.fast_json import FastJSONRenderer
+from core.models import Comment, Contributor, Issue, Project
+from core.search import search_comments, search_issues
+from core.uuids import uuid7
+from core.views import CommentViewSet, IssueViewSet, ProjectViewSet
+from users.models import User
+
+BATCH_SIZE = 5000
+PASSWORD = "bench-Password-1"
+# vocabulaire des textes générés : fréquences variées pour la recherche plein texte (?q=)
+WORDS = (
+    "login", "crash", "token", "export", "import", "timeout", "search", "page", "mobile", "api",
+    "cache", "user", "project", "comment", "slow", "error", "button", "layout", "database", "sync",
+)
+
+
+def percentile(values, p):
+    """Percentile au rang le plus proche d'une liste triée."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, round(p / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def route(method, url, body=None, setup=None, admin=False):
+    """Route mesurée : url et body sont des valeurs ou des fabriques recevant l'objet de setup."""
+    return {
+        "method": method,
+        "url": url if callable(url) else lambda _: url,
+        "body": body,
+        "setup": setup,
+        "admin": admin,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique dans une base de test, appelle chaque route "
+        "de l'API via le client de test DRF et produit un rapport JSON (latences p50/p95/p99, "
+        "requêtes SQL et octets par réponse) comparable d'un commit à l'autre."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--projects", type=int, default=20)
+        parser.add_argument("--issues", type=int, default=2000)
+        parser.add_argument("--comments", type=int, default=10000)
+        parser.add_argument("--contributors-per-project", type=int, default=10)
+        parser.add_argument("--iterations", type=int, default=30, help="Requêtes mesurées par route.")
+        parser.add_argument("--routes", help="Liste de routes à mesurer, séparées par des virgules.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Fichier JSON du rapport (sortie standard par défaut).")
+        parser.add_argument("--compare", help="Rapport précédent : signale les régressions.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Hausse relative du p95 tolérée avant de signaler une régression."
+        )
+        parser.add_argument("--explain", action="store_true", help="Ajoute les plans des requêtes principales.")
+        parser.add_argument("--keepdb", action="store_true", help="Conserve la base de test entre deux exécutions.")
+        parser.add_argument(
+            "--concurrency", type=int, default=0,
+            help="Nombre de clients simultanés d'une charge mixte lectures / écritures (0 : désactivé)."
+        )
+        parser.add_argument("--concurrency-requests", type=int, default=100, help="Requêtes par client simultané.")
+        parser.add_argument(
+            "--registrations", type=int, default=0,
+            help="Inscriptions envoyées aux routes synchrone et asynchrone par --concurrency clients (8 par défaut)."
+        )
+        parser.add_argument(
+            "--asgi-clients", type=int, default=0,
+            help="Clients simultanés des lectures synchrones puis asynchrones (/api/async/), "
+                 "--concurrency-requests requêtes chacun (0 : désactivé)."
+        )
+        parser.add_argument(
+            "--serializer-rows", type=int, default=0,
+            help="Lignes de liste rendues par les serializers DRF puis par core.fast_lists, et encodées "
+                 "par JSONRenderer puis FastJSONRenderer (0 : désactivé)."
+        )
+        parser.add_argument(
+            "--insert-rows", type=int, default=0,
+            help="Lignes insérées dans deux tables de commentaires, clés UUID4 puis UUIDv7 (0 : désactivé)."
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        setup_test_environment(debug=False)
+        on_disk = (
+            options["concurrency"] or options["registrations"] or options["asgi_clients"] or options["insert_rows"]
+        )
+        if on_disk and connection.vendor == "sqlite" and not connection.settings_dict["TEST"]["NAME"]:
+            # base de test sur disque : WAL, verrous et cache de pages n'ont pas cours en mémoire
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                tempfile.gettempdir(), "softdesk-benchmark.sqlite3"
+            )
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options["keepdb"], aliases={"default"})
+        try:
+            started = time.perf_counter()
+            if not Project.objects.exists():
+                self.seed(options)
+            self.stderr.write(f"Seed: {time.perf_counter() - started:.1f}s")
+            self.context = self.build_context()
+            report = {"meta": self.get_meta(options), "routes": self.run_routes(options)}
+            if options["explain"]:
+                report["plans"] = self.explain()
+            if options["concurrency"]:
+                report["concurrency"] = self.run_concurrency(options["concurrency"], options["concurrency_requests"])
+            if options["registrations"]:
+                report["registrations"] = self.run_registrations(options["concurrency"] or 8, options["registrations"])
+            if options["asgi_clients"]:
+                report["asgi"] = self.run_asgi(options["asgi_clients"], options["concurrency_requests"])
+            if options["serializer_rows"]:
+                report["serializers"] = self.run_serializers(options["serializer_rows"], options["iterations"])
+            if options["insert_rows"]:
+                report["inserts"] = self.run_inserts(options["insert_rows"])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            self.compare(report, options["compare"], options["threshold"])
+
+    # --- données -------------------------------------------------------------
+
+    def seed(self, options):
+        rnd = self.random
+        password = make_password(PASSWORD)
+        birthday = date(1990, 1, 1)
+        User.objects.bulk_create(
+            (User(username=f"user{i:06d}", password=password, birthday=birthday) for i in range(options["users"])),
+            batch_size=BATCH_SIZE
+        )
+        user_ids = list(User.objects.values_list("id", flat=True))
+
+        projects = Project.objects.bulk_create(
+            [
+                Project(
+                    title=f"Project {i}", description="Synthetic project", type="BE",
+                    author_id=rnd.choice(user_ids)
+                )
+                for i in range(options["projects"])
+            ],
+            batch_size=BATCH_SIZE
+        )
+        members = {}
+        contributors = []
+        for project in projects:
+            others = rnd.sample(user_ids, min(len(user_ids), options["contributors_per_project"]))
+            members[project.id] = list(dict.fromkeys([project.author_id, *others]))
+            contributors.extend(Contributor(project_id=project.id, user_id=user_id) for user_id in members[project.id])
+        Contributor.objects.bulk_create(contributors, batch_size=BATCH_SIZE)
+
+        project_ids = list(members)
+        tags = [tag for tag, _ in Issue.TAGS]
+        priorities = [priority for priority, _ in Issue.PRIORITIES]
+        statuses = [status for status, _ in Issue.STATUSES]
+        issue_ids, issue_projects = array("q"), array("q")
+        for start in range(0, options["issues"], BATCH_SIZE):
+            batch = []
+            for i in range(start, min(start + BATCH_SIZE, options["issues"])):
+                project_id = rnd.choice(project_ids)
+                batch.append(Issue(
+                    title=f"Issue {i} {rnd.choice(WORDS)}", description=" ".join(rnd.choices(WORDS, k=16)),
+                    tag=rnd.choice(tags),
+                    priority=rnd.choice(priorities), status=rnd.choice(statuses), project_id=project_id,
+                    author_id=rnd.choice(members[project_id]), assignee_id=rnd.choice(members[project_id]),
+                ))
+            for issue in Issue.objects.bulk_create(batch):
+                issue_ids.append(issue.id)
+                issue_projects.append(issue.project_id)
+
+        for start in range(0, options["comments"], BATCH_SIZE):
+            batch = []
+            for _ in range(start, min(start + BATCH_SIZE, options["comments"])):
+                index = rnd.randrange(len(issue_ids))
+                batch.append(Comment(
+                    description=" ".join(rnd.choices(WORDS, k=8)), issue_id=issue_ids[index],
+                    author_id=rnd.choice(members[issue_projects[index]]),
+                ))
+            Comment.objects.bulk_create(batch)
+        # bulk_create n'envoie pas de signaux : compteurs dénormalisés
+        recount()
+
+    def build_context(self):
+        # projet le plus fourni, son issue la plus commentée, et son auteur comme client
+        project = Project.objects.annotate(n=Count("issues")).order_by("-n").first()
+        issue = Issue.objects.filter(project=project).annotate(n=Count("comments")).order_by("-n").first()
+        user = User.objects.get(pk=project.author_id)
+        other = Contributor.objects.filter(project=project).exclude(user=user).select_related("user").first()
+        admin = User.objects.filter(username="bench-admin").first() or User.objects.create_superuser(
+            username="bench-admin", password=PASSWORD, birthday=date(1990, 1, 1)
+        )
+        refresh = VersionedRefreshToken.for_user(user)
+        return {
+            "access": str(refresh.access_token),
+            "client": self.get_client(refresh.access_token),
+            "admin_client": self.get_client(VersionedRefreshToken.for_user(admin).access_token),
+            "user": user, "refresh": str(refresh), "project": project, "issue": issue,
+            "own_issues": list(
+                Issue.objects.filter(project=project, author=user).values_list("id", flat=True)[:100]
+            ),
+            "comment": Comment.objects.filter(issue=issue).first(), "contributor": other,
+            # cibles des mises à jour : seul l'auteur peut modifier une issue ou un commentaire
+            "own_issue": Issue.objects.filter(project=project, author=user).first() or Issue.objects.create(
+                title="Bench", tag="BUG", priority="LOW", project=project, author=user
+            ),
+            "own_comment": Comment.objects.filter(issue=issue, author=user).first() or Comment.objects.create(
+                description="Bench", issue=issue, author=user
+            ),
+            "outsider": User.objects.exclude(contributions__project=project).first(),
+        }
+
+    def get_client(self, access_token):
+        # authentification JWT réelle, comme un client de l'API
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        return client
+
+    # --- routes --------------------------------------------------------------
+
+    def get_routes(self):
+        ctx = self.context
+        rnd = self.random
+        p, i = ctx["project"].id, ctx["issue"].id
+        issues = f"/api/projects/{p}/issues/"
+        comments = f"{issues}{i}/comments/"
+        user_id = ctx["user"].id
+
+        def new_issue():
+            return Issue.objects.create(title="tmp", tag="BUG", priority="LOW", project_id=p, author=ctx["user"])
+
+        def new_comment():
+            return Comment.objects.create(description="tmp", issue_id=i, author=ctx["user"])
+
+        def new_project():
+            project = Project.objects.create(title="tmp", type="BE", author=ctx["user"])
+            Contributor.objects.create(project=project, user=ctx["user"])
+            return project
+
+        def outsider_contributor():
+            Contributor.objects.filter(project_id=p, user=ctx["outsider"]).delete()
+            return ctx["outsider"]
+
+        def new_outsider_contributor():
+            return Contributor.objects.get_or_create(project_id=p, user=ctx["outsider"])[0]
+
+        def new_user():
+            return User.objects.create(username=f"tmp{rnd.getrandbits(48)}", birthday=date(1990, 1, 1))
+
+        issue_body = {"title": "Bench", "tag": "BUG", "priority": "LOW", "description": "x", "comments": []}
+        users = f"/api/users/{user_id}/"
+        # les fabriques d'URL et de corps reçoivent l'objet préparé (non mesuré) pour
+        # l'itération par setup (objet à supprimer, utilisateur à ajouter), ou None
+        return {
+            "auth.register": route("post", "/api/auth/register/", lambda _: {
+                "username": f"bench{rnd.getrandbits(48)}", "password": PASSWORD, "birthday": "1990-01-01"
+            }),
+            "auth.token": route("post", "/api/auth/token/", lambda _: {
+                "username": ctx["user"].username, "password": PASSWORD
+            }),
+            "auth.token_refresh": route("post", "/api/auth/token/refresh/", lambda _: {"refresh": ctx["refresh"]}),
+            "metrics": route("get", "/api/metrics/", admin=True),
+            "projects.list": route("get", "/api/projects/"),
+            "projects.create": route("post", "/api/projects/", lambda _: {
+                "title": "Bench", "type": "BE", "issues": [], "contributors": []
+            }),
+            "projects.retrieve": route("get", f"/api/projects/{p}/"),
+            "projects.counts": route("get", f"/api/projects/{p}/?fields=issue_counts,contributor_count,comment_count"),
+            "projects.partial_update": route("patch", f"/api/projects/{p}/", lambda _: {"title": "Bench"}),
+            "projects.destroy": route("delete", lambda obj: f"/api/projects/{obj.id}/", setup=new_project),
+            "projects.export": route("get", f"/api/projects/{p}/export/"),
+            "projects.export_csv": route("get", f"/api/projects/{p}/export/?format=csv"),
+            "contributors.list": route("get", f"/api/projects/{p}/contributors/"),
+            "contributors.retrieve": route("get", f"/api/projects/{p}/contributors/{ctx['contributor'].id}/"),
+            "contributors.create": route(
+                "post", f"/api/projects/{p}/contributors/", lambda user: {"user": user.id},
+                setup=outsider_contributor
+            ),
+            "contributors.destroy": route(
+                "delete", lambda obj: f"/api/projects/{p}/contributors/{obj.id}/", setup=new_outsider_contributor
+            ),
+            "contributors.bulk_create": route(
+                "post", f"/api/projects/{p}/contributors/bulk/", lambda user: [user.id], setup=outsider_contributor
+            ),
+            "contributors.bulk_destroy": route(
+                "delete", f"/api/projects/{p}/contributors/bulk/", lambda obj: [obj.user_id],
+                setup=new_outsider_contributor
+            ),
+            "issues.list": route("get", issues),
+            "issues.list_deep_offset": route("get", f"{issues}?offset=1000000"),
+            "issues.list_cursor": route("get", f"{issues}?pagination=cursor"),
+            "issues.list_fields": route("get", f"{issues}?fields=id,status&expand="),
+            "issues.search": route("get", f"{issues}?q=crash"),
+            "issues.search_terms": route("get", f"{issues}?q=login%20time"),
+            "issues.board": route("get", f"{issues}?status=open&ordering=-priority"),
+            "issues.assigned": route("get", f"{issues}?assignee=me"),
+            "issues.create": route("post", issues, lambda _: issue_body),
+            "issues.retrieve": route("get", f"{issues}{i}/"),
+            "issues.partial_update": route("patch", f"{issues}{ctx['own_issue'].id}/", lambda _: {"title": "Bench"}),
+            "issues.destroy": route("delete", lambda obj: f"{issues}{obj.id}/", setup=new_issue),
+            "issues.bulk_create": route("post", f"{issues}bulk/", lambda _: [issue_body] * 100),
+            "issues.bulk_update": route("patch", f"{issues}bulk/", lambda _: [
+                {"id": issue_id, "status": "IN_PROGRESS"} for issue_id in ctx["own_issues"]
+            ]),
+            "issues.bulk_destroy": route(
+                "delete", f"{issues}bulk/", lambda ids: ids,
+                setup=lambda: [new_issue().id for _ in range(100)]
+            ),
+            "comments.list": route("get", comments),
+            "comments.search": route("get", f"{comments}?q=crash"),
+            "comments.create": route("post", comments, lambda _: {"description": "Bench"}),
+            "comments.retrieve": route("get", f"{comments}{ctx['comment'].id}/"),
+            "comments.partial_update": route(
+                "patch", f"{comments}{ctx['own_comment'].id}/", lambda _: {"description": "Bench"}
+            ),
+            "comments.destroy": route("delete", lambda obj: f"{comments}{obj.id}/", setup=new_comment),
+            "users.list": route("get", "/api/users/"),
+            "users.retrieve": route("get", users),
+            "users.partial_update": route("patch", users, lambda _: {"can_be_contacted": True}),
+            "users.destroy": route("delete", lambda obj: f"/api/users/{obj.id}/", setup=new_user, admin=True),
+            "users.contributions": route("get", f"{users}contributions/"),
+            "users.authored_projects": route("get", f"{users}authored-projects/"),
+            "users.authored_issues": route("get", f"{users}authored-issues/"),
+            "users.assigned_issues": route("get", f"{users}assigned-issues/"),
+            "users.authored_comments": route("get", f"{users}authored-comments/"),
+        }
+
+    def run_routes(self, options):
+        routes = self.get_routes()
+        if options["routes"]:
+            selected = set(options["routes"].split(","))
+            unknown = selected - set(routes)
+            if unknown:
+                raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}")
+            routes = {name: route for name, route in routes.items() if name in selected}
+
+        results = {}
+        for name, spec in routes.items():
+            client = self.context["admin_client" if spec["admin"] else "client"]
+            method = spec["method"]
+            latencies, queries, sizes, statuses = [], [], [], set()
+            # une itération de chauffe, non mesurée
+            for iteration in range(options["iterations"] + 1):
+                obj = spec["setup"]() if spec["setup"] else None
+                data = spec["body"](obj) if spec["body"] else None
+                url = spec["url"](obj)
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, data, format="json" if data is not None else None)
+                    # réponse en flux (export) : lue jusqu'au bout, requêtes comprises
+                    content = b"".join(response.streaming_content) if response.streaming else response.content
+                    elapsed = (time.perf_counter() - started) * 1000
+                if iteration == 0:
+                    continue
+                latencies.append(elapsed)
+                queries.append(len(captured.captured_queries))
+                sizes.append(len(content))
+                statuses.add(response.status_code)
+            latencies.sort()
+            results[name] = {
+                "method": method.upper(),
+                "status": sorted(statuses),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "queries": max(queries),
+                "bytes": max(sizes),
+            }
+            self.stderr.write(
+                f"{name:28} p50={results[name]['p50_ms']:8.2f}ms p95={results[name]['p95_ms']:8.2f}ms "
+                f"queries={results[name]['queries']:3} bytes={results[name]['bytes']}"
+            )
+        return results
+
+    def run_concurrency(self, threads, requests):
+        """
+        Charge mixte (trois lectures pour une écriture) envoyée par `threads` clients
+        simultanés, chacun avec sa connexion : débit et erreurs (« database is locked »).
+        """
+        ctx = self.context
+        issues = f"/api/projects/{ctx['project'].id}/issues/"
+        urls = [issues, f"/api/projects/{ctx['project'].id}/", issues]
+        comments = f"{issues}{ctx['issue'].id}/comments/"
+
+        def worker(_):
+            client = self.get_client(ctx["access"])
+            statuses = Counter()
+            try:
+                for n in range(requests):
+                    try:
+                        if n % 4 == 3:
+                            response = client.post(comments, {"description": "Bench"}, format="json")
+                        else:
+                            response = client.get(urls[n % 4])
+                        statuses[str(response.status_code)] += 1
+                    except DatabaseError:
+                        statuses["error"] += 1
+            finally:
+                connection.close()
+            return statuses
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = sum(executor.map(worker, range(threads)), Counter())
+        elapsed = time.perf_counter() - started
+        total = threads * requests
+        result = {
+            "threads": threads,
+            "requests": total,
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(total / elapsed, 1),
+            "status": dict(sorted(statuses.items())),
+            "database": {
+                key: connection.settings_dict.get(key) for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")
+            },
+        }
+        self.stderr.write(
+            f"concurrency: {threads} threads, {result['requests_per_second']} req/s, status={result['status']}"
+        )
+        return result
+
+    def run_registrations(self, clients, count):
+        """Inscriptions par seconde : RegisterView depuis des threads, puis la route asynchrone."""
+        def body():
+            return {"username": f"signup{self.random.getrandbits(48)}", "password": PASSWORD, "birthday": "1990-01-01"}
+
+        def register(_):
+            client = APIClient()
+            try:
+                return client.post("/api/auth/register/", body(), format="json").status_code
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            sync_statuses = Counter(map(str, executor.map(register, range(count))))
+        sync_elapsed = time.perf_counter() - started
+
+        async def register_all():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(clients)
+
+            async def register_one():
+                async with semaphore:
+                    response = await client.post(
+                        "/api/async/auth/register/", body(), content_type="application/json"
+                    )
+                    return str(response.status_code)
+
+            return Counter(await asyncio.gather(*(register_one() for _ in range(count))))
+
+        started = time.perf_counter()
+        async_statuses = asyncio.run(register_all())
+        async_elapsed = time.perf_counter() - started
+
+        result = {
+            "clients": clients,
+            "registrations": count,
+            "hasher": get_hasher().algorithm,
+            "sync": {"per_second": round(count / sync_elapsed, 1), "status": dict(sync_statuses)},
+            "async": {"per_second": round(count / async_elapsed, 1), "status": dict(async_statuses)},
+        }
+        self.stderr.write(
+            f"registrations: sync {result['sync']['per_second']}/s, async {result['async']['per_second']}/s "
+            f"({clients} clients, {result['hasher']})"
+        )
+        return result
+
+    def run_asgi(self, clients, requests):
+        """
+        Lectures servies par les vues synchrones (un thread par client) puis par les vues
+        asynchrones de core.async_views (clients simultanés sur une seule boucle).
+        """
+        ctx = self.context
+        issues = f"projects/{ctx['project'].id}/issues/"
+        paths = {
+            "projects.retrieve": f"projects/{ctx['project'].id}/",
+            "issues.list": issues,
+            "comments.list": f"{issues}{ctx['issue'].id}/comments/",
+        }
+        headers = {"Authorization": f"Bearer {ctx['access']}"}
+        total = clients * requests
+
+        def summary(durations, statuses, elapsed):
+            durations.sort()
+            return {
+                "requests_per_second": round(total / elapsed, 1),
+                "p50_ms": round(percentile(durations, 50) * 1000, 2),
+                "p95_ms": round(percentile(durations, 95) * 1000, 2),
+                "status": dict(sorted(statuses.items())),
+            }
+
+        def run_sync(url):
+            def worker(_):
+                client = APIClient()
+                durations, statuses = [], Counter()
+                try:
+                    for _ in range(requests):
+                        started = time.perf_counter()
+                        response = client.get(url, headers=headers)
+                        durations.append(time.perf_counter() - started)
+                        statuses[str(response.status_code)] += 1
+                finally:
+                    connection.close()
+                return durations, statuses
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                results = list(executor.map(worker, range(clients)))
+            elapsed = time.perf_counter() - started
+            return summary(
+                [d for durations, _ in results for d in durations], sum((s for _, s in results), Counter()), elapsed
+            )
+
+        async def run_async(url):
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(clients)
+            durations = []
+
+            async def get():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(url, headers=headers)
+                    durations.append(time.perf_counter() - started)
+                    return str(response.status_code)
+
+            started = time.perf_counter()
+            statuses = Counter(await asyncio.gather(*(get() for _ in range(total))))
+            return summary(durations, statuses, time.perf_counter() - started)
+
+        result = {"clients": clients, "requests": total, "routes": {}}
+        for name, path in paths.items():
+            sync, asynchronous = run_sync(f"/api/{path}"), asyncio.run(run_async(f"/api/async/{path}"))
+            result["routes"][name] = {"sync": sync, "async": asynchronous}
+            self.stderr.write(
+                f"asgi {name}: sync {sync['requests_per_second']} req/s (p95 {sync['p95_ms']}ms), "
+                f"async {asynchronous['requests_per_second']} req/s (p95 {asynchronous['p95_ms']}ms)"
+            )
+        return result
+
+    def run_serializers(self, rows, iterations):
+        """
+        Lignes rendues par seconde, lecture comprise ou non, par le serializer de liste du
+        viewset puis par son row_serializer_class, sur le même queryset ; puis lignes encodées
+        par seconde par JSONRenderer (json) et FastJSONRenderer (orjson s'il est installé).
+        """
+        ctx = self.context
+        p, i = ctx["project"].id, ctx["issue"].id
+        lists = {
+            "projects.list": (ProjectViewSet, {}, ""),
+            "issues.list": (IssueViewSet, {"project_pk": p}, "expand=author,assignee"),
+            "comments.list": (CommentViewSet, {"project_pk": p, "issue_pk": i}, ""),
+        }
+        renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        def measure(fetch, render):
+            best_total = best_render = float("inf")
+            for _ in range(iterations):
+                started = time.perf_counter()
+                fetched = fetch()
+                rendered = time.perf_counter()
+                data = render(fetched)
+                ended = time.perf_counter()
+                best_total = min(best_total, ended - started)
+                best_render = min(best_render, ended - rendered)
+            return data, len(fetched), best_total, best_render
+
+        result = {"rows": rows, "orjson": fast_json.orjson is not None, "lists": {}}
+        for name, (viewset_class, kwargs, query) in lists.items():
+            view = viewset_class(action_map={"get": "list"}, args=(), kwargs=kwargs, format_kwarg=None)
+            view.request = view.initialize_request(APIRequestFactory().get("/", QueryDict(query)))
+            view.request.user = ctx["user"]
+            queryset = view.filter_queryset(view.get_queryset())[:rows]
+            row_serializer = view.row_serializer_class(view.request)
+            generic = measure(lambda: list(queryset.all()), lambda page: view.get_serializer(page, many=True).data)
+            fast = measure(
+                lambda: list(row_serializer.get_queryset(queryset)), row_serializer.to_representation
+            )
+            stdlib = measure(lambda: generic[0], renderer.render)
+            encoded = measure(lambda: generic[0], fast_renderer.render)
+            count = generic[1]
+            result["lists"][name] = entry = {
+                "rows": count,
+                "identical": renderer.render(generic[0]) == renderer.render(fast[0]),
+                "json": {
+                    "identical": stdlib[0] == encoded[0],
+                    "bytes": len(stdlib[0]),
+                    "stdlib_rows_per_second": round(count / stdlib[3]) if stdlib[3] else None,
+                    "fast_rows_per_second": round(count / encoded[3]) if encoded[3] else None,
+                },
+            }
+            for key, (_, _, total, render) in (("generic", generic), ("fast", fast)):
+                entry[key] = {
+                    "rows_per_second": round(count / total) if total else None,
+                    "render_rows_per_second": round(count / render) if render else None,
+                }
+            self.stderr.write(
+                f"serializers {name} ({count} rows): generic {entry['generic']['rows_per_second']} rows/s, "
+                f"fast {entry['fast']['rows_per_second']} rows/s, identical {entry['identical']}; "
+                f"json {entry['json']['stdlib_rows_per_second']} rows/s, "
+                f"fast json {entry['json']['fast_rows_per_second']} rows/s, identical {entry['json']['identical']}"
+            )
+        return result
+
+    def run_inserts(self, rows):
+        """
+        Insertions par seconde dans deux copies de la table des commentaires (clé primaire
+        et index (issue, -created_time, -id)), l'une à clés UUID4, l'autre à clés UUIDv7
+        (core.uuids), par paquets de BATCH_SIZE lignes ; débit global, débit du dernier
+        dixième et taille.
+        """
+        registry = Apps()
+        result = {"rows": rows}
+        for scheme, make_key in (("uuid4", lambda when: uuid.uuid4()), ("uuid7", uuid7)):
+            model = type(f"BenchmarkComment{scheme.title()}", (models.Model,), {
+                "__module__": __name__,
+                "id": models.UUIDField(primary_key=True),
+                "issue_id": models.BigIntegerField(),
+                "description": models.TextField(),
+                "created_time": models.DateTimeField(),
+                "Meta": type("Meta", (), {
+                    "apps": registry, "app_label": "core", "db_table": f"benchmark_comment_{scheme}",
+                    "indexes": [models.Index(
+                        fields=["issue_id", "-created_time", "-id"], name=f"benchmark_{scheme}_issue_idx"
+                    )],
+                }),
+            })
+            fields = [model._meta.get_field(name) for name in ("id", "issue_id", "description", "created_time")]
+            quote = connection.ops.quote_name
+            sql = "INSERT INTO {} ({}) VALUES ({})".format(
+                quote(model._meta.db_table), ", ".join(quote(field.column) for field in fields),
+                ", ".join(["%s"] * len(fields)),
+            )
+            with connection.schema_editor() as editor:
+                editor.create_model(model)
+            rnd = random.Random(0)
+            now = timezone.now()
+            durations = []
+            try:
+                for start in range(0, rows, BATCH_SIZE):
+                    batch = []
+                    for i in range(start, min(start + BATCH_SIZE, rows)):
+                        when = now + timedelta(microseconds=i * 10)
+                        values = (make_key(when), rnd.randrange(10000), "Bench comment", when)
+                        batch.append([
+                            field.get_db_prep_save(value, connection) for field, value in zip(fields, values)
+                        ])
+                    started = time.perf_counter()
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        cursor.executemany(sql, batch)
+                    durations.append((len(batch), time.perf_counter() - started))
+                size = self.get_table_size(model)
+            finally:
+                with connection.schema_editor() as editor:
+                    editor.delete_model(model)
+            tail = durations[-max(1, len(durations) // 10):]
+            result[scheme] = {
+                "rows_per_second": round(rows / sum(elapsed for _, elapsed in durations)),
+                "last_tenth_rows_per_second": round(sum(n for n, _ in tail) / sum(elapsed for _, elapsed in tail)),
+                "bytes": size,
+            }
+            self.stderr.write(
+                f"inserts {scheme}: {result[scheme]['rows_per_second']} rows/s, "
+                f"last tenth {result[scheme]['last_tenth_rows_per_second']} rows/s, {size} bytes"
+            )
+        return result
+
+    def get_table_size(self, model):
+        """Taille de la table et de ses index ; None si la base ne la donne pas (SQLite sans dbstat)."""
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            try:
+                if connection.vendor == "postgresql":
+                    cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+                elif connection.vendor == "sqlite":
+                    cursor.execute(
+                        "SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN "
+                        "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                        [table, table],
+                    )
+                else:
+                    return None
+            except DatabaseError:
+                return None
+            return cursor.fetchone()[0]
+
+    # --- rapport -------------------------------------------------------------
+
+    def get_meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "scale": {
+                "users": User.objects.count(), "projects": Project.objects.count(),
+                "issues": Issue.objects.count(), "comments": Comment.objects.count(),
+            },
+        }
+
+    def explain(self):
+        ctx = self.context
+        querysets = {
+            "projects.list": (
+                Project.objects.filter(contributors__user=ctx["user"]).order_by("-created_time", "-id")[:10]
+            ),
+            "issues.list": Issue.objects.filter(project=ctx["project"]).order_by("-created_time", "-id")[:10],
+            "comments.list": Comment.objects.filter(issue=ctx["issue"]).order_by("-id")[:10],
+            "issues.board": Issue.objects.filter(project=ctx["project"], is_open=True).order_by(
+                "-priority_rank", "-created_time", "-id"
+            )[:10],
+            "issues.search": search_issues(
+                Issue.objects.filter(project=ctx["project"]), ["crash"], ctx["project"].id
+            )[:10],
+            "comments.search": search_comments(
+                Comment.objects.filter(issue=ctx["issue"]), ["crash"], ctx["issue"].id
+            )[:10],
+            "contributors.list": Contributor.objects.filter(project=ctx["project"])[:10],
+            "users.list": User.objects.all()[:10],
+        }
+        return {name: queryset.explain() for name, queryset in querysets.items()}
+
+    def compare(self, report, path, threshold):
+        with open(path, encoding="utf-8") as file:
+            previous = json.load(file)["routes"]
+        regressions = []
+        for name, current in report["routes"].items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            if current["queries"] > before["queries"]:
+                regressions.append(f"{name}: queries {before['queries']} -> {current['queries']}")
+            if before["p95_ms"] and current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+            if current["bytes"] > before["bytes"]:
+                regressions.append(f"{name}: bytes {before['bytes']} -> {current['bytes']}")
+        for line in regressions:
+            self.stderr.write(self.style.WARNING(line))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {path}.")
+        self.stderr.write(self.style.SUCCESS(f"No regression against {path}."))
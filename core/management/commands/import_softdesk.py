@@ -0,0 +1,336 @@
+# core/management/commands/import_softdesk.py
+import os
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from core import membership
+from core.counters import contributor_count, project_updates, update_issue_comment_counts
+from core.importer import parse_lines
+from core.models import Comment, Contributor, ImportCheckpoint, ImportedRecord, Issue, Project
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def get_schema():
+    """Choix et longueurs des modèles, transmis aux processus qui valident les lignes."""
+    return {
+        "title_length": Issue._meta.get_field("title").max_length,
+        "text_length": Issue._meta.get_field("description").max_length,
+        "project_types": {value for value, _ in Project.PROJECT_TYPES},
+        "tags": {value for value, _ in Issue.TAGS},
+        "priorities": {value for value, _ in Issue.PRIORITIES},
+        "statuses": {value for value, _ in Issue.STATUSES},
+    }
+
+
+def read_chunks(path, offset, line, chunk_size):
+    """Paquets de chunk_size lignes lus depuis offset : (première ligne, lignes, offset de fin)."""
+    with open(path, "rb") as file:
+        file.seek(offset)
+        lines = []
+        for raw in file:
+            lines.append(raw)
+            offset += len(raw)
+            if len(lines) == chunk_size:
+                yield line + 1, lines, offset
+                line += len(lines)
+                lines = []
+        if lines:
+            yield line + 1, lines, offset
+
+
+def restore_created_time(model, rows):
+    """
+    rows : (instance insérée, created_time du fichier ou None). auto_now_add remplace la
+    date du fichier à l'insertion (pre_save) ; bulk_update, qui n'appelle pas pre_save,
+    la réécrit ensuite en un UPDATE par lot, sans modifier la déclaration du champ.
+    """
+    instances = []
+    for instance, created_time in rows:
+        if created_time is not None:
+            instance.created_time = created_time
+            instances.append(instance)
+    model.objects.bulk_update(instances, ["created_time"], batch_size=BATCH_SIZE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des projets, issues et commentaires depuis un fichier NDJSON (une ligne par "
+        "enregistrement, cf. core.importer) : lecture en continu, insertions par bulk_create "
+        "dans une transaction par paquet, reprise au dernier paquet validé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier NDJSON à importer.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Lignes par paquet (et par transaction).")
+        parser.add_argument(
+            "--workers", type=int, default=0,
+            help="Processus analysant et validant les lignes en parallèle (0 : dans le processus courant)."
+        )
+        parser.add_argument(
+            "--project", type=int,
+            help="Projet existant recevant les issues sans \"project\" (lignes de /api/projects/{id}/export/)."
+        )
+        parser.add_argument("--checkpoint", help="Nom du point de reprise (chemin absolu du fichier par défaut).")
+        parser.add_argument(
+            "--reset", action="store_true",
+            help="Oublie le point de reprise et reprend au début du fichier (les données importées restent)."
+        )
+        parser.add_argument(
+            "--max-errors", type=int, default=None,
+            help="Arrête l'import au-delà de ce nombre de lignes rejetées (illimité par défaut)."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"{path}: no such file.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        self.default_project = None
+        if options["project"] is not None:
+            if not Project.objects.filter(pk=options["project"]).exists():
+                raise CommandError(f"Project {options['project']} does not exist.")
+            self.default_project = options["project"]
+
+        name = options["checkpoint"] or os.path.abspath(path)
+        if options["reset"]:
+            ImportCheckpoint.objects.filter(name=name).delete()
+        self.checkpoint, _ = ImportCheckpoint.objects.get_or_create(name=name)
+        if self.checkpoint.offset > os.path.getsize(path):
+            raise CommandError(f"Checkpoint {name!r} is beyond the end of {path}; use --reset.")
+        if self.checkpoint.line:
+            self.stderr.write(f"Resuming {name!r} at line {self.checkpoint.line + 1}.")
+
+        self.counts = Counter(self.checkpoint.counts)
+        self.max_errors = options["max_errors"]
+        self.usernames = {}
+        chunks = read_chunks(path, self.checkpoint.offset, self.checkpoint.line, options["chunk_size"])
+        parse = partial(parse_lines, schema=get_schema())
+
+        started = time.perf_counter()
+        if options["workers"] > 0:
+            with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+                self.import_parallel(executor, parse, chunks, options["workers"])
+        else:
+            for first_line, lines, offset in chunks:
+                self.import_chunk(parse(lines, first_line), first_line + len(lines) - 1, offset)
+        elapsed = time.perf_counter() - started
+
+        summary = ", ".join(f"{kind}: {self.counts[kind]}" for kind in ("projects", "issues", "comments", "errors"))
+        self.stdout.write(self.style.SUCCESS(f"Imported {name!r} in {elapsed:.1f}s ({summary})."))
+
+    def import_parallel(self, executor, parse, chunks, workers):
+        # au plus 2 paquets en attente par processus : la mémoire reste bornée
+        pending = deque()
+        for first_line, lines, offset in chunks:
+            pending.append((executor.submit(parse, lines, first_line), first_line + len(lines) - 1, offset))
+            if len(pending) >= 2 * workers:
+                future, last_line, end = pending.popleft()
+                self.import_chunk(future.result(), last_line, end)
+        while pending:
+            future, last_line, end = pending.popleft()
+            self.import_chunk(future.result(), last_line, end)
+
+    # --- paquets -------------------------------------------------------------
+
+    def reject(self, number, error):
+        self.counts["errors"] += 1
+        self.stderr.write(self.style.WARNING(f"line {number}: {error}"))
+        if self.max_errors is not None and self.counts["errors"] > self.max_errors:
+            raise CommandError(f"More than {self.max_errors} rejected lines, import stopped.")
+
+    def resolve_users(self, records):
+        usernames = set()
+        for _, record in records:
+            usernames.add(record["author"])
+            usernames.update(record.get("contributors", ()))
+            usernames.update(comment["author"] for comment in record.get("comments", ()))
+            if record.get("assignee"):
+                usernames.add(record["assignee"])
+        missing = usernames - self.usernames.keys()
+        if missing:
+            self.usernames.update(User.objects.filter(username__in=missing).values_list("username", "id"))
+
+    def get_user_id(self, username):
+        user_id = self.usernames.get(username)
+        if user_id is None:
+            raise LookupError(f"unknown user {username!r}.")
+        return user_id
+
+    def load_targets(self, kind, source_ids):
+        """ids SoftDesk des enregistrements importés par les paquets précédents."""
+        if not source_ids:
+            return {}
+        return dict(
+            ImportedRecord.objects.filter(checkpoint=self.checkpoint, kind=kind, source_id__in=source_ids)
+            .values_list("source_id", "target_id")
+        )
+
+    def import_chunk(self, results, last_line, offset):
+        records = []
+        for number, record, error in results:
+            if error is not None:
+                self.reject(number, error)
+            else:
+                records.append((number, record))
+
+        with transaction.atomic():
+            self.resolve_users(records)
+            # variations des compteurs du paquet : {projet: Counter(statut)}, {projet: n}, {issue: n}
+            self.issue_deltas = defaultdict(Counter)
+            self.comment_deltas, self.issue_comment_deltas = Counter(), Counter()
+            members = set()
+            projects = self.create_projects([item for item in records if item[1]["record"] == "project"], members)
+            issues = self.create_issues(
+                [item for item in records if item[1]["record"] == "issue"], projects, members
+            )
+            comments = [
+                (number, comment) for number, record in records if record["record"] == "issue"
+                and record["id"] in issues for comment in record["comments"]
+            ]
+            comments += [item for item in records if item[1]["record"] == "comment"]
+            self.create_comments(comments, issues, members)
+
+            # auteurs, assignees et contributeurs listés deviennent contributeurs du projet
+            Contributor.objects.bulk_create(
+                [Contributor(project_id=project_id, user_id=user_id) for project_id, user_id in members],
+                ignore_conflicts=True
+            )
+            # bulk_create n'envoie pas de signaux : ETags, caches et compteurs des projets touchés
+            update_issue_comment_counts(self.issue_comment_deltas)
+            for project_id in {project_id for project_id, _ in members}:
+                # contributeurs existants ignorés (ignore_conflicts) : recomptés
+                Project.objects.filter(pk=project_id).update(
+                    **project_updates(self.issue_deltas[project_id], comments=self.comment_deltas[project_id]),
+                    contributor_count=contributor_count(),
+                )
+
+            self.checkpoint.offset = offset
+            self.checkpoint.line = last_line
+            self.checkpoint.counts = dict(self.counts)
+            self.checkpoint.save(update_fields=["offset", "line", "counts", "updated_time"])
+        # projets des nouveaux contributeurs : oubliés par le cache partagé (core.membership)
+        for user_id in {user_id for _, user_id in members}:
+            membership.invalidate_user(user_id)
+
+        self.stderr.write(
+            f"line {last_line}: {self.counts['projects']} projects, {self.counts['issues']} issues, "
+            f"{self.counts['comments']} comments, {self.counts['errors']} errors"
+        )
+
+    def check_new_ids(self, kind, items):
+        # un id déjà importé (dans ce paquet ou un précédent) est rejeté
+        known = self.load_targets(kind, [record["id"] for _, record in items])
+        accepted = []
+        for number, record in items:
+            if record["id"] in known:
+                self.reject(number, f"{kind} {record['id']!r} already imported.")
+            else:
+                known[record["id"]] = None
+                accepted.append((number, record))
+        return accepted
+
+    def create_projects(self, items, members):
+        """Projets du paquet : {id du fichier: id SoftDesk}."""
+        rows = []
+        for number, record in self.check_new_ids("project", items):
+            try:
+                author_id = self.get_user_id(record["author"])
+                contributor_ids = [self.get_user_id(username) for username in record["contributors"]]
+            except LookupError as exc:
+                self.reject(number, exc)
+                continue
+            project = Project(
+                title=record["title"], description=record["description"], type=record["type"], author_id=author_id,
+            )
+            rows.append((record["id"], project, [author_id, *contributor_ids], record["created_time"]))
+
+        Project.objects.bulk_create([project for _, project, _, _ in rows])
+        restore_created_time(Project, [(project, created_time) for _, project, _, created_time in rows])
+        self.save_targets("project", [(source_id, project.id) for source_id, project, _, _ in rows])
+        for _, project, user_ids, _ in rows:
+            members.update((project.id, user_id) for user_id in user_ids)
+        self.counts["projects"] += len(rows)
+        return {source_id: project.id for source_id, project, _, _ in rows}
+
+    def create_issues(self, items, projects, members):
+        """Issues du paquet : {id du fichier: (id SoftDesk, id du projet)}."""
+        items = self.check_new_ids("issue", items)
+        projects = {
+            **self.load_targets("project", {r["project"] for _, r in items if r["project"] not in projects} - {None}),
+            **projects,
+        }
+        rows = []
+        for number, record in items:
+            project_id = self.default_project if record["project"] is None else projects.get(record["project"])
+            try:
+                if project_id is None:
+                    raise LookupError(f"unknown project {record['project']!r}.")
+                author_id = self.get_user_id(record["author"])
+                assignee_id = self.get_user_id(record["assignee"]) if record["assignee"] else None
+            except LookupError as exc:
+                self.reject(number, exc)
+                continue
+            issue = Issue(
+                title=record["title"], description=record["description"], tag=record["tag"],
+                priority=record["priority"], status=record["status"], project_id=project_id,
+                author_id=author_id, assignee_id=assignee_id,
+            )
+            rows.append((record["id"], issue, record["created_time"]))
+            self.issue_deltas[project_id][issue.status] += 1
+            members.add((project_id, author_id))
+            if assignee_id is not None:
+                members.add((project_id, assignee_id))
+
+        Issue.objects.bulk_create([issue for _, issue, _ in rows])
+        restore_created_time(Issue, [(issue, created_time) for _, issue, created_time in rows])
+        self.save_targets("issue", [(source_id, issue.id) for source_id, issue, _ in rows])
+        self.counts["issues"] += len(rows)
+        return {source_id: (issue.id, issue.project_id) for source_id, issue, _ in rows}
+
+    def create_comments(self, items, issues, members):
+        missing = {record["issue"] for _, record in items} - issues.keys()
+        targets = self.load_targets("issue", missing)
+        projects = dict(Issue.objects.filter(pk__in=targets.values()).values_list("id", "project_id"))
+        issues = {
+            **{source_id: (issue_id, projects[issue_id]) for source_id, issue_id in targets.items()
+               if issue_id in projects},
+            **issues,
+        }
+        comments = []
+        for number, record in items:
+            try:
+                if record["issue"] not in issues:
+                    raise LookupError(f"unknown issue {record['issue']!r}.")
+                author_id = self.get_user_id(record["author"])
+            except LookupError as exc:
+                self.reject(number, exc)
+                continue
+            issue_id, project_id = issues[record["issue"]]
+            comments.append(Comment(
+                description=record["description"], issue_id=issue_id, author_id=author_id,
+                created_time=record["created_time"] or timezone.now(),
+            ))
+            self.comment_deltas[project_id] += 1
+            self.issue_comment_deltas[issue_id] += 1
+            members.add((project_id, author_id))
+
+        Comment.objects.bulk_create(comments)
+        self.counts["comments"] += len(comments)
+
+    def save_targets(self, kind, pairs):
+        ImportedRecord.objects.bulk_create(
+            [
+                ImportedRecord(checkpoint=self.checkpoint, kind=kind, source_id=source_id, target_id=target_id)
+                for source_id, target_id in pairs
+            ]
+        )
@@ -0,0 +1,27 @@
+# core/management/commands/recount.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.counters import recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs dénormalisés des projets (issues par statut, contributeurs, "
+        "commentaires) et des issues (commentaires), par paquets de projets ; seules les lignes "
+        "fausses sont réécrites."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("projects", nargs="*", type=int, help="Projets à recompter (tous par défaut).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Projets recomptés par transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        started = time.perf_counter()
+        projects, issues = recount(options["projects"] or None, options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted in {elapsed:.1f}s: {projects} project(s) and {issues} issue(s) fixed."
+        ))
@@ -0,0 +1,102 @@
+# core/membership.py
+from django.conf import settings
+from core.cache import CacheStats, LRUCache
+from core.models import Contributor
+
+# attribut posé sur la requête pour mémoriser les projets de l'utilisateur
+REQUEST_ATTR = "_softdesk_project_ids"
+
+stats = CacheStats()
+_shared_cache = None
+
+
+def _get_shared_cache():
+    """
+    Renvoie le cache partagé entre les requêtes, ou None s'il est désactivé
+    (réglage SOFTDESK_MEMBERSHIP_CACHE). Propre au processus : invalidate_user n'atteint
+    pas les autres workers, qui se fient à TIMEOUT (cf. softdesk/settings.py).
+    """
+    global _shared_cache
+    config = getattr(settings, "SOFTDESK_MEMBERSHIP_CACHE", None) or {}
+    if not config.get("ENABLED", False):
+        return None
+    if _shared_cache is None:
+        _shared_cache = LRUCache(
+            max_entries=config.get("MAX_ENTRIES", 1024),
+            timeout=config.get("TIMEOUT", 60),
+        )
+    return _shared_cache
+
+
+def _load_cached(request):
+    # projets déjà connus : requête -> cache partagé ; None s'il faut lire la base
+    holder = getattr(request, "_request", request)
+    user_id = request.user.id
+
+    cached = getattr(holder, REQUEST_ATTR, None)
+    if cached is not None and cached[0] == user_id:
+        stats.record_hit()
+        return cached[1]
+
+    shared = _get_shared_cache()
+    project_ids = shared.get(user_id) if shared is not None else None
+    if project_ids is not None:
+        stats.record_hit()
+        setattr(holder, REQUEST_ATTR, (user_id, project_ids))
+    return project_ids
+
+
+def _remember(request, project_ids):
+    stats.record_miss()
+    shared = _get_shared_cache()
+    if shared is not None:
+        shared.set(request.user.id, project_ids)
+    # on stocke sur la HttpRequest sous-jacente pour survivre aux wrappers DRF
+    setattr(getattr(request, "_request", request), REQUEST_ATTR, (request.user.id, project_ids))
+    return project_ids
+
+
+def _project_ids_queryset(request):
+    return Contributor.objects.filter(user_id=request.user.id).values_list("project_id", flat=True)
+
+
+def get_project_ids(request) -> frozenset:
+    """
+    Ensemble des ids de projets dont l'utilisateur de la requête est contributeur.
+    Chargé au plus une fois par requête : requête -> cache partagé -> base de données.
+    """
+    project_ids = _load_cached(request)
+    if project_ids is None:
+        project_ids = _remember(request, frozenset(_project_ids_queryset(request)))
+    return project_ids
+
+
+async def aget_project_ids(request) -> frozenset:
+    """Variante asynchrone de get_project_ids (vues de core.async_views)."""
+    project_ids = _load_cached(request)
+    if project_ids is None:
+        project_ids = _remember(
+            request, frozenset([project_id async for project_id in _project_ids_queryset(request)])
+        )
+    return project_ids
+
+
+def is_contributor(request, project_id) -> bool:
+    try:
+        project_id = int(project_id)
+    except (TypeError, ValueError):
+        return False
+    return project_id in get_project_ids(request)
+
+
+def invalidate_user(user_id):
+    """Oublie les projets mémorisés pour un utilisateur (ajout / retrait de contribution)."""
+    shared = _get_shared_cache()
+    if shared is not None:
+        shared.delete(user_id)
+
+
+def clear():
+    shared = _get_shared_cache()
+    if shared is not None:
+        shared.clear()
@@ -0,0 +1,56 @@
+# core/middleware.py
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from core.timing import TIMER_ATTR, RequestTimer, get_config
+
+logger = logging.getLogger("softdesk.timing")
+slow_logger = logging.getLogger("softdesk.timing.slow")
+
+
+class ServerTimingMiddleware:
+    """
+    Instrumentation des requêtes, activée par SOFTDESK_SERVER_TIMING["ENABLED"] :
+    durée et requêtes SQL (dont les doublons) par phase (cf. core.timing.TimedViewMixin),
+    renvoyées dans l'en-tête Server-Timing et journalisées en JSON sur "softdesk.timing".
+    Les requêtes plus lentes que SLOW_REQUEST_MS sont échantillonnées (SLOW_SAMPLE_RATE)
+    avec la liste de leurs requêtes SQL sur "softdesk.timing.slow".
+    """
+
+    def __init__(self, get_response):
+        config = get_config()
+        if not config.get("ENABLED", False):
+            # retiré de la chaîne des middlewares au démarrage : aucun coût
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = config.get("SLOW_REQUEST_MS", 500)
+        self.slow_sample_rate = config.get("SLOW_SAMPLE_RATE", 1.0)
+        self.max_captured = config.get("MAX_CAPTURED_QUERIES", 200)
+
+    def __call__(self, request):
+        timer = RequestTimer(max_captured=self.max_captured)
+        setattr(request, TIMER_ATTR, timer)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer.record_query))
+            response = self.get_response(request)
+        timer.stop()
+
+        response["Server-Timing"] = timer.header()
+        self.log(request, response, timer)
+        return response
+
+    def log(self, request, response, timer):
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **timer.as_dict(),
+        }
+        logger.info(json.dumps(entry))
+        if entry["total_ms"] >= self.slow_request_ms and random.random() < self.slow_sample_rate:
+            slow_logger.warning(json.dumps({**entry, "sql": timer.queries}))
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+from core.migrations._fts import SQLITE_FTS_DROP, install_sqlite_fts
+
+# PostgreSQL : index GIN sur l'expression exacte des recherches, telle que la compile
+# core.search.get_search_vector (SearchVector pondéré, configuration "simple")
+POSTGRESQL_SCHEMA = [
+    """CREATE INDEX issue_search_idx ON core_issue USING gin ((
+        setweight(to_tsvector('simple'::regconfig, COALESCE(title, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, COALESCE(description, '')), 'B')
+    ))""",
+    """CREATE INDEX comment_search_idx ON core_comment USING gin ((
+        setweight(to_tsvector('simple'::regconfig, COALESCE(description, '')), 'A')
+    ))""",
+]
+
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS issue_search_idx",
+    "DROP INDEX IF EXISTS comment_search_idx",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        install_sqlite_fts(schema_editor)
+    elif connection.vendor == "postgresql":
+        for statement in POSTGRESQL_SCHEMA:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        for statement in SQLITE_FTS_DROP:
+            schema_editor.execute(statement)
+    elif connection.vendor == "postgresql":
+        for statement in POSTGRESQL_DROP:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_import_checkpoint"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
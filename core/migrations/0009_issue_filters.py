@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.migrations._fts import preserving_sqlite_fts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # SQLite reconstruit core_issue pour ajouter (ou retirer) une colonne générée stockée :
+    # les triggers FTS5 disparaissent avec l'ancienne table (cf. core.migrations._fts)
+    operations = preserving_sqlite_fts(
+        migrations.AddField(
+            model_name="issue",
+            name="is_open",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Q(("status__in", ("TODO", "IN_PROGRESS"))),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="priority_rank",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(priority="LOW", then=models.Value(1)),
+                    models.When(priority="MEDIUM", then=models.Value(2)),
+                    models.When(priority="HIGH", then=models.Value(3)),
+                    default=models.Value(0),
+                ),
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "status", "-created_time", "-id"],
+                name="issue_project_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "assignee", "-created_time", "-id"],
+                name="issue_project_assignee_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("is_open", True)),
+                fields=["project", "-priority_rank", "-created_time", "-id"],
+                name="issue_open_priority_idx",
+            ),
+        ),
+    )
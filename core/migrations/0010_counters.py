@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+from core.migrations._fts import preserving_sqlite_fts
+
+
+# recomptage initial, figé (cf. core.counters.issue_counts et project_counts)
+FILL_COUNTERS = [
+    """UPDATE core_issue SET comment_count = (
+        SELECT COUNT(*) FROM core_comment WHERE core_comment.issue_id = core_issue.id
+    )""",
+    """UPDATE core_project SET
+        todo_issue_count = (
+            SELECT COUNT(*) FROM core_issue WHERE core_issue.project_id = core_project.id AND core_issue.status = 'TODO'
+        ),
+        in_progress_issue_count = (
+            SELECT COUNT(*) FROM core_issue
+            WHERE core_issue.project_id = core_project.id AND core_issue.status = 'IN_PROGRESS'
+        ),
+        finished_issue_count = (
+            SELECT COUNT(*) FROM core_issue
+            WHERE core_issue.project_id = core_project.id AND core_issue.status = 'FINISHED'
+        ),
+        contributor_count = (
+            SELECT COUNT(*) FROM core_contributor WHERE core_contributor.project_id = core_project.id
+        ),
+        comment_count = (
+            SELECT COUNT(*) FROM core_comment INNER JOIN core_issue ON core_issue.id = core_comment.issue_id
+            WHERE core_issue.project_id = core_project.id
+        )""",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_issue_filters"),
+    ]
+
+    # SQLite reconstruit core_issue pour ajouter (ou retirer) une colonne NOT NULL :
+    # les triggers FTS5 disparaissent avec l'ancienne table (cf. core.migrations._fts)
+    operations = preserving_sqlite_fts(
+        migrations.AddField(
+            model_name="issue",
+            name="comment_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="comment_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="contributor_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="finished_issue_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="in_progress_issue_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="todo_issue_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(FILL_COUNTERS, migrations.RunSQL.noop),
+    )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:08
+
+import django.utils.timezone
+from django.db import migrations, models
+import core.uuids
+from core.migrations._fts import preserving_sqlite_fts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_counters"),
+    ]
+
+    # SQLite reconstruit core_comment pour modifier ses colonnes : les triggers FTS5
+    # disparaissent avec l'ancienne table (cf. core.migrations._fts) et sont réinstallés.
+    # Les clés existantes sont gardées : seules les nouvelles lignes reçoivent un UUIDv7.
+    operations = preserving_sqlite_fts(
+        migrations.AlterModelOptions(
+            name="comment",
+            options={"ordering": ["-created_time", "-id"]},
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="created_time",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="id",
+            field=core.uuids.TimeOrderedUUIDField(editable=False, primary_key=True, serialize=False),
+        ),
+    )
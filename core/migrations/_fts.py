@@ -0,0 +1,91 @@
+"""
+DDL SQLite FTS5 de la recherche (cf. core.search), partagé par les migrations de core.
+
+Le préfixe "_" écarte ce module du chargeur de migrations. Comme une migration, il est
+figé : il ne lit pas le code courant, et une évolution du schéma FTS5 passe par une
+nouvelle migration (avec son propre DDL), jamais par une modification de ce fichier.
+"""
+from django.db import migrations
+
+SQLITE_FTS_SCHEMA = [
+    # issues : contenu lu dans core_issue (rowid = id) ; project_id est indexé pour
+    # restreindre la recherche au projet dans l'index lui-même
+    """CREATE VIRTUAL TABLE core_issue_fts USING fts5(
+        title, description, project_id, content='core_issue', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER core_issue_fts_insert AFTER INSERT ON core_issue BEGIN
+        INSERT INTO core_issue_fts(rowid, title, description, project_id)
+        VALUES (new.id, new.title, new.description, new.project_id);
+    END""",
+    """CREATE TRIGGER core_issue_fts_delete AFTER DELETE ON core_issue BEGIN
+        INSERT INTO core_issue_fts(core_issue_fts, rowid, title, description, project_id)
+        VALUES ('delete', old.id, old.title, old.description, old.project_id);
+    END""",
+    """CREATE TRIGGER core_issue_fts_update AFTER UPDATE OF title, description, project_id ON core_issue BEGIN
+        INSERT INTO core_issue_fts(core_issue_fts, rowid, title, description, project_id)
+        VALUES ('delete', old.id, old.title, old.description, old.project_id);
+        INSERT INTO core_issue_fts(rowid, title, description, project_id)
+        VALUES (new.id, new.title, new.description, new.project_id);
+    END""",
+    "INSERT INTO core_issue_fts(core_issue_fts) VALUES ('rebuild')",
+    # commentaires : clé UUID, sans rowid stable (VACUUM) ; comment_id est indexé pour
+    # retrouver la ligne à supprimer, issue_id pour restreindre la recherche à l'issue
+    """CREATE VIRTUAL TABLE core_comment_fts USING fts5(
+        description, comment_id, issue_id, tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER core_comment_fts_insert AFTER INSERT ON core_comment BEGIN
+        INSERT INTO core_comment_fts(description, comment_id, issue_id) VALUES (new.description, new.id, new.issue_id);
+    END""",
+    """CREATE TRIGGER core_comment_fts_delete AFTER DELETE ON core_comment BEGIN
+        DELETE FROM core_comment_fts WHERE core_comment_fts MATCH 'comment_id : "' || old.id || '"';
+    END""",
+    """CREATE TRIGGER core_comment_fts_update AFTER UPDATE OF description, id, issue_id ON core_comment BEGIN
+        DELETE FROM core_comment_fts WHERE core_comment_fts MATCH 'comment_id : "' || old.id || '"';
+        INSERT INTO core_comment_fts(description, comment_id, issue_id) VALUES (new.description, new.id, new.issue_id);
+    END""",
+    """INSERT INTO core_comment_fts(description, comment_id, issue_id)
+        SELECT description, id, issue_id FROM core_comment""",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS core_comment_fts_update",
+    "DROP TRIGGER IF EXISTS core_comment_fts_delete",
+    "DROP TRIGGER IF EXISTS core_comment_fts_insert",
+    "DROP TABLE IF EXISTS core_comment_fts",
+    "DROP TRIGGER IF EXISTS core_issue_fts_update",
+    "DROP TRIGGER IF EXISTS core_issue_fts_delete",
+    "DROP TRIGGER IF EXISTS core_issue_fts_insert",
+    "DROP TABLE IF EXISTS core_issue_fts",
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(option == "ENABLE_FTS5" for option, in cursor.fetchall())
+
+
+def install_sqlite_fts(schema_editor):
+    # sans FTS5, la recherche se rabat sur icontains
+    if sqlite_has_fts5(schema_editor.connection):
+        for statement in SQLITE_FTS_DROP + SQLITE_FTS_SCHEMA:
+            schema_editor.execute(statement)
+
+
+def reinstall_sqlite_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        install_sqlite_fts(schema_editor)
+
+
+def preserving_sqlite_fts(*operations):
+    """
+    Encadre des opérations qui reconstruisent core_issue ou core_comment sous SQLite
+    (AddField NOT NULL ou généré, AlterField...) : les triggers FTS5 disparaissent avec
+    l'ancienne table et sont réinstallés après elles, dans les deux sens.
+    """
+    return [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_fts),
+        *operations,
+        migrations.RunPython(reinstall_sqlite_fts, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,30 @@
-import uuid
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from core.uuids import TimeOrderedUUIDField
 
 User = settings.AUTH_USER_MODEL
 
 
-class Project(models.Model):
+class DBMaintainedFieldsMixin:
+    """
+    Les colonnes de DB_MAINTAINED_FIELDS (UPDATE ... F()) ne sont jamais réécrites par save(),
+    pas plus que les champs différés (only / defer), comme dans Model.save.
+    """
+    DB_MAINTAINED_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.name not in self.DB_MAINTAINED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Project(DBMaintainedFieldsMixin, models.Model):
     PROJECT_TYPES = [
         ('BE', 'Back-end'),
         ('FE', 'Front-end'),
@@ -18,9 +37,29 @@ class Project(models.Model):
     type = models.CharField(max_length=20, choices=PROJECT_TYPES)
     author = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name="authored_projects")
     created_time = models.DateTimeField(auto_now_add=True)
+    # incrémentée à chaque écriture sur le projet ou ses ressources (ETags)
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # compteurs dénormalisés, mis à jour avec la version (cf. core.counters)
+    todo_issue_count = models.IntegerField(default=0, editable=False)
+    in_progress_issue_count = models.IntegerField(default=0, editable=False)
+    finished_issue_count = models.IntegerField(default=0, editable=False)
+    contributor_count = models.IntegerField(default=0, editable=False)
+    comment_count = models.IntegerField(default=0, editable=False)
+
+    # compteur d'issues de chaque statut
+    ISSUE_COUNT_FIELDS = {
+        'TODO': "todo_issue_count",
+        'IN_PROGRESS': "in_progress_issue_count",
+        'FINISHED': "finished_issue_count",
+    }
+    # colonnes maintenues en base par des UPDATE ... F() : jamais réécrites par save()
+    DB_MAINTAINED_FIELDS = ("version", *ISSUE_COUNT_FIELDS.values(), "contributor_count", "comment_count")
 
     class Meta:
         ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["-created_time", "-id"], name="project_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -29,20 +68,26 @@ class Project(models.Model):
 class Contributor(models.Model):
 
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name="contributions")
-    project = models.ForeignKey('core.Project', on_delete=models.CASCADE, related_name="contributors")
+    # index couvert par contributor_project_user_idx
+    project = models.ForeignKey(
+        'core.Project', on_delete=models.CASCADE, related_name="contributors", db_index=False
+    )
     created_time = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["user", "project"], name="uniq_user_project")
         ]
+        indexes = [
+            models.Index(fields=["project", "user"], name="contributor_project_user_idx"),
+        ]
         ordering = ["-created_time"]
 
     def __str__(self):
         return f"{self.user} → {self.project}"
 
 
-class Issue(models.Model):
+class Issue(DBMaintainedFieldsMixin, models.Model):
     TAGS = [
         ('BUG', 'Bug'),
         ('FEATURE', 'Feature'),
@@ -60,36 +105,119 @@ class Issue(models.Model):
         ('IN_PROGRESS', 'In progress'),
         ('FINISHED', 'Finished'),
     ]
+    OPEN_STATUSES = ('TODO', 'IN_PROGRESS')
+    # rang de priorité (LOW < MEDIUM < HIGH) : les tris n'utilisent pas l'ordre alphabétique
+    PRIORITY_RANKS = {value: rank for rank, (value, _) in enumerate(PRIORITIES, start=1)}
 
     title = models.CharField(max_length=128)
     description = models.TextField(max_length=2048, blank=True)
     tag = models.CharField(max_length=20, choices=TAGS)
     priority = models.CharField(max_length=20, choices=PRIORITIES)
     status = models.CharField(max_length=20, choices=STATUSES, default="TODO")
-    project = models.ForeignKey('core.Project', on_delete=models.CASCADE, related_name="issues")
+    priority_rank = models.GeneratedField(
+        expression=models.Case(
+            *[models.When(priority=value, then=models.Value(rank)) for value, rank in PRIORITY_RANKS.items()],
+            default=models.Value(0),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
+    # filtre sans paramètre (WHERE is_open) : SQLite n'utilise un index partiel
+    # que si la condition de la requête est écrite comme celle de l'index
+    is_open = models.GeneratedField(
+        expression=models.Q(status__in=OPEN_STATUSES),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+    # index couvert par issue_project_created_idx
+    project = models.ForeignKey('core.Project', on_delete=models.CASCADE, related_name="issues", db_index=False)
     author = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name="authored_issues")
     assignee = models.ForeignKey(
         'users.User', on_delete=models.SET_NULL,
         related_name="assigned_issues", null=True, blank=True
     )
     created_time = models.DateTimeField(auto_now_add=True)
+    comment_count = models.IntegerField(default=0, editable=False)
+
+    DB_MAINTAINED_FIELDS = ("comment_count",)
 
     class Meta:
         ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["project", "-created_time", "-id"], name="issue_project_created_idx"),
+            models.Index(fields=["project", "status", "-created_time", "-id"], name="issue_project_status_idx"),
+            models.Index(fields=["project", "assignee", "-created_time", "-id"], name="issue_project_assignee_idx"),
+            # tableau des issues ouvertes par priorité (?status=open&ordering=-priority)
+            models.Index(
+                fields=["project", "-priority_rank", "-created_time", "-id"], name="issue_open_priority_idx",
+                condition=models.Q(is_open=True),
+            ),
+        ]
 
     def __str__(self):
         return f"[{self.project}] {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # projet et statut comptés en base : post_save en déduit les compteurs à déplacer
+        instance._counted_state = (instance.__dict__.get("project_id"), instance.__dict__.get("status"))
+        return instance
+
 
 class Comment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # UUIDv7 tiré de created_time (core.uuids) pour les nouvelles lignes ; les clés UUID4
+    # existantes sont gardées, l'ordre reste donc celui de (created_time, id)
+    id = TimeOrderedUUIDField(primary_key=True, editable=False)
     description = models.TextField(max_length=2048)
-    issue = models.ForeignKey('core.Issue', on_delete=models.CASCADE, related_name="comments")
+    # index couvert par comment_issue_created_idx
+    issue = models.ForeignKey('core.Issue', on_delete=models.CASCADE, related_name="comments", db_index=False)
     author = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name="authored_comments")
-    created_time = models.DateTimeField(auto_now_add=True)
+    # renseigné dès la création de l'instance, comme la clé qui en est tirée
+    created_time = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
-        ordering = ["-created_time"]
+        ordering = ["-created_time", "-id"]
+        indexes = [
+            models.Index(fields=["issue", "-created_time", "-id"], name="comment_issue_created_idx"),
+        ]
 
     def __str__(self):
         return f"Comment {self.id} on {self.issue}"
+
+
+class ImportCheckpoint(models.Model):
+    """Avancement d'un import NDJSON (commande import_softdesk), mis à jour dans la transaction de chaque paquet."""
+    name = models.CharField(max_length=255, unique=True)
+    # octet et ligne du fichier à partir desquels reprendre
+    offset = models.BigIntegerField(default=0)
+    line = models.BigIntegerField(default=0)
+    counts = models.JSONField(default=dict)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.line}"
+
+
+class ImportedRecord(models.Model):
+    """Correspondance id du fichier importé -> id SoftDesk, pour les références entre paquets."""
+    KINDS = [
+        ('project', 'Project'),
+        ('issue', 'Issue'),
+    ]
+
+    # index couvert par uniq_imported_record
+    checkpoint = models.ForeignKey(
+        'core.ImportCheckpoint', on_delete=models.CASCADE, related_name="records", db_index=False
+    )
+    kind = models.CharField(max_length=10, choices=KINDS)
+    source_id = models.CharField(max_length=64)
+    target_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["checkpoint", "kind", "source_id"], name="uniq_imported_record")
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.source_id} → {self.target_id}"
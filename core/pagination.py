@@ -0,0 +1,208 @@
+# core/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from core.filters import ORDERING_PARAM
+from core.search import get_search_terms
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur opaque sur (created_time, id), du plus récent au plus ancien.
+    Chaque page est une lecture par intervalle d'index : pas d'OFFSET ni de COUNT(*).
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page([item async for item in queryset], position, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            # clé du curseur lue comme celle du modèle (UUID des commentaires)
+            try:
+                position = (position[0], queryset.model._meta.pk.to_python(position[1]))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+        if reverse:
+            # page précédente : on remonte vers les plus récents puis on remet dans l'ordre
+            queryset = queryset.order_by("created_time", "pk")
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(created_time__gt=position[0]) | Q(created_time=position[0], pk__gt=position[1])
+                )
+        else:
+            queryset = queryset.order_by("-created_time", "-pk")
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(created_time__lt=position[0]) | Q(created_time=position[0], pk__lt=position[1])
+                )
+
+        # une ligne de plus que la page, pour savoir s'il en reste
+        return queryset[:self.page_size + 1], position, reverse
+
+    def set_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position = (datetime.fromisoformat(payload["t"]), payload["k"])
+            reverse = bool(payload.get("r", False))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, item, reverse):
+        payload = {"t": item.created_time.isoformat(), "k": str(item.pk)}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("ascii"))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class OffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination, avec une variante asynchrone de paginate_queryset."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [item async for item in queryset[self.offset:self.offset + self.limit]]
+
+
+class CreatedTimePagination(BasePagination):
+    """
+    Pagination des listes de core : limit/offset par défaut (comportement historique),
+    curseur sur (created_time, id) sur demande via ?pagination=cursor, l'en-tête
+    `X-Pagination: cursor` ou la présence d'un ?cursor=. Une recherche (?q=) ou un
+    tri explicite (?ordering=) est toujours paginé par limit/offset.
+    """
+    offset_class = OffsetPagination
+    cursor_class = KeysetPagination
+    mode_query_param = "pagination"
+    mode_header = "X-Pagination"
+
+    def __init__(self):
+        self.delegate = self.offset_class()
+
+    def get_mode(self, request):
+        if get_search_terms(request) is not None or ORDERING_PARAM in request.query_params:
+            # résultats classés par pertinence (?q=) ou par priorité : pas de curseur sur (created_time, id)
+            return "offset"
+        mode = request.query_params.get(self.mode_query_param) or request.headers.get(self.mode_header)
+        if not mode and self.cursor_class.cursor_query_param in request.query_params:
+            mode = "cursor"
+        if not mode:
+            mode = getattr(settings, "SOFTDESK_DEFAULT_PAGINATION", "offset")
+        return "cursor" if mode.lower() == "cursor" else "offset"
+
+    def select_delegate(self, request):
+        if self.get_mode(request) == "cursor":
+            self.delegate = self.cursor_class()
+        else:
+            self.delegate = self.offset_class()
+        return self.delegate
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.select_delegate(request).paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await self.select_delegate(request).apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.delegate.get_schema_operation_parameters(view)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.delegate, "display_page_controls", False)
@@ -1,10 +1,69 @@
 # core/permissions.py
+from django.db.models import Exists, OuterRef
+from django.http import Http404
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from core.models import Project, Issue, Comment, Contributor
+from core.membership import is_contributor
 
+# annotation posée par ProjectAccessMixin : l'utilisateur contribue au projet de l'objet
+CONTRIBUTOR_ANNOTATION = "user_is_contributor"
 
-def _user_is_contributor(user, project_id: int) -> bool:
-    return Contributor.objects.filter(project_id=project_id, user=user).exists()
+
+def _user_is_contributor(request, project_id: int) -> bool:
+    # projets de l'utilisateur chargés une seule fois par requête (cf. core.membership)
+    return is_contributor(request, project_id)
+
+
+def get_project_id(obj):
+    """Projet d'un objet de core, lu sur ses colonnes de clés étrangères, jamais sur une ligne liée."""
+    if isinstance(obj, Project):
+        return obj.id
+    if isinstance(obj, (Issue, Contributor)):
+        return obj.project_id
+    if isinstance(obj, Comment):
+        # issue__project_id annoté par CommentViewSet ; sinon cette seule colonne est lue
+        if hasattr(obj, "project_id"):
+            return obj.project_id
+        return Issue.objects.filter(pk=obj.issue_id).values_list("project_id", flat=True).first()
+    return None
+
+
+class ProjectAccessMixin:
+    """
+    Écritures sur un objet (update, destroy) : l'objet est lu avec l'appartenance de
+    l'utilisateur à son projet (Exists annoté, project_field donnant l'id du projet),
+    que lit IsProjectContributor. Le contrôle d'accès tient dans la requête de l'objet,
+    sans charger les projets de l'utilisateur ni de ligne liée. Les lectures gardent
+    les projets de l'utilisateur, déjà chargés pour l'ETag et le cache de réponses.
+    """
+    project_field = "project_id"
+    access_actions = ("update", "partial_update", "destroy")
+
+    def checks_access_with_object(self):
+        return self.action in self.access_actions and not self.request.user.is_superuser
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.checks_access_with_object():
+            return queryset
+        contributors = Contributor.objects.filter(
+            project_id=OuterRef(self.project_field), user_id=self.request.user.id
+        )
+        return queryset.annotate(**{CONTRIBUTOR_ANNOTATION: Exists(contributors)})
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            self.check_missing_object_access()
+            raise
+
+    def check_missing_object_access(self):
+        # objet introuvable : 403 pour un non-contributeur du projet, qui n'apprend pas
+        # si l'objet existe (comme lorsque has_permission le refusait d'emblée)
+        project_id = self.kwargs.get("project_pk")
+        if project_id and self.checks_access_with_object() and not _user_is_contributor(self.request, project_id):
+            self.permission_denied(self.request)
 
 
 class IsProjectContributor(BasePermission):
@@ -23,7 +82,10 @@ class IsProjectContributor(BasePermission):
 
         project_pk = view.kwargs.get("project_pk")
         if project_pk:
-            return _user_is_contributor(request.user, project_pk)
+            # requête sur un objet : contrôlée avec sa lecture (ProjectAccessMixin)
+            if isinstance(view, ProjectAccessMixin) and view.checks_access_with_object():
+                return True
+            return _user_is_contributor(request, project_pk)
 
         return True
 
@@ -31,17 +93,14 @@ class IsProjectContributor(BasePermission):
         if request.user and request.user.is_superuser:
             return True
 
-        if isinstance(obj, Project):
-            project_id = obj.id
-        elif isinstance(obj, Issue):
-            project_id = obj.project_id
-        elif isinstance(obj, Comment):
-            project_id = obj.issue.project_id
-        elif isinstance(obj, Contributor):
-            project_id = obj.project_id
-        else:
+        # appartenance lue avec l'objet (ProjectAccessMixin) : aucune requête
+        allowed = getattr(obj, CONTRIBUTOR_ANNOTATION, None)
+        if allowed is not None:
+            return allowed
+        project_id = get_project_id(obj)
+        if project_id is None:
             return False
-        return _user_is_contributor(request.user, project_id)
+        return _user_is_contributor(request, project_id)
 
 
 class IsAuthorOrReadOnly(BasePermission):
@@ -53,7 +112,7 @@ class IsAuthorOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         # si l'objet a un auteur et que c'est l'utilisateur, on lui donne accès
-        return getattr(obj, "author", None) == request.user
+        return getattr(obj, "author_id", None) == request.user.id
 
 
 class IsProjectAuthorForContributors(BasePermission):
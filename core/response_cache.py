@@ -0,0 +1,68 @@
+# core/response_cache.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from core.cache import CacheStats
+from core.conditional import ProjectVersionMixin
+
+stats = CacheStats()
+
+
+def get_config():
+    return getattr(settings, "SOFTDESK_RESPONSE_CACHE", None) or {}
+
+
+def get_response_cache():
+    """Backend Django (CACHES) désigné par SOFTDESK_RESPONSE_CACHE, ou None si désactivé."""
+    config = get_config()
+    if not config.get("ENABLED", False):
+        return None
+    return caches[config.get("CACHE_ALIAS", "default")]
+
+
+class CachedResponseMixin(ProjectVersionMixin):
+    """
+    Cache des réponses de lecture des ressources d'un projet.
+
+    La clé contient la version du projet : toute écriture (signaux de core.signals)
+    rend les entrées précédentes inaccessibles, qui sont ensuite évincées par le
+    backend (LRU / TTL pour locmem et file).
+    """
+    cache_actions = ()
+
+    def get_response_cache_key(self, request):
+        version = self.get_project_version()
+        if version is None:
+            return None
+        scope = self.get_scope(request)
+        digest = hashlib.blake2b(
+            f"{request.get_full_path()}|{request.accepted_media_type}".encode(), digest_size=16
+        ).hexdigest()
+        return f"softdesk:response:{self.basename}:{self.get_version_project_id()}:{version}:{scope}:{digest}"
+
+    def cached(self, handler, request, *args, **kwargs):
+        cache = get_response_cache()
+        if cache is None or self.action not in self.cache_actions or not self.can_read_project(request):
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        data = cache.get(key)
+        if data is not None:
+            stats.record_hit()
+            return Response(data)
+
+        stats.record_miss()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and self.matches_scope(request):
+            cache.set(key, response.data, get_config().get("TIMEOUT", 300))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
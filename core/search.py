@@ -0,0 +1,140 @@
+# core/search.py
+"""
+Recherche plein texte ?q= sur les issues (titre, description) et les commentaires.
+
+- SQLite : tables virtuelles FTS5 core_issue_fts et core_comment_fts, tenues à jour
+  par des triggers (SQL figé dans core.migrations._fts, réinstallé par toute migration qui
+  reconstruit ces tables), y compris pour bulk_create et les UPDATE en masse ;
+- PostgreSQL : tsvector pondéré (titre A, description B) et index GIN sur la même expression ;
+- autres bases, ou SQLite sans FTS5 : filtre icontains, sans classement.
+
+Les résultats sont classés par pertinence, puis du plus récent au plus ancien.
+"""
+import re
+import sqlite3
+from contextlib import closing
+from functools import cache
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_PARAM = "q"
+# configuration PostgreSQL : pas de racinisation, le contenu mêle français et anglais
+SEARCH_CONFIG = "simple"
+MAX_TERMS = 10
+FTS_TABLES = {"issue": "core_issue_fts", "comment": "core_comment_fts"}
+
+
+def get_search_terms(request):
+    """Mots de ?q= (None : pas de recherche)."""
+    value = request.query_params.get(SEARCH_PARAM)
+    if value is None or not value.strip():
+        return None
+    return re.findall(r"\w+", value.lower())[:MAX_TERMS]
+
+
+@cache
+def sqlite_has_fts5():
+    """
+    FTS5 compilé dans la bibliothèque SQLite du module sqlite3 : c'est la condition
+    posée par la migration pour créer les tables. Lu sur une connexion en mémoire, hors
+    des connexions de Django : aucune requête ORM, donc utilisable depuis une vue
+    asynchrone (calculé au démarrage, cf. CoreConfig.ready).
+    """
+    with closing(sqlite3.connect(":memory:")) as connection:
+        return any(option == "ENABLE_FTS5" for option, in connection.execute("PRAGMA compile_options"))
+
+
+def has_fts5(connection):
+    return connection.vendor == "sqlite" and sqlite_has_fts5()
+
+
+def fts5_query(terms, columns, scope_column, scope_id):
+    """
+    Requête MATCH : chaque mot entre guillemets (aucune syntaxe FTS5 du client) et en
+    préfixe (« auth » trouve « authentication »), dans les colonnes de texte seulement,
+    et restreinte au projet / à l'issue par le jeton de scope_column.
+    """
+    words = " ".join(f'"{term}"*' for term in terms)
+    return f'{{{" ".join(columns)}}} : ({words}) AND {scope_column} : "{int(scope_id)}"'
+
+
+def _search_fts5(queryset, table, key, match, weights):
+    # la table FTS est parcourue par MATCH, jamais une fois par ligne du projet : filtre
+    # par sous-requête non corrélée, rang lu dans le résultat du MATCH matérialisé une
+    # fois (SQLite 3.35+), quel que soit le choix du planificateur pour COUNT(*)
+    fts_key, row_key = key
+    matches = RawSQL(f"SELECT {fts_key} FROM {table} WHERE {table} MATCH %s", (match,))
+    # bm25 : plus petit = plus pertinent
+    rank = RawSQL(
+        f"WITH ranks AS MATERIALIZED (SELECT {fts_key} AS id, -bm25({table}, {', '.join(map(str, weights))}) AS rank "
+        f"FROM {table} WHERE {table} MATCH %s) SELECT rank FROM ranks WHERE ranks.id = {row_key}",
+        (match,)
+    )
+    return (
+        queryset.filter(pk__in=matches).annotate(search_rank=rank)
+        .order_by("-search_rank", "-created_time", "-id")
+    )
+
+
+def search_issues(queryset, terms, project_id):
+    connection = connections[queryset.db]
+    if not terms:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        return _search_postgresql(queryset, terms, {"title": "A", "description": "B"})
+    if has_fts5(connection):
+        return _search_fts5(
+            queryset, FTS_TABLES["issue"], ("rowid", "core_issue.id"),
+            fts5_query(terms, ("title", "description"), "project_id", project_id),
+            # le titre compte dix fois plus que la description
+            (10.0, 1.0, 0.0),
+        )
+    return _search_icontains(queryset, terms, ("title", "description"))
+
+
+def search_comments(queryset, terms, issue_id):
+    connection = connections[queryset.db]
+    if not terms:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        return _search_postgresql(queryset, terms, {"description": "A"})
+    if has_fts5(connection):
+        return _search_fts5(
+            queryset, FTS_TABLES["comment"], ("comment_id", "core_comment.id"),
+            fts5_query(terms, ("description",), "issue_id", issue_id), (1.0, 0.0, 0.0),
+        )
+    return _search_icontains(queryset, terms, ("description",))
+
+
+def get_search_vector(weights):
+    """Expression cherchée : doit rester identique à celle de l'index GIN, figée dans 0008_search_index."""
+    from django.contrib.postgres.search import SearchVector
+
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in weights.items()]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def _search_postgresql(queryset, terms, weights):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    vector = get_search_vector(weights)
+    query = SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config=SEARCH_CONFIG)
+    return (
+        queryset.alias(search_vector=vector).filter(search_vector=query)
+        .annotate(search_rank=SearchRank(vector, query))
+        .order_by("-search_rank", "-created_time", "-id")
+    )
+
+
+def _search_icontains(queryset, terms, fields):
+    for term in terms:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(condition)
+    return queryset.order_by("-created_time", "-id")
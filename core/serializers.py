@@ -3,11 +3,22 @@ from rest_framework import serializers
 from rest_framework.reverse import reverse
 from django.contrib.auth import get_user_model
 from core.models import Contributor, Project, Issue, Comment
+from core.shaping import DynamicFieldsMixin
 
 User = get_user_model()
 
 
-class ProjectListSerializer(ModelSerializer):
+def author_data(instance):
+    return {"id": instance.author_id, "username": instance.author.username}
+
+
+def assignee_data(instance):
+    if instance.assignee_id is None:
+        return None
+    return {"id": instance.assignee_id, "username": instance.assignee.username}
+
+
+class ProjectListSerializer(DynamicFieldsMixin, ModelSerializer):
 
     class Meta:
         model = Project
@@ -16,30 +27,57 @@ class ProjectListSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
+        self.expand(data, "author", lambda: author_data(instance))
         return data
 
 
-class ProjectDetailSerializer(ModelSerializer):
+class ProjectDetailSerializer(DynamicFieldsMixin, ModelSerializer):
+    # compteurs dénormalisés (core.counters) : lus sur la ligne du projet, sans requête
+    issue_counts = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ["id", "title", "description", "type", "author", "created_time", "issues", "contributors"]
-        read_only_fields = ["id", "author", "created_time"]
+        fields = [
+            "id", "title", "description", "type", "author", "created_time", "issues", "contributors",
+            "issue_counts", "contributor_count", "comment_count"
+        ]
+        # issues et contributeurs se gèrent par leurs propres routes : écrits ici (RelatedManager.set),
+        # ils changeraient de projet sans signal, donc sans compteurs ni version à jour
+        read_only_fields = ["id", "author", "created_time", "issues", "contributors"]
+
+    def get_issue_counts(self, instance):
+        return {status: getattr(instance, field) for status, field in Project.ISSUE_COUNT_FIELDS.items()}
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
-        data["contributors"] = [
-            {"id": contributor.id, "user_id": contributor.user_id,
-             "username": contributor.user.username}
-            for contributor in instance.contributors.all()
-        ]
-        data["issues"] = [{"id": issue.id, "title": issue.title} for issue in instance.issues.all()]
+        self.expand(data, "author", lambda: author_data(instance))
+        # hors retrieve (création, mise à jour), les relations ne sont pas préchargées
+        prefetched = getattr(instance, "_prefetched_objects_cache", {})
+
+        def contributors_data():
+            contributors = instance.contributors.all()
+            if "contributors" not in prefetched:
+                contributors = contributors.select_related("user").only(
+                    "id", "project_id", "user_id", "user__username"
+                )
+            return [
+                {"id": contributor.id, "user_id": contributor.user_id,
+                 "username": contributor.user.username}
+                for contributor in contributors
+            ]
+
+        def issues_data():
+            issues = instance.issues.all()
+            if "issues" not in prefetched:
+                issues = issues.only("id", "project_id", "title")
+            return [{"id": issue.id, "title": issue.title} for issue in issues]
+
+        self.expand(data, "contributors", contributors_data)
+        self.expand(data, "issues", issues_data)
         return data
 
 
-class ContributorListSerializer(ModelSerializer):
+class ContributorListSerializer(DynamicFieldsMixin, ModelSerializer):
 
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
 
@@ -50,11 +88,11 @@ class ContributorListSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["user"] = {"id": instance.user_id, "username": instance.user.username}
+        self.expand(data, "user", lambda: {"id": instance.user_id, "username": instance.user.username})
         return data
 
 
-class ContributorDetailSerializer(ModelSerializer):
+class ContributorDetailSerializer(DynamicFieldsMixin, ModelSerializer):
 
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
 
@@ -65,40 +103,55 @@ class ContributorDetailSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["user"] = {"id": instance.user_id, "username": instance.user.username}
-        data["project"] = {"id": instance.project_id, "title": instance.project.title}
+        self.expand(data, "user", lambda: {"id": instance.user_id, "username": instance.user.username})
+        self.expand(data, "project", lambda: {"id": instance.project_id, "title": instance.project.title})
         return data
 
 
-class IssueListSerializer(ModelSerializer):
+class IssueListSerializer(DynamicFieldsMixin, ModelSerializer):
 
     description = serializers.CharField(write_only=True, required=False)
     assignee = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), allow_null=True, required=False)
 
     class Meta:
         model = Issue
-        fields = ["id", "title", "tag", "priority", "status", "author", "assignee", "created_time", "description"]
+        fields = [
+            "id", "title", "tag", "priority", "status", "author", "assignee", "created_time", "comment_count",
+            "description"
+        ]
         read_only_fields = ["id", "author", "created_time"]
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
-        if instance.assignee:
-            data["assignee"] = {"id": instance.assignee_id, "username": instance.assignee.username}
-        else:
-            data["assignee"] = None
+        self.expand(data, "author", lambda: author_data(instance))
+        self.expand(data, "assignee", lambda: assignee_data(instance))
         return data
 
 
-class IssueDetailSerializer(ModelSerializer):
+class IssueBulkItemSerializer(IssueListSerializer):
+    """
+    Élément d'un lot d'issues (création / mise à jour en masse) : sémantique de
+    IssueListSerializer, l'assignee étant validé contre les contributeurs du
+    projet chargés une seule fois pour tout le lot (context["contributors"]).
+    """
+    assignee = serializers.IntegerField(allow_null=True, required=False)
+
+    def validate_assignee(self, value):
+        if value is not None and value not in self.context["contributors"]:
+            raise serializers.ValidationError("L'utilisateur doit être contributor du projet.")
+        return value
+
+
+class IssueDetailSerializer(DynamicFieldsMixin, ModelSerializer):
 
     class Meta:
         model = Issue
         fields = [
             "id", "title", "description", "tag", "priority", "status",
-            "project", "author", "assignee", "created_time", "comments"
+            "project", "author", "assignee", "created_time", "comment_count", "comments"
         ]
-        read_only_fields = ["id", "author", "created_time", "project"]
+        # commentaires en lecture seule, comme les relations de ProjectDetailSerializer
+        read_only_fields = ["id", "author", "created_time", "project", "comments"]
 
     def validate_assignee(self, value):
         if value is None:
@@ -115,20 +168,17 @@ class IssueDetailSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
-        data["project"] = {"id": instance.project_id, "title": instance.project.title}
-        if instance.assignee:
-            data["assignee"] = {"id": instance.assignee_id, "username": instance.assignee.username}
-        else:
-            data["assignee"] = None
-        data["comments"] = [
+        self.expand(data, "author", lambda: author_data(instance))
+        self.expand(data, "project", lambda: {"id": instance.project_id, "title": instance.project.title})
+        self.expand(data, "assignee", lambda: assignee_data(instance))
+        self.expand(data, "comments", lambda: [
             {"id": comment.id, "description": comment.description}
             for comment in instance.comments.all()
-        ]
+        ])
         return data
 
 
-class CommentListSerializer(ModelSerializer):
+class CommentListSerializer(DynamicFieldsMixin, ModelSerializer):
 
     class Meta:
         model = Comment
@@ -137,11 +187,11 @@ class CommentListSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
+        self.expand(data, "author", lambda: author_data(instance))
         return data
 
 
-class CommentDetailSerializer(ModelSerializer):
+class CommentDetailSerializer(DynamicFieldsMixin, ModelSerializer):
 
     class Meta:
         model = Comment
@@ -151,8 +201,8 @@ class CommentDetailSerializer(ModelSerializer):
     def to_representation(self, instance):
         request = self.context.get("request")
         data = super().to_representation(instance)
-        data["author"] = {"id": instance.author_id, "username": instance.author.username}
-        data["issue"] = {
+        self.expand(data, "author", lambda: author_data(instance))
+        self.expand(data, "issue", lambda: {
             "id": instance.issue_id,
             "title": instance.issue.title,
             "url": request.build_absolute_uri(
@@ -162,5 +212,5 @@ class CommentDetailSerializer(ModelSerializer):
                     request=request,
                 )
             )
-        }
+        })
         return data
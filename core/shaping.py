@@ -0,0 +1,77 @@
+# core/shaping.py
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def _read_list_param(request, name):
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def requested_fields(request):
+    """Champs demandés via ?fields=a,b (None : tous les champs)."""
+    return _read_list_param(request, FIELDS_PARAM)
+
+
+def is_wanted(request, name):
+    wanted = requested_fields(request)
+    return wanted is None or name in wanted
+
+
+def is_expanded(request, name):
+    """
+    Une relation est développée (objet imbriqué) par défaut ; dès que ?expand= est
+    fourni, seules les relations listées le sont, les autres sont rendues par leur id.
+    """
+    expand = _read_list_param(request, EXPAND_PARAM)
+    return expand is None or name in expand
+
+
+def shape_queryset(queryset, request, columns, relations=None, always=()):
+    """
+    Réduit le queryset à la forme demandée par ?fields= / ?expand= :
+    - columns : champs du serializer lus directement sur le modèle ;
+    - relations : {clé étrangère: colonnes lues sur l'objet lié lorsqu'il est développé} ;
+    - always : colonnes toujours nécessaires (permissions, pagination), y compris
+      sur une relation ("issue__project_id"), qui est alors jointe.
+    """
+    select_related = [column.split("__")[0] for column in always if "__" in column]
+    only = list(always)
+    only.extend(name for name in columns if is_wanted(request, name))
+    for name, related_columns in (relations or {}).items():
+        if not is_wanted(request, name):
+            continue
+        only.append(name)
+        if is_expanded(request, name):
+            if name not in select_related:
+                select_related.append(name)
+            only.extend(f"{name}__{column}" for column in related_columns)
+    return queryset.select_related(*select_related).only(*only)
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer dont la représentation suit ?fields= et ?expand= (lectures uniquement).
+    Sans ces paramètres, la représentation est inchangée.
+    """
+
+    def get_request(self):
+        return self.context.get("request")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        wanted = requested_fields(self.get_request())
+        if wanted is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in wanted}
+
+    def expand(self, data, name, build):
+        """Remplace l'id d'une relation par sa représentation développée, si elle est demandée."""
+        if name in data and is_expanded(self.get_request(), name):
+            data[name] = build()
@@ -0,0 +1,100 @@
+# core/signals.py
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from core import membership
+from core.conditional import bump_project_version
+from core.counters import project_updates, update_project
+from core.models import Comment, Contributor, Issue, Project
+
+
+def deleted_with(origin, model):
+    # suppression en cascade depuis un objet (ou un queryset) de model, supprimé lui aussi
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+@receiver(post_save, sender=Contributor)
+def contributor_saved(sender, instance, created, **kwargs):
+    # la liste des projets de l'utilisateur a changé : on oublie la version en cache
+    membership.invalidate_user(instance.user_id)
+    update_project(instance.project_id, contributors=1 if created else 0)
+
+
+@receiver(post_delete, sender=Contributor)
+def contributor_deleted(sender, instance, origin=None, **kwargs):
+    membership.invalidate_user(instance.user_id)
+    if not deleted_with(origin, Project):
+        update_project(instance.project_id, contributors=-1)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_project_version(instance.pk)
+
+
+@receiver(pre_save, sender=Issue)
+def issue_saving(sender, instance, **kwargs):
+    # projet ou statut non chargés (only(), defer()) : on relit ceux qui sont comptés
+    if not instance._state.adding and None in getattr(instance, "_counted_state", (None, None)):
+        instance._counted_state = (
+            Issue.objects.filter(pk=instance.pk).values_list("project_id", "status").first() or (None, None)
+        )
+        # valeurs relues posées sur les champs différés : issue_saved ne les recharge pas
+        deferred = instance.get_deferred_fields()
+        for attname, value in zip(("project_id", "status"), instance._counted_state):
+            if attname in deferred and value is not None:
+                setattr(instance, attname, value)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    counted = (instance.project_id, instance.status)
+    before = None if created else getattr(instance, "_counted_state", counted)
+    instance._counted_state = counted
+    if before is None or before[0] is None:
+        update_project(instance.project_id, issues={instance.status: 1})
+    elif before[0] != instance.project_id:
+        # issue déplacée : ses compteurs passent d'un projet à l'autre
+        update_project(before[0], issues={before[1]: -1}, comments=-instance.comment_count)
+        update_project(instance.project_id, issues={instance.status: 1}, comments=instance.comment_count)
+    elif before[1] != instance.status:
+        update_project(instance.project_id, issues={before[1]: -1, instance.status: 1})
+    else:
+        bump_project_version(instance.project_id)
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender, instance, origin=None, **kwargs):
+    # ses commentaires, supprimés avec elle, sont décomptés ici en une fois
+    if not deleted_with(origin, Project):
+        update_project(instance.project_id, issues={instance.status: -1}, comments=-instance.comment_count)
+
+
+def comment_changed(instance, delta, origin=None):
+    # supprimé avec son issue (décompté par issue_deleted) ou son projet
+    if deleted_with(origin, Project) or deleted_with(origin, Issue):
+        return
+    if delta:
+        Issue.objects.filter(pk=instance.issue_id).update(comment_count=F("comment_count") + delta)
+    # une seule requête, sans charger l'issue
+    Project.objects.filter(issues__id=instance.issue_id).update(**project_updates(comments=delta))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    comment_changed(instance, 1 if created else 0)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    comment_changed(instance, -1, origin)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # le nom d'utilisateur est affiché dans les ressources de ses projets
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    Project.objects.filter(contributors__user_id=instance.pk).update(version=F("version") + 1)
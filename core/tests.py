@@ -1 +1,821 @@
-# Create your tests here.
+# core/tests.py
+import csv
+import inspect
+import json
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipIf
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from core import fast_json, membership, search
+from core.counters import recount, update_project
+from core.export import CSV_COLUMNS
+from core.fast_json import FastJSONParser, FastJSONRenderer
+from core.models import Comment, Contributor, Issue, Project
+from core.serializers import ProjectListSerializer
+from core.views import IssueViewSet
+from softdesk.database import database_from_env
+from users.authentication import VersionedRefreshToken
+from users.models import User
+
+
+class SoftDeskTestCase(APITestCase):
+    """
+    Jeu de données commun : un projet d'alice (bob contributeur, carol extérieure),
+    trois issues et trois commentaires par issue, plus un second projet d'alice. Les
+    nombres de requêtes ne doivent pas dépendre du nombre de lignes (pas de N+1).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice", "pw-Secret-123", birthday=date(1990, 1, 1))
+        cls.bob = User.objects.create_user("bob", "pw-Secret-123", birthday=date(1990, 1, 1))
+        cls.carol = User.objects.create_user("carol", "pw-Secret-123", birthday=date(1990, 1, 1))
+        cls.project = Project.objects.create(title="API", description="Backend", type="BE", author=cls.alice)
+        cls.other_project = Project.objects.create(title="Web", type="FE", author=cls.alice)
+        for project in (cls.project, cls.other_project):
+            Contributor.objects.create(user=cls.alice, project=project)
+        cls.contributor = Contributor.objects.create(user=cls.bob, project=cls.project)
+        cls.issues = [
+            Issue.objects.create(
+                title=f"Issue {i}", tag="BUG", priority="LOW", project=cls.project,
+                author=cls.alice if i % 2 else cls.bob, assignee=cls.bob if i % 2 else cls.alice,
+            )
+            for i in range(3)
+        ]
+        cls.issue = cls.issues[0]
+        cls.comments = [
+            Comment.objects.create(description=f"Comment {i}", issue=issue, author=cls.alice)
+            for issue in cls.issues for i in range(3)
+        ]
+        cls.comment = Comment.objects.filter(issue=cls.issue).first()
+
+    def setUp(self):
+        self.client.force_authenticate(self.alice)
+
+    def project_url(self, name="project-detail", **kwargs):
+        return reverse(name, kwargs={"pk": self.project.pk, **kwargs})
+
+    def issues_url(self, pk=None):
+        if pk is None:
+            return reverse("project-issues-list", kwargs={"project_pk": self.project.pk})
+        return reverse("project-issues-detail", kwargs={"project_pk": self.project.pk, "pk": pk})
+
+    def comments_url(self, pk=None):
+        kwargs = {"project_pk": self.project.pk, "issue_pk": self.issue.pk}
+        if pk is None:
+            return reverse("issue-comments-list", kwargs=kwargs)
+        return reverse("issue-comments-detail", kwargs={**kwargs, "pk": pk})
+
+    def contributors_url(self, pk=None):
+        if pk is None:
+            return reverse("project-contributors-list", kwargs={"project_pk": self.project.pk})
+        return reverse("project-contributors-detail", kwargs={"project_pk": self.project.pk, "pk": pk})
+
+
+class ReadQueryCountTests(SoftDeskTestCase):
+    """
+    Requêtes SQL des lectures, par action : projets de l'utilisateur (core.membership),
+    version du projet (ETag), COUNT de la pagination, puis les lignes et leurs relations.
+    """
+
+    def assert_get(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_project_list(self):
+        # ni contributeurs ni issues : ProjectListSerializer ne les lit pas
+        data = self.assert_get(reverse("project-list"), 2)
+        self.assertEqual(data["count"], 2)
+
+    def test_project_list_expanded_author(self):
+        data = self.assert_get(reverse("project-list") + "?expand=author", 2)
+        self.assertEqual(data["results"][0]["author"], {"id": self.alice.id, "username": "alice"})
+
+    def test_project_retrieve(self):
+        # contributeurs avec leur utilisateur, issues réduites à id / title : un Prefetch chacun
+        data = self.assert_get(self.project_url(), 5)
+        self.assertEqual(len(data["contributors"]), 2)
+        self.assertEqual(len(data["issues"]), 3)
+
+    def test_project_retrieve_without_relations(self):
+        self.assert_get(self.project_url() + "?fields=id,title", 3)
+
+    def test_contributor_list(self):
+        data = self.assert_get(self.contributors_url(), 4)
+        self.assertEqual(data["count"], 2)
+
+    def test_contributor_retrieve(self):
+        self.assert_get(self.contributors_url(self.contributor.pk), 3)
+
+    def test_issue_list(self):
+        data = self.assert_get(self.issues_url(), 4)
+        self.assertEqual(data["count"], 3)
+
+    def test_issue_retrieve(self):
+        # commentaires préchargés en une requête
+        data = self.assert_get(self.issues_url(self.issue.pk), 4)
+        self.assertEqual(len(data["comments"]), 3)
+
+    def test_comment_list(self):
+        data = self.assert_get(self.comments_url(), 4)
+        self.assertEqual(data["count"], 3)
+
+    def test_comment_retrieve(self):
+        self.assert_get(self.comments_url(self.comment.pk), 3)
+
+
+@override_settings(SOFTDESK_MEMBERSHIP_CACHE={"ENABLED": True, "TIMEOUT": 60, "MAX_ENTRIES": 1024})
+class MembershipCacheTests(SoftDeskTestCase):
+    """
+    Cache partagé des projets de chaque utilisateur (core.membership) : invalidé dans
+    le processus dès qu'une contribution change, expiré après TIMEOUT ailleurs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        membership._shared_cache = None
+        membership.stats.reset()
+
+    def get_issues(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(self.issues_url()).status_code
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.get_issues(self.bob), 200)
+        self.assertEqual(membership.stats.misses, 1)
+        hits = membership.stats.hits
+        # projets de bob lus dans le cache : une requête de moins que ReadQueryCountTests
+        with self.assertNumQueries(3):
+            self.assertEqual(self.get_issues(self.bob), 200)
+        self.assertEqual(membership.stats.misses, 1)
+        self.assertGreater(membership.stats.hits, hits)
+
+    def test_contributor_added(self):
+        self.assertEqual(self.get_issues(self.carol), 403)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.post(self.contributors_url(), {"user": self.carol.pk}).status_code, 201)
+        self.assertEqual(self.get_issues(self.carol), 200)
+
+    def test_contributor_removed(self):
+        self.assertEqual(self.get_issues(self.bob), 200)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.delete(self.contributors_url(self.contributor.pk)).status_code, 200)
+        self.assertEqual(self.get_issues(self.bob), 403)
+
+    def test_bulk_contributors(self):
+        url = reverse("project-contributors-bulk", kwargs={"project_pk": self.project.pk})
+        self.assertEqual((self.get_issues(self.bob), self.get_issues(self.carol)), (200, 403))
+        self.client.force_authenticate(self.alice)
+        self.client.post(url, [self.carol.pk], format="json")
+        self.client.delete(url, [self.bob.pk], format="json")
+        self.assertEqual((self.get_issues(self.bob), self.get_issues(self.carol)), (403, 200))
+
+    def test_user_deleted(self):
+        self.assertEqual(self.get_issues(self.bob), 200)
+        self.assertIsNotNone(membership._get_shared_cache().get(self.bob.pk))
+        self.bob.delete()
+        self.assertIsNone(membership._get_shared_cache().get(self.bob.pk))
+
+    def test_timeout(self):
+        # sans invalidation (écriture dans un autre processus), l'entrée sert jusqu'à TIMEOUT
+        self.assertEqual(self.get_issues(self.bob), 200)
+        Contributor.objects.filter(pk=self.contributor.pk).delete()
+        membership._get_shared_cache().set(self.bob.pk, frozenset({self.project.pk}))
+        self.assertEqual(self.get_issues(self.bob), 200)
+        with mock.patch("core.cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(self.get_issues(self.bob), 403)
+
+
+@override_settings(SOFTDESK_RESPONSE_CACHE={"ENABLED": True, "CACHE_ALIAS": "responses", "TIMEOUT": 300})
+class SharedResponseTests(SoftDeskTestCase):
+    """
+    Cache des réponses et ETag partagés entre contributeurs : une réponse qui dépend
+    de l'utilisateur ne doit jamais être servie à un autre.
+    """
+
+    # tous les paramètres de core.filters et core.search
+    queries = (
+        "", "?status=open", "?priority=LOW,HIGH", "?tag=BUG", "?assignee=me", "?assignee=none",
+        "?created_after=2000-01-01", "?ordering=-priority", "?q=issue", "?fields=id,title",
+        "?status=open&assignee=me&ordering=priority",
+    )
+
+    def setUp(self):
+        super().setUp()
+        caches["responses"].clear()
+
+    def get_as(self, user, url, **headers):
+        self.client.force_authenticate(user)
+        return self.client.get(url, **headers)
+
+    def get_uncached(self, user, url):
+        with override_settings(SOFTDESK_RESPONSE_CACHE={"ENABLED": False}):
+            return self.get_as(user, url).json()
+
+    def test_cached_issue_lists_match_each_user(self):
+        for query in self.queries + (f"?assignee={self.bob.id}",):
+            url = self.issues_url() + query
+            with self.subTest(query=query):
+                caches["responses"].clear()
+                first = self.get_as(self.alice, url)
+                self.assertEqual(first.json(), self.get_uncached(self.alice, url))
+                headers = {"HTTP_IF_NONE_MATCH": first["ETag"]} if first.has_header("ETag") else {}
+                response = self.get_as(self.bob, url, **headers)
+                expected = self.get_uncached(self.bob, url)
+                if expected != first.json():
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json(), expected)
+
+    def test_undeclared_user_filter_is_not_shared(self):
+        with mock.patch.object(IssueViewSet, "depends_on_user", return_value=False):
+            response = self.get_as(self.alice, self.issues_url() + "?assignee=me")
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header("ETag"))
+            # update() sans signal : la version du projet ne change pas, seul le cache resservirait l'ancienne liste
+            Issue.objects.filter(pk=self.issue.pk).update(assignee=self.bob)
+            again = self.get_as(self.alice, self.issues_url() + "?assignee=me")
+            self.assertEqual(again.json()["count"], response.json()["count"] - 1)
+
+    def test_assignee_me_differs_per_user(self):
+        url = self.issues_url() + "?assignee=me"
+        alice = self.get_as(self.alice, url)
+        self.assertEqual(alice.json()["count"], 2)
+        self.assertTrue(alice.has_header("ETag"))
+        self.assertEqual(self.get_as(self.alice, url, HTTP_IF_NONE_MATCH=alice["ETag"]).status_code, 304)
+        # servie depuis le cache d'alice, la réponse de bob serait la sienne
+        bob = self.get_as(self.bob, url, HTTP_IF_NONE_MATCH=alice["ETag"])
+        self.assertEqual(bob.status_code, 200)
+        self.assertEqual(bob.json()["count"], 1)
+        self.assertNotEqual(bob["ETag"], alice["ETag"])
+        self.assertEqual(self.get_as(self.alice, url).json(), alice.json())
+
+    def test_comment_lists_shared(self):
+        # les commentaires n'ont pas de filtre assignee : ?assignee=me ne rend pas la liste propre à l'utilisateur
+        url = self.comments_url() + "?assignee=me"
+        alice = self.get_as(self.alice, url)
+        self.assertEqual(self.get_as(self.bob, url, HTTP_IF_NONE_MATCH=alice["ETag"]).status_code, 304)
+
+
+class ObjectQueryCountTests(SoftDeskTestCase):
+    """
+    Requêtes SQL des routes sur un objet, contrôle d'accès compris (core.permissions) :
+    le droit d'écriture est lu dans la requête qui charge l'objet.
+    """
+
+    def assert_request(self, method, url, queries, status_code=200, data=None):
+        with self.assertNumQueries(queries):
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(response.status_code, status_code)
+        return response
+
+    def test_project_retrieve(self):
+        self.assert_request("get", self.project_url(), 5)
+
+    def test_project_update(self):
+        data = {"title": "API v2", "description": "Backend", "type": "BE"}
+        self.assert_request("put", self.project_url(), 7, data=data)
+
+    def test_project_partial_update(self):
+        self.assert_request("patch", self.project_url(), 7, data={"title": "API v2"})
+
+    def test_project_destroy(self):
+        self.assert_request("delete", self.project_url(), 8)
+
+    def test_contributor_retrieve(self):
+        self.assert_request("get", self.contributors_url(self.contributor.pk), 3)
+
+    def test_contributor_update(self):
+        # un contributeur ne se modifie pas : refus après le contrôle d'accès
+        self.assert_request("put", self.contributors_url(self.contributor.pk), 2, status_code=405, data={})
+
+    def test_contributor_partial_update(self):
+        self.assert_request("patch", self.contributors_url(self.contributor.pk), 2, status_code=405, data={})
+
+    def test_contributor_destroy(self):
+        self.assert_request("delete", self.contributors_url(self.contributor.pk), 5)
+
+    def test_issue_retrieve(self):
+        self.assert_request("get", self.issues_url(self.issues[1].pk), 4)
+
+    def test_issue_update(self):
+        data = {"title": "Issue 1", "tag": "TASK", "priority": "HIGH", "assignee": self.bob.pk}
+        self.assert_request("put", self.issues_url(self.issues[1].pk), 7, data=data)
+
+    def test_issue_partial_update(self):
+        self.assert_request("patch", self.issues_url(self.issues[1].pk), 5, data={"status": "IN_PROGRESS"})
+
+    def test_issue_destroy(self):
+        self.assert_request("delete", self.issues_url(self.issues[1].pk), 5)
+
+    def test_comment_retrieve(self):
+        self.assert_request("get", self.comments_url(self.comment.pk), 3)
+
+    def test_comment_update(self):
+        self.assert_request("put", self.comments_url(self.comment.pk), 3, data={"description": "Edited"})
+
+    def test_comment_partial_update(self):
+        self.assert_request("patch", self.comments_url(self.comment.pk), 3, data={"description": "Edited"})
+
+    def test_comment_destroy(self):
+        self.assert_request("delete", self.comments_url(self.comment.pk), 4)
+
+
+class BulkDestroyTests(SoftDeskTestCase):
+    """Suppression en masse : nombre de requêtes indépendant du lot, compteurs du projet à jour."""
+
+    def setUp(self):
+        # bob est l'auteur des issues 0 et 2
+        self.client.force_authenticate(self.bob)
+
+    def bulk_destroy(self, issues, queries):
+        url = reverse("project-issues-bulk", kwargs={"project_pk": self.project.pk})
+        with self.assertNumQueries(queries):
+            response = self.client.delete(url, [issue.pk for issue in issues], format="json")
+        self.assertEqual(response.status_code, 200)
+        return Project.objects.get(pk=self.project.pk)
+
+    def test_single_issue(self):
+        project = self.bulk_destroy(self.issues[:1], 7)
+        self.assertEqual((project.todo_issue_count, project.comment_count), (2, 6))
+
+    def test_counters_in_one_update(self):
+        version = Project.objects.get(pk=self.project.pk).version
+        project = self.bulk_destroy(self.issues[::2], 7)
+        self.assertEqual((project.todo_issue_count, project.comment_count), (1, 3))
+        self.assertEqual(project.version, version + 1)
+        self.assertFalse(Comment.objects.filter(issue__in=self.issues[::2]).exists())
+
+    def test_raw_delete_pinned(self):
+        # API privée de Django utilisée par bulk_destroy : à revoir si elle change
+        self.assertEqual(list(inspect.signature(QuerySet._raw_delete).parameters), ["self", "using"])
+
+
+class BulkContributorTests(SoftDeskTestCase):
+    """Ajout et retrait en masse de contributeurs : réponse par utilisateur, compteur exact."""
+
+    def bulk(self, method, user_ids):
+        url = reverse("project-contributors-bulk", kwargs={"project_pk": self.project.pk})
+        return getattr(self.client, method)(url, user_ids, format="json")
+
+    def contributor_count(self):
+        return Project.objects.get(pk=self.project.pk).contributor_count
+
+    def test_add(self):
+        # doublons du lot comptés une fois, contributeurs existants et inconnus écartés
+        response = self.bulk("post", [self.carol.pk, self.carol.pk, self.bob.pk, 0])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json(), {"added": [self.carol.pk], "already_contributors": [self.bob.pk], "unknown_users": [0]}
+        )
+        self.assertEqual(self.contributor_count(), 3)
+        response = self.bulk("post", [self.alice.pk, self.carol.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["added"], [])
+        self.assertEqual(recount(), (0, 0))
+
+    def test_concurrent_add(self):
+        bulk_create = Contributor.objects.bulk_create
+
+        def concurrent(contributors, **kwargs):
+            # une autre requête ajoute carol entre la lecture du lot et son insertion
+            bulk_create([Contributor(project_id=self.project.pk, user_id=self.carol.pk)])
+            update_project(self.project.pk, contributors=1)
+            return bulk_create(contributors, **kwargs)
+
+        with mock.patch.object(Contributor.objects, "bulk_create", side_effect=concurrent):
+            response = self.bulk("post", [self.carol.pk])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Contributor.objects.filter(project=self.project, user=self.carol).count(), 1)
+        self.assertEqual(self.contributor_count(), 3)
+        self.assertEqual(recount(), (0, 0))
+
+    def test_remove(self):
+        response = self.bulk("delete", [self.bob.pk, self.carol.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"removed": [self.bob.pk], "not_contributors": [self.carol.pk]})
+        self.assertEqual(self.contributor_count(), 1)
+        self.assertEqual(recount(), (0, 0))
+
+    def test_author_kept(self):
+        self.assertEqual(self.bulk("delete", [self.bob.pk, self.alice.pk]).status_code, 403)
+        self.assertEqual(self.contributor_count(), 2)
+
+    def test_project_author_only(self):
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.bulk("post", [self.carol.pk]).status_code, 403)
+        self.assertFalse(Contributor.objects.filter(project=self.project, user=self.carol).exists())
+
+
+class CommentKeyTests(SoftDeskTestCase):
+    """Clés UUIDv7 des nouveaux commentaires, clés UUID4 existantes gardées (core.uuids)."""
+
+    def test_new_keys_follow_created_time(self):
+        comments = [Comment(description=f"New {i}", issue=self.issue, author=self.alice) for i in range(3)]
+        self.assertEqual([comment.pk.version for comment in comments], [7, 7, 7])
+        self.assertEqual(sorted(comments, key=lambda comment: comment.pk), comments)
+
+    def test_legacy_keys_are_paged_on_created_time(self):
+        # clés UUID4 sans rapport avec les dates : l'ordre des pages est celui de (created_time, id)
+        start = timezone.now() - timedelta(days=1)
+        legacy = Comment.objects.bulk_create([
+            Comment(id=uuid.uuid4(), description=f"Legacy {i}", issue=self.issue, author=self.alice,
+                    created_time=start + timedelta(minutes=i))
+            for i in range(12)
+        ])
+        expected = [str(comment.pk) for comment in Comment.objects.filter(issue=self.issue)]
+        self.assertEqual(expected[3:], [str(comment.pk) for comment in reversed(legacy)])
+        ids, url = [], self.comments_url() + "?pagination=cursor&limit=4"
+        while url:
+            data = self.client.get(url).json()
+            ids += [comment["id"] for comment in data["results"]]
+            url = data["next"]
+        self.assertEqual(ids, expected)
+
+
+class FastListTests(SoftDeskTestCase):
+    """Listes de core.fast_lists : réponses identiques, octet pour octet, à celles des serializers DRF."""
+
+    queries = ("", "?expand=author", "?expand=author,assignee", "?fields=id,assignee&expand=assignee", "?fields=id")
+
+    def test_same_bytes_as_serializers(self):
+        for url in (reverse("project-list"), self.issues_url(), self.comments_url()):
+            for query in self.queries:
+                with self.subTest(url=url, query=query):
+                    expected = self.client.get(url + query).content
+                    with override_settings(SOFTDESK_FAST_LISTS={"ENABLED": True}):
+                        self.assertEqual(self.client.get(url + query).content, expected)
+
+
+class AsyncReadTests(SoftDeskTestCase):
+    """Routes /api/async/ : mêmes réponses que les routes synchrones correspondantes."""
+
+    def get_async(self, url, user=None):
+        headers = {}
+        if user is not False:
+            token = VersionedRefreshToken.for_user(user or self.alice).access_token
+            headers["Authorization"] = f"Bearer {token}"
+        return async_to_sync(self.async_client.get)(url.replace("/api/", "/api/async/", 1), headers=headers)
+
+    def assert_same(self, url, user=None):
+        if user is False:
+            self.client.force_authenticate(None)
+        else:
+            self.client.force_authenticate(user or self.alice)
+        expected = self.client.get(url)
+        response = self.get_async(url, user)
+        self.assertEqual(response.status_code, expected.status_code)
+        # liens de pagination : même route, préfixe /api/async/
+        self.assertEqual(json.loads(response.content.decode().replace("/api/async/", "/api/")), expected.json())
+        return response
+
+    def urls(self):
+        return (
+            reverse("project-list"), self.project_url(), self.issues_url(), self.issues_url(self.issue.pk),
+            self.comments_url(), self.comments_url(self.comment.pk),
+        )
+
+    def test_routes(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.assert_same(url).status_code, 200)
+
+    def test_permissions(self):
+        # carol ne contribue pas au projet : 404 sur le projet, 403 sur ses ressources
+        statuses = [self.assert_same(url, self.carol).status_code for url in self.urls()]
+        self.assertEqual(statuses, [200, 404, 403, 403, 403, 403])
+        self.assertEqual(self.assert_same(reverse("project-list"), self.carol).json()["count"], 0)
+        self.assertEqual(self.assert_same(self.issues_url(0)).status_code, 404)
+        self.assertEqual(self.assert_same(self.comments_url(uuid.uuid4())).status_code, 404)
+        response = self.assert_same(self.issues_url(), False)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], self.client.get(self.issues_url())["WWW-Authenticate"])
+
+    def test_pagination(self):
+        self.assertEqual(self.assert_same(self.issues_url() + "?limit=2&offset=1").json()["count"], 3)
+        url = self.comments_url() + "?pagination=cursor&limit=2"
+        pages = 0
+        while url:
+            data = self.assert_same(url).json()
+            pages += 1
+            url = data["next"] and data["next"].replace("/api/async/", "/api/")
+        self.assertEqual(pages, 2)
+
+    def test_filters(self):
+        queries = (
+            "?status=TODO", "?priority=LOW,HIGH", "?tag=BUG", "?assignee=me", "?assignee=none",
+            "?ordering=-priority", "?fields=id,title", "?expand=author,assignee",
+        )
+        for query in queries:
+            with self.subTest(query=query):
+                self.assert_same(self.issues_url() + query)
+                self.assert_same(self.issues_url() + query, self.bob)
+
+    @override_settings(SOFTDESK_FAST_LISTS={"ENABLED": True})
+    def test_fast_lists(self):
+        for url in self.urls()[::2]:
+            with self.subTest(url=url):
+                self.assert_same(url + "?limit=2")
+
+    def test_search(self):
+        # premier appel du processus : FTS5 détecté sans requête ORM synchrone
+        search.sqlite_has_fts5.cache_clear()
+        self.assertEqual(self.assert_same(self.issues_url() + "?q=issue").json()["count"], 3)
+        self.assertEqual(self.assert_same(self.comments_url() + "?q=comment").json()["count"], 3)
+
+
+@skipIf(connection.vendor != "sqlite" or not search.sqlite_has_fts5(), "index FTS5 propre à SQLite")
+class SearchIndexTests(SoftDeskTestCase):
+    """Après migrate, l'index FTS5 est en place : une reconstruction de table ne l'a pas effacé."""
+
+    def test_triggers_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT type, name, tbl_name FROM sqlite_master WHERE name LIKE 'core_%_fts%'")
+            objects = set(cursor.fetchall())
+        expected = {("table", f"core_{model}_fts", f"core_{model}_fts") for model in ("issue", "comment")}
+        expected |= {
+            ("trigger", f"core_{model}_fts_{event}", f"core_{model}")
+            for model in ("issue", "comment") for event in ("insert", "delete", "update")
+        }
+        self.assertLessEqual(expected, objects)
+
+    def test_rows_indexed(self):
+        # les fixtures passent par les triggers d'insertion
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM core_comment_fts")
+            self.assertEqual(cursor.fetchone()[0], Comment.objects.count())
+
+
+class ExportTests(SoftDeskTestCase):
+    """/projects/{pk}/export/ : issues et commentaires envoyés au fil de l'eau, NDJSON ou CSV."""
+
+    def export(self, query=""):
+        response = self.client.get(self.project_url("project-export") + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_contributors_only(self):
+        self.client.force_authenticate(self.carol)
+        response = self.client.get(self.project_url("project-export"))
+        self.assertEqual(response.status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.project_url("project-export")).status_code, 401)
+
+    def test_ndjson(self):
+        response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="project-{self.project.pk}.ndjson"')
+        lines = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([line["id"] for line in lines], [issue.pk for issue in self.issues])
+        # mêmes valeurs que l'API : dates au format des réponses, utilisateurs {id, username}
+        issue = self.client.get(self.issues_url(self.issues[1].pk)).json()
+        self.assertEqual(lines[1]["created_time"], issue["created_time"])
+        self.assertEqual(lines[1]["author"], {"id": self.alice.pk, "username": "alice"})
+        self.assertEqual(lines[1]["assignee"], {"id": self.bob.pk, "username": "bob"})
+        self.assertEqual(
+            [comment["id"] for comment in lines[1]["comments"]],
+            [str(pk) for pk in self.issues[1].comments.order_by("created_time", "id").values_list("pk", flat=True)],
+        )
+
+    def test_csv(self):
+        response, content = self.export("?format=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(tuple(rows[0]), CSV_COLUMNS)
+        records = [row[0] for row in rows[1:]]
+        self.assertEqual(records, ["issue", "comment", "comment", "comment"] * 3)
+        issue = dict(zip(CSV_COLUMNS, rows[1]))
+        self.assertEqual((issue["id"], issue["title"], issue["author"]), (str(self.issue.pk), "Issue 0", "bob"))
+        comment = dict(zip(CSV_COLUMNS, rows[2]))
+        self.assertEqual((comment["issue_id"], comment["author"], comment["title"]), (str(self.issue.pk), "alice", ""))
+
+    @override_settings(SOFTDESK_EXPORT_CHUNK_SIZE=2)
+    def test_streaming(self):
+        # la réponse part avant toute lecture des issues, lues ensuite par paquets
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.project_url("project-export"))
+        self.assertFalse([query["sql"] for query in queries if 'FROM "core_issue"' in query["sql"]])
+        with CaptureQueriesContext(connection) as queries:
+            lines = list(response.streaming_content)
+        self.assertEqual(len(lines), 3)
+        # commentaires préchargés paquet par paquet : 2 issues, puis 1
+        self.assertEqual(len([query for query in queries if 'FROM "core_comment"' in query["sql"]]), 2)
+
+
+class FastJSONTests(SimpleTestCase):
+    """core.fast_json : mêmes octets que JSONRenderer, mêmes valeurs et erreurs que JSONParser."""
+
+    values = {
+        "datetime": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+        "datetime_offset": datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone(timedelta(hours=2))),
+        "naive": datetime(2024, 1, 2, 3, 4, 5, 120000),
+        "date": date(2024, 1, 2),
+        "time": datetime(2024, 1, 2, 3, 4, 5, 678901).time(),
+        "duration": timedelta(days=1, seconds=5),
+        "uuid": uuid.UUID("0190f1c2-7a3b-7cde-8f01-23456789abcd"),
+        "decimal": Decimal("12.50"),
+        "lazy": gettext_lazy("This field is required."),
+        "text": "é ü 日本 \u2028 \u2029 \" \\ </script>",
+        "numbers": [0, -1, 2 ** 63 - 1, 1.5, 0.1, 1e16, 1e-05, 123456.789],
+        "big": 2 ** 70,
+        "nested": {"list": [None, True, False, {}, []], "tuple": (1, 2)},
+    }
+
+    def assert_same_bytes(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_values(self):
+        for name, value in self.values.items():
+            with self.subTest(name=name):
+                self.assert_same_bytes({name: value})
+                self.assert_same_bytes([value])
+        self.assert_same_bytes(self.values)
+
+    @skipIf(fast_json.orjson is None, "orjson n'est pas installé")
+    def test_orjson_path(self):
+        # les types de l'API passent par orjson ; les flottants écrits autrement et les grands entiers, non
+        for name in ("datetime", "naive", "date", "time", "uuid", "decimal", "lazy", "text", "nested"):
+            with self.subTest(name=name):
+                self.assertIsNotNone(fast_json.dumps({name: self.values[name]}))
+        for value in (1e16, 1e-05, 2 ** 70):
+            with self.subTest(value=value):
+                self.assertIsNone(fast_json.dumps([value]))
+
+    def test_error_payloads(self):
+        serializer = ProjectListSerializer(data={"type": "XX"})
+        self.assertFalse(serializer.is_valid())
+        self.assert_same_bytes(serializer.errors)
+        for exc in (NotFound(), PermissionDenied(), ValidationError({"assignee": ["Invalide."]})):
+            with self.subTest(exc=type(exc).__name__):
+                self.assert_same_bytes(exc.detail)
+                self.assert_same_bytes(exc.get_full_details())
+
+    def test_parser(self):
+        documents = (
+            b'{"title": "\\u00e9t\xc3\xa9", "n": 1.5e16, "big": 12345678901234567890, "items": [1, null]}',
+            b"[]", b'"text"',
+        )
+        for content in documents:
+            with self.subTest(content=content):
+                self.assertEqual(FastJSONParser().parse(BytesIO(content)), JSONParser().parse(BytesIO(content)))
+        for content in (b"{", b'{"a": NaN}', b"\xff"):
+            with self.subTest(content=content):
+                with self.assertRaises(ParseError) as fast:
+                    FastJSONParser().parse(BytesIO(content))
+                with self.assertRaises(ParseError) as stdlib:
+                    JSONParser().parse(BytesIO(content))
+                self.assertEqual(str(fast.exception.detail), str(stdlib.exception.detail))
+
+
+class ImportTests(SoftDeskTestCase):
+    """import_softdesk : dates du fichier conservées, déclaration des champs intacte."""
+
+    lines = (
+        '{"record": "project", "id": "P1", "title": "Import", "type": "BE", "author": "alice", '
+        '"contributors": ["bob"], "created_time": "2015-01-02T03:04:05Z"}',
+        '{"record": "issue", "id": "I1", "project": "P1", "title": "Dated", "tag": "BUG", "priority": "HIGH", '
+        '"author": "bob", "created_time": "2016-01-02T03:04:05Z"}',
+        '{"record": "issue", "id": "I2", "project": "P1", "title": "Undated", "tag": "BUG", "priority": "LOW", '
+        '"author": "bob"}',
+        '{"record": "comment", "issue": "I1", "description": "Old", "author": "alice", '
+        '"created_time": "2017-01-02T03:04:05Z"}',
+    )
+
+    def import_lines(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", encoding="utf-8") as file:
+            file.write("\n".join(self.lines) + "\n")
+            file.flush()
+            call_command("import_softdesk", file.name, stdout=StringIO(), stderr=StringIO())
+
+    def test_created_time_kept(self):
+        started = timezone.now()
+        self.import_lines()
+        project = Project.objects.get(title="Import")
+        self.assertEqual(project.created_time, datetime(2015, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+        issues = {issue.title: issue for issue in project.issues.all()}
+        self.assertEqual(issues["Dated"].created_time, datetime(2016, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+        self.assertGreaterEqual(issues["Undated"].created_time, started)
+        comment = issues["Dated"].comments.get()
+        self.assertEqual(comment.created_time, datetime(2017, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+
+    def test_auto_now_add_untouched(self):
+        # la déclaration du champ est partagée par tout le processus : l'import n'y touche pas
+        bulk_create = Issue.objects.bulk_create
+
+        def check(*args, **kwargs):
+            self.assertTrue(Issue._meta.get_field("created_time").auto_now_add)
+            self.assertTrue(Project._meta.get_field("created_time").auto_now_add)
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Issue.objects, "bulk_create", side_effect=check):
+            self.import_lines()
+        self.assertTrue(Issue.objects.filter(title="Dated").exists())
+
+    @override_settings(SOFTDESK_MEMBERSHIP_CACHE={"ENABLED": True, "TIMEOUT": 60, "MAX_ENTRIES": 1024})
+    def test_members_invalidated(self):
+        # carol, extérieure au projet, y devient contributrice en important une issue (--project)
+        membership._shared_cache = None
+        url = reverse("project-issues-list", kwargs={"project_pk": self.other_project.pk})
+        self.client.force_authenticate(self.carol)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        version = Project.objects.get(pk=self.other_project.pk).version
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", encoding="utf-8") as file:
+            file.write('{"record": "issue", "id": "I9", "title": "Moved", "tag": "BUG", "priority": "LOW", '
+                       '"author": "carol"}\n')
+            file.flush()
+            call_command(
+                "import_softdesk", file.name, project=self.other_project.pk, stdout=StringIO(), stderr=StringIO()
+            )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        project = Project.objects.get(pk=self.other_project.pk)
+        self.assertEqual((project.version, project.contributor_count, project.todo_issue_count), (version + 1, 2, 1))
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    """Réglages par défaut de Django tant que le profil "tuned" n'est pas demandé."""
+
+    def test_django_by_default(self):
+        database = database_from_env(Path("/srv"), {})
+        self.assertEqual(database, {"ENGINE": "django.db.backends.sqlite3", "NAME": Path("/srv/db.sqlite3")})
+
+    def test_tuned_opt_in(self):
+        database = database_from_env(Path("/srv"), {"DATABASE_PROFILE": "tuned"})
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertEqual(database["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertIn("PRAGMA journal_mode=WAL", database["OPTIONS"]["init_command"])
+
+
+class CounterFieldsSaveTests(SoftDeskTestCase):
+    """save() sans update_fields : ni compteurs, ni champs différés réécrits."""
+
+    def test_deferred_fields_not_loaded(self):
+        issue = Issue.objects.only("id", "title").get(pk=self.issue.pk)
+        issue.title = "Renamed"
+        # projet et statut relus une fois (compteurs), l'UPDATE du titre, la version du projet
+        with self.assertNumQueries(3):
+            issue.save()
+        issue = Issue.objects.get(pk=self.issue.pk)
+        self.assertEqual((issue.title, issue.tag, issue.comment_count), ("Renamed", "BUG", 3))
+
+    def test_deferred_fields_not_written(self):
+        issue = Issue.objects.defer("description").get(pk=self.issue.pk)
+        with CaptureQueriesContext(connection) as queries:
+            issue.save()
+        updates = [query["sql"] for query in queries if query["sql"].startswith('UPDATE "core_issue"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"description"', updates[0])
+        self.assertNotIn('"comment_count"', updates[0])
+
+
+class ReverseRelationWriteTests(SoftDeskTestCase):
+    """Les relations inverses des détails ne déplacent pas de lignes d'un projet / d'une issue à l'autre."""
+
+    def test_project_issues_and_contributors(self):
+        other_issue = Issue.objects.create(
+            title="Elsewhere", tag="BUG", priority="LOW", project=self.other_project, author=self.alice
+        )
+        other_contributor = Contributor.objects.get(project=self.other_project, user=self.alice)
+        version = Project.objects.get(pk=self.other_project.pk).version
+        data = {
+            "title": "API", "description": "Backend", "type": "BE",
+            "issues": [other_issue.pk], "contributors": [other_contributor.pk],
+        }
+        response = self.client.put(self.project_url(), data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["issues"]), 3)
+        self.assertEqual(Issue.objects.get(pk=other_issue.pk).project_id, self.other_project.pk)
+        self.assertEqual(Contributor.objects.get(pk=other_contributor.pk).project_id, self.other_project.pk)
+        self.assertEqual(Project.objects.get(pk=self.other_project.pk).version, version)
+        self.assertEqual(recount(), (0, 0))
+
+    def test_issue_comments(self):
+        # issues[1] est une issue d'alice ; le commentaire appartient à issues[0]
+        other_comment = Comment.objects.filter(issue=self.issue).first()
+        data = {"comments": [str(other_comment.pk)]}
+        response = self.client.patch(self.issues_url(self.issues[1].pk), data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Comment.objects.get(pk=other_comment.pk).issue_id, self.issue.pk)
+        self.assertEqual(recount(), (0, 0))
@@ -0,0 +1,165 @@
+# core/timing.py
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+from django.conf import settings
+
+TIMER_ATTR = "_softdesk_timer"
+
+# ordre des métriques de l'en-tête Server-Timing
+PHASES = ("auth", "perm", "queryset", "serialize", "render", "other")
+
+
+def get_config():
+    return getattr(settings, "SOFTDESK_SERVER_TIMING", None) or {}
+
+
+def get_timer(request):
+    """Chronomètre de la requête (HttpRequest ou Request DRF), None si l'instrumentation est inactive."""
+    return getattr(getattr(request, "_request", request), TIMER_ATTR, None)
+
+
+def phase(request, name):
+    timer = get_timer(request)
+    if timer is None:
+        return nullcontext()
+    return timer.phase(name)
+
+
+class RequestTimer:
+    """
+    Durées et requêtes SQL d'une requête HTTP, par phase.
+
+    Les phases s'imbriquent (get_object appelle check_object_permissions) : la durée
+    d'une phase exclut celle des phases qu'elle contient, et chaque requête SQL est
+    attribuée à la phase la plus interne. Une requête est « dupliquée » lorsque le même
+    SQL avec les mêmes paramètres a déjà été exécuté pendant la requête HTTP.
+    """
+
+    def __init__(self, max_captured=200):
+        self.started = perf_counter()
+        self.total = None
+        self.phases = {}
+        self.queries = []
+        self.max_captured = max_captured
+        self._stack = []
+        self._seen = set()
+
+    def get_phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = {"dur": 0.0, "db": 0.0, "queries": 0, "duplicates": 0}
+        return self.phases[name]
+
+    @contextmanager
+    def phase(self, name):
+        # [nom, début, durée des phases imbriquées]
+        frame = [name, perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = perf_counter() - frame[1]
+            self.get_phase(name)["dur"] += elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def record_query(self, execute, sql, params, many, context):
+        """Wrapper d'exécution (connection.execute_wrapper) qui compte les requêtes."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            name = self._stack[-1][0] if self._stack else "other"
+            stats = self.get_phase(name)
+            stats["queries"] += 1
+            stats["db"] += elapsed
+            key = (sql, repr(params))
+            if key in self._seen:
+                stats["duplicates"] += 1
+            else:
+                self._seen.add(key)
+            if len(self.queries) < self.max_captured:
+                self.queries.append({"phase": name, "sql": sql, "ms": round(elapsed * 1000, 3)})
+
+    def stop(self):
+        self.total = perf_counter() - self.started
+        # temps passé hors des phases instrumentées (middlewares, routage, négociation)
+        other = self.get_phase("other")
+        other["dur"] += max(0.0, self.total - sum(stats["dur"] for stats in self.phases.values()))
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total * 1000, 3),
+            "queries": sum(stats["queries"] for stats in self.phases.values()),
+            "duplicates": sum(stats["duplicates"] for stats in self.phases.values()),
+            "phases": {
+                name: {
+                    "ms": round(stats["dur"] * 1000, 3),
+                    "db_ms": round(stats["db"] * 1000, 3),
+                    "queries": stats["queries"],
+                    "duplicates": stats["duplicates"],
+                }
+                for name, stats in self.phases.items()
+            },
+        }
+
+    def header(self):
+        """Valeur de l'en-tête Server-Timing : une métrique par phase, puis le total."""
+        metrics = []
+        for name in sorted(self.phases, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES)):
+            stats = self.phases[name]
+            metrics.append(
+                f'{name};dur={stats["dur"] * 1000:.3f};'
+                f'desc="{stats["queries"]} queries, {stats["duplicates"]} duplicates"'
+            )
+        metrics.append(f"total;dur={self.total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class TimedViewMixin:
+    """
+    Découpe le traitement d'une vue DRF en phases pour core.middleware.ServerTimingMiddleware :
+    auth (authentification JWT), perm (core.permissions), queryset (pagination, get_object),
+    serialize (reste du handler : to_representation et les requêtes paresseuses qu'il
+    déclenche) et render. Sans middleware actif, les phases ne coûtent rien.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with phase(request, "serialize"):
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with phase(request, "auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with phase(request, "perm"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with phase(request, "perm"):
+            super().check_object_permissions(request, obj)
+
+    def paginate_queryset(self, queryset):
+        with phase(self.request, "queryset"):
+            return super().paginate_queryset(queryset)
+
+    def get_object(self):
+        with phase(self.request, "queryset"):
+            return super().get_object()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        timer = get_timer(request)
+        if timer is not None and callable(getattr(response, "render", None)):
+            # le rendu a lieu après la vue, dans le handler de Django
+            render = response.render
+
+            def timed_render():
+                with timer.phase("render"):
+                    return render()
+
+            response.render = timed_render
+        return response
@@ -0,0 +1,74 @@
+# core/uuids.py
+"""
+Clés UUID version 7 (RFC 9562) : horodatage Unix en millisecondes sur les 48 premiers
+bits, puis la fraction de milliseconde sur les 12 bits rand_a (méthode 3 de la RFC,
+précision à la microseconde) et 62 bits aléatoires.
+
+Tirée de l'horodatage de la ligne (created_time), la clé d'une nouvelle ligne est
+croissante comme lui : les insertions se font en fin d'index. Les clés existantes
+(UUID4) ne sont jamais réécrites ; lectures et pagination restent triées sur
+(created_time, id).
+"""
+import os
+import uuid
+from datetime import datetime, timezone
+
+from django.db import models
+from django.db.models.signals import post_init
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+RANDOM_BITS = (1 << 62) - 1
+
+
+def uuid7_prefix(when):
+    """64 premiers bits de l'UUIDv7 de when : millisecondes, version et fraction de milliseconde."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    delta = when - EPOCH
+    millis, micros = divmod((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds, 1000)
+    if not 0 <= millis < 1 << 48:
+        raise ValueError(f"{when.isoformat()} is outside the UUIDv7 time range.")
+    # 1000 microsecondes sur 4096 valeurs : l'ordre des microsecondes est conservé
+    return millis << 16 | 0x7 << 12 | micros * 4096 // 1000
+
+
+def uuid7(when):
+    return uuid.UUID(int=uuid7_prefix(when) << 64 | 0b10 << 62 | int.from_bytes(os.urandom(8)) & RANDOM_BITS)
+
+
+class TimeOrderedUUIDField(models.UUIDField):
+    """
+    Clé primaire UUIDv7 calculée depuis time_field dès la création de l'instance, comme
+    un default (bulk_create la reçoit donc déjà), ou à défaut à l'insertion : time_field
+    doit être renseigné avant (default=timezone.now plutôt qu'auto_now_add). Une clé
+    donnée explicitement est gardée telle quelle.
+    """
+
+    def __init__(self, *args, time_field="created_time", **kwargs):
+        self.time_field = time_field
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.time_field != "created_time":
+            kwargs["time_field"] = self.time_field
+        return name, path, args, kwargs
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        # comme ImageField : pas de signal pour les modèles abstraits
+        if not cls._meta.abstract:
+            post_init.connect(self.set_key, sender=cls)
+
+    def set_key(self, instance, **kwargs):
+        # instance lue en base : la clé est déjà là ; created_time différé : rien à tirer
+        when = instance.__dict__.get(self.time_field)
+        if instance.__dict__.get(self.attname) is None and when is not None:
+            setattr(instance, self.attname, uuid7(when))
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if add and value is None:
+            value = uuid7(getattr(model_instance, self.time_field))
+            setattr(model_instance, self.attname, value)
+        return value
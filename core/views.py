@@ -1,9 +1,23 @@
 # core/views.py
+from django.db.models import F, Prefetch
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.exceptions import ValidationError, PermissionDenied, MethodNotAllowed
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
+from core import membership
+from core import response_cache
+from core.bulk import BulkContributorMixin, BulkIssueMixin
+from core.conditional import ConditionalGetMixin
+from core.export import ProjectExportMixin
+from core.fast_lists import CommentRowSerializer, FastListMixin, IssueRowSerializer, ProjectRowSerializer
+from core.filters import filter_issues, is_user_relative
+from core.response_cache import CachedResponseMixin
+from core.pagination import CreatedTimePagination
+from core.search import get_search_terms, search_comments, search_issues
+from core.shaping import is_expanded, is_wanted, shape_queryset
+from core.timing import TimedViewMixin
 from core.models import Contributor, Project, Issue, Comment
 from core.serializers import (
     ProjectListSerializer, ProjectDetailSerializer,
@@ -11,7 +25,17 @@ from core.serializers import (
     IssueListSerializer, IssueDetailSerializer,
     CommentListSerializer, CommentDetailSerializer
 )
-from core.permissions import IsProjectContributor, IsAuthorOrReadOnly, IsProjectAuthorForContributors
+from core.permissions import (
+    IsProjectContributor, IsAuthorOrReadOnly, IsProjectAuthorForContributors, ProjectAccessMixin
+)
+from users import authentication
+from users.authentication import get_full_user
+
+# colonnes lues directement sur le modèle par les serializers (cf. core.shaping.shape_queryset)
+PROJECT_COLUMNS = ("title", "description", "type", "created_time")
+PROJECT_COUNTERS = ("contributor_count", "comment_count")
+ISSUE_COLUMNS = ("title", "tag", "priority", "status", "created_time", "comment_count")
+USER_RELATION = ("username",)
 
 
 class MultipleSerializerMixin:
@@ -25,26 +49,68 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
+class ProjectViewSet(
+    TimedViewMixin, ProjectExportMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin,
+    ProjectAccessMixin, MultipleSerializerMixin, ModelViewSet
+):
     serializer_class = ProjectListSerializer
     detail_serializer_class = ProjectDetailSerializer
+    row_serializer_class = ProjectRowSerializer
     permission_classes = [IsAuthenticated, IsProjectContributor, IsAuthorOrReadOnly]
+    pagination_class = CreatedTimePagination
+    # la liste couvre plusieurs projets : seul le détail est versionné (ETag, cache)
+    project_kwarg = "pk"
+    project_field = "pk"
+    etag_actions = ("retrieve",)
+    cache_actions = ("retrieve",)
 
     def get_queryset(self):
         user = self.request.user
 
-        queryset = Project.objects.select_related("author").prefetch_related("contributors", "issues")
+        queryset = Project.objects.all()
+        if self.action == "list":
+            # ProjectListSerializer n'utilise ni les contributeurs ni les issues
+            queryset = shape_queryset(
+                queryset, self.request, PROJECT_COLUMNS, {"author": ("username",)}, always=("created_time",)
+            )
+        elif self.action == "retrieve":
+            issue_counts = Project.ISSUE_COUNT_FIELDS.values() if is_wanted(self.request, "issue_counts") else ()
+            queryset = shape_queryset(
+                queryset, self.request, PROJECT_COLUMNS + PROJECT_COUNTERS, {"author": ("username",)},
+                always=tuple(issue_counts)
+            )
+            # ProjectDetailSerializer lit contributor.user.username et issue.title
+            if is_wanted(self.request, "contributors"):
+                contributors = Contributor.objects.only("id", "project_id")
+                if is_expanded(self.request, "contributors"):
+                    contributors = Contributor.objects.select_related("user").only(
+                        "id", "project_id", "user_id", "user__username"
+                    )
+                queryset = queryset.prefetch_related(Prefetch("contributors", queryset=contributors))
+            if is_wanted(self.request, "issues"):
+                issues = Issue.objects.only("id", "project_id")
+                if is_expanded(self.request, "issues"):
+                    issues = Issue.objects.only("id", "project_id", "title")
+                queryset = queryset.prefetch_related(Prefetch("issues", queryset=issues))
+        elif self.action == "export":
+            # seul le contrôle d'accès lit le projet (cf. core.export)
+            queryset = queryset.only("id", "author_id")
+        else:
+            queryset = queryset.select_related("author")
         # si l'utilisateur est un superutilisateur, on lui donne accès à tous les projets
         if user.is_superuser:
             return queryset
         # filtre les projets dont l'utilisateur est contributeur
-        return queryset.filter(contributors__user=user)
+        return queryset.filter(contributors__user_id=user.id)
 
     def perform_create(self, serializer):
         # crée un projet et l'associe à l'utilisateur en tant que créateur
-        project = serializer.save(author=self.request.user)
+        project = serializer.save(author=get_full_user(self.request))
         # crée un contributeur pour le projet
-        Contributor.objects.get_or_create(user=self.request.user, project=project)
+        _, created = Contributor.objects.get_or_create(user_id=project.author_id, project=project)
+        # compteur incrémenté en base par le signal : la réponse le reflète
+        if created:
+            project.contributor_count += 1
 
     def destroy(self, request, *args, **kwargs):
         # récupère le projet à supprimer
@@ -64,15 +130,29 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
         )
 
 
-class ContributorViewSet(MultipleSerializerMixin, ModelViewSet):
+class ContributorViewSet(
+    TimedViewMixin, BulkContributorMixin, ConditionalGetMixin, MultipleSerializerMixin, ModelViewSet
+):
     serializer_class = ContributorListSerializer
     detail_serializer_class = ContributorDetailSerializer
     permission_classes = [IsAuthenticated, IsProjectContributor, IsProjectAuthorForContributors]
+    pagination_class = CreatedTimePagination
 
     def get_queryset(self):
         # /projects/{project_pk}/contributors/
         project_id = self.kwargs.get('project_pk')
-        queryset = Contributor.objects.select_related("user", "project")
+        queryset = Contributor.objects.all()
+        if self.action == "list":
+            queryset = shape_queryset(
+                queryset, self.request, ("created_time",), {"user": USER_RELATION}, always=("created_time",)
+            )
+        elif self.action == "retrieve":
+            queryset = shape_queryset(
+                queryset, self.request, ("created_time",),
+                {"user": USER_RELATION, "project": ("title",)}, always=("project",)
+            )
+        else:
+            queryset = queryset.select_related("user", "project")
         return queryset.filter(project_id=project_id) if project_id else queryset.none()
 
     def perform_create(self, serializer):
@@ -113,27 +193,63 @@ class ContributorViewSet(MultipleSerializerMixin, ModelViewSet):
         )
 
 
-class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
+class IssueViewSet(
+    TimedViewMixin, BulkIssueMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin, ProjectAccessMixin,
+    MultipleSerializerMixin, ModelViewSet
+):
     serializer_class = IssueListSerializer
     detail_serializer_class = IssueDetailSerializer
+    row_serializer_class = IssueRowSerializer
     permission_classes = [IsAuthenticated, IsProjectContributor, IsAuthorOrReadOnly]
+    pagination_class = CreatedTimePagination
+    cache_actions = ("list",)
+
+    def depends_on_user(self, request):
+        # ?assignee=me : cache et ETag propres à chaque utilisateur
+        return self.action == "list" and is_user_relative(request)
 
     def get_queryset(self):
         # /projects/{project_pk}/issues/
         project_id = self.kwargs.get('project_pk')
-        queryset = Issue.objects.select_related("author", "assignee", "project")
-        return queryset.filter(project_id=project_id) if project_id else queryset.none()
+        queryset = Issue.objects.all()
+        relations = {"author": USER_RELATION, "assignee": USER_RELATION}
+        if self.action == "list":
+            queryset = shape_queryset(queryset, self.request, ISSUE_COLUMNS, relations, always=("created_time",))
+        elif self.action == "retrieve":
+            queryset = shape_queryset(
+                queryset, self.request, ISSUE_COLUMNS + ("description",),
+                {**relations, "project": ("title",)}, always=("project",)
+            )
+            if is_wanted(self.request, "comments"):
+                columns = ("id", "issue_id")
+                if is_expanded(self.request, "comments"):
+                    columns += ("description",)
+                queryset = queryset.prefetch_related(Prefetch("comments", queryset=Comment.objects.only(*columns)))
+        else:
+            queryset = queryset.select_related("author", "assignee", "project")
+        if not project_id:
+            return queryset.none()
+        queryset = queryset.filter(project_id=project_id)
+        if self.action == "list":
+            terms = get_search_terms(self.request)
+            if terms is not None:
+                # ?q= : classement par pertinence (core.search)
+                queryset = search_issues(queryset, terms, project_id)
+            # ?status=, ?assignee=me, ?ordering=-priority… (core.filters)
+            queryset = filter_issues(queryset, self.request)
+        return queryset
 
     def perform_create(self, serializer):
         project_id = self.kwargs.get('project_pk')
         if not project_id:
             raise ValidationError("Project context is required.")
 
+        author = get_full_user(self.request)
         assignee = serializer.validated_data.get("assignee")
         if assignee is None:
-            assignee = self.request.user
+            assignee = author
 
-        serializer.save(project_id=project_id, author=self.request.user, assignee=assignee)
+        serializer.save(project_id=project_id, author=author, assignee=assignee)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -150,20 +266,46 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
         )
 
 
-class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
+class CommentViewSet(
+    TimedViewMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin, ProjectAccessMixin,
+    MultipleSerializerMixin, ModelViewSet
+):
     serializer_class = CommentListSerializer
     detail_serializer_class = CommentDetailSerializer
+    row_serializer_class = CommentRowSerializer
     permission_classes = [IsAuthenticated, IsProjectContributor, IsAuthorOrReadOnly]
+    pagination_class = CreatedTimePagination
+    cache_actions = ("list",)
 
     def get_queryset(self):
         # /projects/{project_pk}/issues/{issue_pk}/comments/
         project_id = self.kwargs.get('project_pk')
         issue_id = self.kwargs.get('issue_pk')
-        queryset = Comment.objects.select_related("author", "issue", "issue__project")
+        queryset = Comment.objects.all()
+        if self.action == "list":
+            queryset = shape_queryset(
+                queryset, self.request, ("description", "created_time"), {"author": USER_RELATION},
+                always=("created_time",)
+            )
+        elif self.action == "retrieve":
+            queryset = shape_queryset(
+                queryset, self.request, ("description", "created_time"),
+                {"author": USER_RELATION, "issue": ("title", "project_id")}, always=("issue",)
+            )
+        else:
+            # CommentDetailSerializer lit issue.title et issue.project_id
+            queryset = queryset.select_related("author", "issue")
+        if self.action != "list":
+            # projet de l'issue, lu par le contrôle d'accès (core.permissions) sans charger l'issue
+            queryset = queryset.annotate(project_id=F("issue__project_id"))
         if issue_id:
             queryset = queryset.filter(issue_id=issue_id)
         if project_id:
             queryset = queryset.filter(issue__project_id=project_id)
+        if self.action == "list" and issue_id:
+            terms = get_search_terms(self.request)
+            if terms is not None:
+                queryset = search_comments(queryset, terms, issue_id)
         return queryset
 
     def perform_create(self, serializer):
@@ -175,7 +317,7 @@ class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
             issue = Issue.objects.get(id=issue_id, project_id=project_id)
         except Issue.DoesNotExist:
             raise ValidationError("Issue not found for this project.")
-        serializer.save(issue=issue, author=self.request.user)
+        serializer.save(issue=issue, author=get_full_user(self.request))
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -195,3 +337,15 @@ class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
             },
             status=status.HTTP_200_OK
         )
+
+
+class MetricsView(TimedViewMixin, APIView):
+    """Compteurs des caches en mémoire du processus, réservés aux administrateurs."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "membership": membership.stats.as_dict(),
+            "responses": response_cache.stats.as_dict(),
+            "token_versions": authentication.stats.as_dict(),
+        })
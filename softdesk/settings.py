@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 
+from softdesk.database import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # en premier pour mesurer toute la chaîne ; inactif sans SOFTDESK_SERVER_TIMING["ENABLED"]
+    "core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,11 +82,29 @@ WSGI_APPLICATION = "softdesk.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Profil (URL, connexions persistantes, pragmas SQLite, pool PostgreSQL) décrit par les
+# variables d'environnement DATABASE_* : voir softdesk/database.py
+
 DATABASES = {
+    "default": database_from_env(BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # réponses de lecture des projets (core.response_cache) ; FileBasedCache,
+    # Memcached ou Redis peuvent être utilisés pour un cache partagé entre processus
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "softdesk-responses",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
 }
 
 
@@ -105,6 +127,34 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Profil de hachage des mots de passe (users.hashers) et pool dans lequel les vues asynchrones
+# l'exécutent (users.hashing.ahash_password) : HASHER "pbkdf2" (défaut de Django), "scrypt" ou "argon2" (argon2-cffi).
+# Les hachés produits par les autres algorithmes restent vérifiés, puis mis à jour à la connexion.
+SOFTDESK_PASSWORD_HASHING = {
+    "HASHER": "pbkdf2",
+    # "thread" ou "process" ; MAX_WORKERS : nombre de CPU par défaut
+    "POOL": "thread",
+    "MAX_WORKERS": None,
+    "SCRYPT": {"WORK_FACTOR": 2 ** 14, "BLOCK_SIZE": 8, "PARALLELISM": 1, "MAXMEM": 0},
+    "ARGON2": {"TIME_COST": 2, "MEMORY_COST": 102400, "PARALLELISM": 8},
+}
+
+PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "scrypt": "users.hashers.ScryptPasswordHasher",
+    "argon2": "users.hashers.Argon2PasswordHasher",
+}
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[SOFTDESK_PASSWORD_HASHING["HASHER"]],
+    *(
+        hasher for name, hasher in PASSWORD_HASHER_PROFILES.items()
+        if name != SOFTDESK_PASSWORD_HASHING["HASHER"]
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -132,11 +182,93 @@ AUTH_USER_MODEL = "users.User"
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('users.authentication.StatelessJWTAuthentication',),
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAuthenticated',),
+    # JSON rendu et lu par orjson quand il est installé (extra "orjson"), mêmes octets
+    # que rest_framework.renderers.JSONRenderer / parsers.JSONParser (core.fast_json)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Mode de pagination par défaut des listes de core : "offset" (limit/offset) ou "cursor".
+# Le client peut toujours choisir via ?pagination= ou l'en-tête X-Pagination.
+SOFTDESK_DEFAULT_PAGINATION = "offset"
+
+# Nombre d'éléments de chaque relation embarqués dans le détail d'un utilisateur ;
+# les listes complètes sont servies par /api/users/{id}/<relation>/.
+SOFTDESK_USER_EMBED_LIMIT = 10
+
+# Nombre maximal d'éléments par requête sur les endpoints en masse (…/bulk/)
+SOFTDESK_BULK_MAX_ITEMS = 5000
+
+# Issues lues par paquet lors de l'export d'un projet (/api/projects/{id}/export/)
+SOFTDESK_EXPORT_CHUNK_SIZE = 500
+
+# Listes de projets, d'issues et de commentaires rendues sans les serializers DRF
+# (core.fast_lists) : mêmes réponses, lues par values_list().
+SOFTDESK_FAST_LISTS = {
+    "ENABLED": False,
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+}
+
+# Cache partagé des projets de chaque utilisateur (core.membership).
+# Désactivé : les projets sont tout de même chargés une seule fois par requête.
+SOFTDESK_MEMBERSHIP_CACHE = {
+    "ENABLED": False,
+    # cache en mémoire du processus : l'invalidation (contributeur ajouté ou retiré, utilisateur
+    # supprimé) est immédiate dans le processus qui écrit, mais les autres workers gardent
+    # l'ancienne liste jusqu'à TIMEOUT secondes. Un contributeur retiré peut donc y garder
+    # l'accès au projet pendant au plus TIMEOUT secondes.
+    "TIMEOUT": 60,
+    "MAX_ENTRIES": 1024,
+}
+
+# Cache des réponses des listes d'issues / commentaires et du détail d'un projet
+# (core.response_cache). Les entrées sont indexées par la version du projet.
+SOFTDESK_RESPONSE_CACHE = {
+    "ENABLED": False,
+    "CACHE_ALIAS": "responses",
+    "TIMEOUT": 300,
+}
+
+# Authentification sans lecture de l'utilisateur (users.authentication) : les jetons
+# portent is_superuser et une version, comparée à un cache en mémoire du processus.
+# Une révocation faite par un autre processus est vue au plus TIMEOUT secondes plus tard.
+SOFTDESK_STATELESS_JWT = {
+    "ENABLED": False,
+    "TIMEOUT": 60,
+    "MAX_ENTRIES": 10000,
+}
+
+# Instrumentation des requêtes (core.middleware.ServerTimingMiddleware) : en-tête
+# Server-Timing par phase et journaux JSON sur les loggers "softdesk.timing".
+SOFTDESK_SERVER_TIMING = {
+    "ENABLED": False,
+    # échantillonnage des requêtes lentes, avec leurs requêtes SQL
+    "SLOW_REQUEST_MS": 500,
+    "SLOW_SAMPLE_RATE": 1.0,
+    "MAX_CAPTURED_QUERIES": 200,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "softdesk": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
 }
@@ -2,8 +2,9 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_nested import routers
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from core.views import ContributorViewSet, ProjectViewSet, IssueViewSet, CommentViewSet
-from users.views import UserViewSet, RegisterView
+from core import async_views
+from core.views import ContributorViewSet, ProjectViewSet, IssueViewSet, CommentViewSet, MetricsView
+from users.views import UserViewSet, RegisterView, register_async
 
 router = routers.SimpleRouter()
 router.register('projects', ProjectViewSet, basename='project')
@@ -20,8 +21,27 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
     path('api/auth/register/', RegisterView.as_view(), name='auth-register'),
+    path('api/async/auth/register/', register_async, name='auth-register-async'),
     path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+
+    # lectures asynchrones (ASGI) : mêmes réponses que les routes list / retrieve correspondantes
+    path('api/async/projects/', async_views.project_list, name='async-project-list'),
+    path('api/async/projects/<pk>/', async_views.project_detail, name='async-project-detail'),
+    path('api/async/projects/<project_pk>/issues/', async_views.issue_list, name='async-project-issues-list'),
+    path(
+        'api/async/projects/<project_pk>/issues/<pk>/', async_views.issue_detail,
+        name='async-project-issues-detail'
+    ),
+    path(
+        'api/async/projects/<project_pk>/issues/<issue_pk>/comments/', async_views.comment_list,
+        name='async-issue-comments-list'
+    ),
+    path(
+        'api/async/projects/<project_pk>/issues/<issue_pk>/comments/<pk>/', async_views.comment_detail,
+        name='async-issue-comments-detail'
+    ),
 
     path('api/', include(router.urls)),
     path('api/', include(projects_router.urls)),
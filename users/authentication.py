@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import models as jwt_models
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.cache import CacheStats, LRUCache
+
+# claims ajoutés aux jetons : rôle de l'utilisateur et version de ses jetons
+CLAIMS = ("is_superuser", "is_staff")
+VERSION_CLAIM = "token_version"
+# utilisateur supprimé ou désactivé
+REVOKED = -1
+
+stats = CacheStats()
+_versions = None
+
+
+def get_config():
+    return getattr(settings, "SOFTDESK_STATELESS_JWT", None) or {}
+
+
+def _get_versions():
+    global _versions
+    if _versions is None:
+        config = get_config()
+        _versions = LRUCache(max_entries=config.get("MAX_ENTRIES", 10000), timeout=config.get("TIMEOUT", 60))
+    return _versions
+
+
+def _cached_version(user_id):
+    version = _get_versions().get(user_id)
+    if version is not None:
+        stats.record_hit()
+    return version
+
+
+def _remember_version(user_id, version):
+    stats.record_miss()
+    version = REVOKED if version is None else version
+    _get_versions().set(user_id, version)
+    return version
+
+
+def _version_queryset(user_id):
+    return get_user_model().objects.filter(pk=user_id, is_active=True).values_list("token_version", flat=True)
+
+
+def get_token_version(user_id):
+    """Version courante des jetons d'un utilisateur (REVOKED s'il est supprimé ou inactif)."""
+    version = _cached_version(user_id)
+    if version is None:
+        version = _remember_version(user_id, _version_queryset(user_id).first())
+    return version
+
+
+async def aget_token_version(user_id):
+    version = _cached_version(user_id)
+    if version is None:
+        version = _remember_version(user_id, await _version_queryset(user_id).afirst())
+    return version
+
+
+def forget_user(user_id):
+    """Oublie la version mémorisée d'un utilisateur (modification, suppression)."""
+    _get_versions().delete(user_id)
+
+
+def get_full_user(request):
+    """Instance User de l'utilisateur de la requête, chargée seulement en mode sans état."""
+    user = request.user
+    return user.user if isinstance(user, TokenUser) else user
+
+
+class VersionedRefreshToken(RefreshToken):
+    """Jeton portant is_superuser, is_staff et la version des jetons de l'utilisateur."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenUser(jwt_models.TokenUser):
+    """
+    Utilisateur reconstruit depuis les claims du jeton : id, is_superuser et is_staff
+    suffisent aux permissions ; l'instance User n'est chargée que si une vue la demande.
+    """
+
+    @cached_property
+    def id(self):
+        # le claim est une chaîne (RefreshToken.for_user) : même type que User.id
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def user(self):
+        return get_user_model().objects.get(pk=self.id)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT sans lecture de l'utilisateur à chaque requête
+    (SOFTDESK_STATELESS_JWT["ENABLED"]) : la version portée par le jeton est comparée
+    à celle mémorisée pour l'utilisateur (cache en mémoire du processus, TIMEOUT
+    secondes). Changer le mot de passe, le rôle ou l'état actif d'un utilisateur
+    incrémente sa version et révoque ses jetons.
+
+    Désactivée, l'utilisateur est chargé comme avec JWTAuthentication (et sa version
+    vérifiée) ; un jeton émis sans version est traité de la même façon.
+    """
+
+    def is_stateless(self, validated_token):
+        return get_config().get("ENABLED", False) and VERSION_CLAIM in validated_token
+
+    def check_version(self, validated_token, version):
+        if VERSION_CLAIM in validated_token and validated_token[VERSION_CLAIM] != version:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        user = TokenUser(validated_token)
+        try:
+            user.id
+        except ValidationError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return user
+
+    def get_user(self, validated_token):
+        if not self.is_stateless(validated_token):
+            user = super().get_user(validated_token)
+            # l'utilisateur est chargé de toute façon : la révocation est vérifiée sans coût
+            self.check_version(validated_token, user.token_version)
+            return user
+        user = self.get_token_user(validated_token)
+        self.check_version(validated_token, get_token_version(user.id))
+        return user
+
+    async def aauthenticate(self, request):
+        """Variante asynchrone de authenticate (vues de core.async_views)."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if self.is_stateless(validated_token):
+            user = self.get_token_user(validated_token)
+            self.check_version(validated_token, await aget_token_version(user.id))
+            return user
+
+        # mêmes contrôles que JWTAuthentication.get_user
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        self.check_version(validated_token, user.token_version)
+        return user
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def get_params(name):
+    return ((getattr(settings, "SOFTDESK_PASSWORD_HASHING", None) or {}).get(name)) or {}
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """scrypt paramétré par SOFTDESK_PASSWORD_HASHING["SCRYPT"] ; les hachés existants restent vérifiables."""
+
+    @property
+    def work_factor(self):
+        return get_params("SCRYPT").get("WORK_FACTOR", hashers.ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return get_params("SCRYPT").get("BLOCK_SIZE", hashers.ScryptPasswordHasher.block_size)
+
+    @property
+    def maxmem(self):
+        # 0 : limite d'OpenSSL (32 Mio), à relever avec WORK_FACTOR × BLOCK_SIZE
+        return get_params("SCRYPT").get("MAXMEM", hashers.ScryptPasswordHasher.maxmem)
+
+    @property
+    def parallelism(self):
+        return get_params("SCRYPT").get("PARALLELISM", hashers.ScryptPasswordHasher.parallelism)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 (argon2-cffi) paramétré par SOFTDESK_PASSWORD_HASHING["ARGON2"]."""
+
+    @property
+    def time_cost(self):
+        return get_params("ARGON2").get("TIME_COST", hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return get_params("ARGON2").get("MEMORY_COST", hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return get_params("ARGON2").get("PARALLELISM", hashers.Argon2PasswordHasher.parallelism)
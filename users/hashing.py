@@ -0,0 +1,65 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_config():
+    return getattr(settings, "SOFTDESK_PASSWORD_HASHING", None) or {}
+
+
+def _init_worker(settings_module):
+    # processus lancés par "spawn" : Django doit être configuré avant make_password
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def get_executor():
+    """
+    Pool borné (SOFTDESK_PASSWORD_HASHING) dans lequel ahash_password hache les mots de
+    passe : au plus MAX_WORKERS hachages simultanés, quel que soit le nombre de requêtes.
+    Threads par défaut (hashlib relâche le GIL pour PBKDF2 et scrypt), processus sinon.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                config = get_config()
+                max_workers = config.get("MAX_WORKERS") or os.cpu_count() or 1
+                if config.get("POOL", "thread") == "process":
+                    _executor = ProcessPoolExecutor(
+                        max_workers=max_workers, initializer=_init_worker,
+                        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "softdesk.settings"),)
+                    )
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hashing")
+    return _executor
+
+
+def hash_password(raw_password):
+    """
+    make_password dans le thread appelant : l'attendre dans le pool ne libérerait rien,
+    le thread resterait bloqué jusqu'au résultat.
+    """
+    return make_password(raw_password)
+
+
+async def ahash_password(raw_password):
+    """make_password exécuté dans le pool sans bloquer la boucle d'événements."""
+    return await asyncio.wrap_future(get_executor().submit(make_password, raw_password))
+
+
+def set_password(user, raw_password, encoded=None):
+    """
+    Équivalent de user.set_password, le haché pouvant être calculé d'avance
+    (encoded, cf. ahash_password). _password déclenche password_changed au save().
+    """
+    user.password = encoded if encoded is not None else hash_password(raw_password)
+    user._password = raw_password
@@ -40,11 +40,33 @@ class User(AbstractUser):
     can_be_contacted = models.BooleanField(default=False)
     can_data_be_shared = models.BooleanField(default=False)
     created_time = models.DateTimeField(auto_now_add=True)
+    # incrémentée lorsqu'un champ de TOKEN_FIELDS change : révoque les jetons émis
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # champs portés par les jetons ou conditionnant leur validité (cf. users.authentication)
+    TOKEN_FIELDS = ("password", "is_active", "is_staff", "is_superuser")
 
     objects = UserManager()
 
     class Meta:
         ordering = [models.functions.Lower("username")]
+        indexes = [
+            models.Index(models.functions.Lower("username"), name="user_username_lower_idx"),
+        ]
 
     def __str__(self):
         return self.username
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        fields = [
+            name for name in self.TOKEN_FIELDS
+            if update_fields is None or name in update_fields
+        ]
+        if not self._state.adding and fields:
+            current = type(self)._base_manager.filter(pk=self.pk).values(*fields).first()
+            if current is not None and any(current[name] != getattr(self, name) for name in fields):
+                self.token_version += 1
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
@@ -1,10 +1,18 @@
 from datetime import date
+from django.conf import settings
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
 
+from core.models import Comment, Contributor, Issue, Project
+from core.shaping import DynamicFieldsMixin, is_wanted
+from users.authentication import VersionedRefreshToken
+from users.hashing import set_password
 from users.models import User
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -12,20 +20,92 @@ class UserListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_time"]
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+# relations embarquées dans UserDetailSerializer :
+# nom -> (modèle, FK vers l'utilisateur, select_related, colonnes lues, représentation d'un élément)
+EMBEDDED_RELATIONS = {
+    "contributions": (
+        Contributor, "user", ("project",), ("id", "user_id", "project_id", "project__title"),
+        lambda contribution: {
+            "id": contribution.id, "project_id": contribution.project_id,
+            "project_title": contribution.project.title
+        },
+    ),
+    "authored_projects": (
+        Project, "author", (), ("id", "author_id", "title"),
+        lambda project: {"id": project.id, "title": project.title},
+    ),
+    "authored_issues": (
+        Issue, "author", (), ("id", "author_id", "title"),
+        lambda issue: {"id": issue.id, "title": issue.title},
+    ),
+    "assigned_issues": (
+        Issue, "assignee", (), ("id", "assignee_id", "title"),
+        lambda issue: {"id": issue.id, "title": issue.title},
+    ),
+    "authored_comments": (
+        Comment, "author", (), ("id", "author_id", "description"),
+        lambda comment: {"id": comment.id, "description": comment.description},
+    ),
+}
+
+
+def get_embed_limit():
+    return getattr(settings, "SOFTDESK_USER_EMBED_LIMIT", 10)
+
+
+def embedded_queryset(name):
+    """Queryset (non filtré) d'une relation embarquée, réduit aux colonnes affichées."""
+    model, _, select_related, only, _ = EMBEDDED_RELATIONS[name]
+    return model.objects.select_related(*select_related).only(*only)
+
+
+def embedded_item(name, obj):
+    return EMBEDDED_RELATIONS[name][4](obj)
+
+
+def with_embedded_relations(queryset, request=None):
+    """
+    Annote les compteurs de chaque relation et précharge ses `limit` premiers éléments :
+    un nombre fixe de requêtes quel que soit le volume de l'utilisateur.
+    Seules les relations demandées (?fields=) sont chargées.
+    """
+    limit = get_embed_limit()
+    annotations = {}
+    prefetches = []
+    for name, (model, fk, _, _, _) in EMBEDDED_RELATIONS.items():
+        if is_wanted(request, f"{name}_count"):
+            count = model.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(c=Count("pk"))
+            annotations[f"{name}_count"] = Coalesce(Subquery(count.values("c")), 0)
+        if is_wanted(request, name):
+            prefetches.append(Prefetch(name, queryset=embedded_queryset(name)[:limit], to_attr=f"embedded_{name}"))
+    return queryset.annotate(**annotations).prefetch_related(*prefetches)
+
+
+class UserDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
+    contributions = serializers.SerializerMethodField()
+    contributions_count = serializers.SerializerMethodField()
+    authored_projects = serializers.SerializerMethodField()
+    authored_projects_count = serializers.SerializerMethodField()
+    authored_issues = serializers.SerializerMethodField()
+    authored_issues_count = serializers.SerializerMethodField()
+    assigned_issues = serializers.SerializerMethodField()
+    assigned_issues_count = serializers.SerializerMethodField()
+    authored_comments = serializers.SerializerMethodField()
+    authored_comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
             "id", "username", "password", "birthday", "can_be_contacted",
-            "can_data_be_shared", "created_time", "contributions",
-            "authored_projects", "authored_issues", "assigned_issues", "authored_comments"
-        ]
-        read_only_fields = [
-            "id", "created_time", "contributions", "authored_projects",
-            "authored_issues", "assigned_issues", "authored_comments"
+            "can_data_be_shared", "created_time",
+            "contributions", "contributions_count",
+            "authored_projects", "authored_projects_count",
+            "authored_issues", "authored_issues_count",
+            "assigned_issues", "assigned_issues_count",
+            "authored_comments", "authored_comments_count",
         ]
+        read_only_fields = ["id", "created_time"]
 
     def validate_birthday(self, value):
         if value is None:
@@ -40,7 +120,7 @@ class UserDetailSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         pwd = validated_data.pop("password")
         user = User(**validated_data)
-        user.set_password(pwd)
+        set_password(user, pwd)
         user.save()
         return user
 
@@ -49,36 +129,54 @@ class UserDetailSerializer(serializers.ModelSerializer):
         for attr, val in validated_data.items():
             setattr(instance, attr, val)
         if pwd:
-            instance.set_password(pwd)
+            set_password(instance, pwd)
         instance.save()
         return instance
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["contributions"] = [
-            {
-                "id": contribution.id, "project_id": contribution.project.id,
-                "project_title": contribution.project.title
-            }
-            for contribution in instance.contributions.all()
-        ]
-        data["authored_projects"] = [
-            {"id": project.id, "title": project.title}
-            for project in instance.authored_projects.all()
-        ]
-        data["authored_issues"] = [
-            {"id": issue.id, "title": issue.title}
-            for issue in instance.authored_issues.all()
-        ]
-        data["assigned_issues"] = [
-            {"id": issue.id, "title": issue.title}
-            for issue in instance.assigned_issues.all()
-        ]
-        data["authored_comments"] = [
-            {"id": comment.id, "description": comment.description}
-            for comment in instance.authored_comments.all()
-        ]
-        return data
+    def _embedded(self, instance, name):
+        # préchargé par with_embedded_relations, sinon (inscription...) lu directement
+        items = getattr(instance, f"embedded_{name}", None)
+        if items is None:
+            fk = EMBEDDED_RELATIONS[name][1]
+            items = embedded_queryset(name).filter(**{fk: instance})[:get_embed_limit()]
+        return [embedded_item(name, item) for item in items]
+
+    def _count(self, instance, name):
+        count = getattr(instance, f"{name}_count", None)
+        if count is None:
+            fk = EMBEDDED_RELATIONS[name][1]
+            count = EMBEDDED_RELATIONS[name][0].objects.filter(**{fk: instance}).count()
+        return count
+
+    def get_contributions(self, instance):
+        return self._embedded(instance, "contributions")
+
+    def get_contributions_count(self, instance):
+        return self._count(instance, "contributions")
+
+    def get_authored_projects(self, instance):
+        return self._embedded(instance, "authored_projects")
+
+    def get_authored_projects_count(self, instance):
+        return self._count(instance, "authored_projects")
+
+    def get_authored_issues(self, instance):
+        return self._embedded(instance, "authored_issues")
+
+    def get_authored_issues_count(self, instance):
+        return self._count(instance, "authored_issues")
+
+    def get_assigned_issues(self, instance):
+        return self._embedded(instance, "assigned_issues")
+
+    def get_assigned_issues_count(self, instance):
+        return self._count(instance, "assigned_issues")
+
+    def get_authored_comments(self, instance):
+        return self._embedded(instance, "authored_comments")
+
+    def get_authored_comments_count(self, instance):
+        return self._count(instance, "authored_comments")
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -98,9 +196,15 @@ class RegisterSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        # hachage du mot de passe
+        # mot de passe haché dans le thread de la requête (make_password), sauf s'il l'a
+        # déjà été dans le pool par l'inscription asynchrone (ahash_password)
         pwd = validated_data.pop("password")
         user = User(**validated_data)
-        user.set_password(pwd)
+        set_password(user, pwd, encoded=self.context.get("encoded_password"))
         user.save()
         return user
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    # jetons portant le rôle et la version de l'utilisateur (cf. users.authentication)
+    token_class = VersionedRefreshToken
@@ -1 +1,96 @@
-# Create your tests here.
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from core.models import Contributor, Project
+from users import authentication
+from users.authentication import VersionedRefreshToken
+from users.models import User
+
+
+@override_settings(SOFTDESK_STATELESS_JWT={"ENABLED": True, "TIMEOUT": 60, "MAX_ENTRIES": 100})
+class StatelessJWTTests(APITestCase):
+    """
+    Mode sans état (users.authentication) : l'utilisateur n'est pas lu à chaque requête,
+    et toute modification de TOKEN_FIELDS, désactivation ou suppression révoque ses jetons.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice", "pw-Secret-123", birthday=date(1990, 1, 1))
+        cls.project = Project.objects.create(title="API", type="BE", author=cls.alice)
+        Contributor.objects.create(user=cls.alice, project=cls.project)
+
+    def setUp(self):
+        # versions mémorisées par le processus : chaque test part d'un cache vide
+        authentication._versions = None
+        self.url = reverse("project-list")
+        self.token = VersionedRefreshToken.for_user(self.alice).access_token
+
+    def get(self, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token or self.token}")
+        return self.client.get(self.url)
+
+    def assert_revoked(self, response):
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"detail": "Token has been revoked"})
+
+    def test_reads_without_user_query(self):
+        # première requête : version lue une fois, puis servie par le cache du processus
+        self.assertEqual(self.get().status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        # l'auteur des projets est joint aux lignes ; l'utilisateur authentifié n'est jamais lu
+        self.assertFalse([query["sql"] for query in queries if 'FROM "users_user"' in query["sql"]])
+
+    def test_password_change_revokes(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.alice.set_password("pw-Other-456")
+        self.alice.save()
+        self.assert_revoked(self.get())
+        # un jeton émis après le changement est accepté
+        self.assertEqual(self.get(VersionedRefreshToken.for_user(self.alice).access_token).status_code, 200)
+
+    def test_token_version_bump_revokes(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.alice.token_version += 1
+        self.alice.save(update_fields=["token_version"])
+        self.assert_revoked(self.get())
+
+    def test_role_change_revokes(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.alice.is_staff = True
+        self.alice.save()
+        self.assert_revoked(self.get())
+
+    def test_inactive_user_rejected(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.alice.is_active = False
+        self.alice.save()
+        self.assert_revoked(self.get())
+
+    def test_deleted_user_rejected(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.alice.delete()
+        self.assert_revoked(self.get())
+
+    def test_async_reads_revoked(self):
+        url = reverse("async-project-list")
+        get = async_to_sync(self.async_client.get)
+        headers = {"Authorization": f"Bearer {self.token}"}
+        self.assertEqual(get(url, headers=headers).status_code, 200)
+        self.alice.set_password("pw-Other-456")
+        self.alice.save()
+        self.assert_revoked(get(url, headers=headers))
+
+    @override_settings(SOFTDESK_STATELESS_JWT={"ENABLED": False})
+    def test_stateful_mode_checks_version(self):
+        self.alice.set_password("pw-Other-456")
+        self.alice.save()
+        self.assert_revoked(self.get())
@@ -1,26 +1,77 @@
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.generics import CreateAPIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 
-from users.serializers import UserDetailSerializer, UserListSerializer, RegisterSerializer
+from users.serializers import (
+    UserDetailSerializer, UserListSerializer, RegisterSerializer,
+    EMBEDDED_RELATIONS, embedded_queryset, embedded_item, with_embedded_relations
+)
+from users.authentication import VersionedRefreshToken
+from users.hashing import ahash_password
 from users.models import User
+from core.fast_json import FastJSONParser, FastJSONRenderer
+from core.shaping import shape_queryset
+from core.timing import TimedViewMixin
 from users.permissions import IsSelfOrSuperuserOrReadOnly
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(TimedViewMixin, ModelViewSet):
     serializer_class = UserListSerializer
     detail_serializer_class = UserDetailSerializer
     queryset = User.objects.all()
     permission_classes = [IsAuthenticated, IsSelfOrSuperuserOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = shape_queryset(queryset, self.request, ("username", "created_time"))
+        elif self.action in ("retrieve", "update", "partial_update"):
+            # relations embarquées bornées et compteurs annotés
+            queryset = with_embedded_relations(queryset, self.request)
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "list":
             return self.serializer_class
         return self.detail_serializer_class
 
+    def _embedded_list(self, name):
+        # liste complète et paginée d'une relation embarquée dans le détail de l'utilisateur
+        user = self.get_object()
+        fk = EMBEDDED_RELATIONS[name][1]
+        page = self.paginate_queryset(embedded_queryset(name).filter(**{fk: user}))
+        return self.get_paginated_response([embedded_item(name, item) for item in page])
+
+    @action(detail=True, methods=["get"])
+    def contributions(self, request, pk=None):
+        return self._embedded_list("contributions")
+
+    @action(detail=True, methods=["get"], url_path="authored-projects")
+    def authored_projects(self, request, pk=None):
+        return self._embedded_list("authored_projects")
+
+    @action(detail=True, methods=["get"], url_path="authored-issues")
+    def authored_issues(self, request, pk=None):
+        return self._embedded_list("authored_issues")
+
+    @action(detail=True, methods=["get"], url_path="assigned-issues")
+    def assigned_issues(self, request, pk=None):
+        return self._embedded_list("assigned_issues")
+
+    @action(detail=True, methods=["get"], url_path="authored-comments")
+    def authored_comments(self, request, pk=None):
+        return self._embedded_list("authored_comments")
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         user_id = instance.id
@@ -34,7 +85,17 @@ class UserViewSet(ModelViewSet):
         )
 
 
-class RegisterView(CreateAPIView):
+def registration_data(user):
+    """Corps de la réponse d'inscription : l'utilisateur et ses jetons."""
+    refresh = VersionedRefreshToken.for_user(user)
+    tokens = {
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+    }
+    return {"user": UserDetailSerializer(user).data, "tokens": tokens}
+
+
+class RegisterView(TimedViewMixin, CreateAPIView):
 
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
@@ -44,14 +105,36 @@ class RegisterView(CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        refresh = RefreshToken.for_user(user)
-        tokens = {
-            "access": str(refresh.access_token),
-            "refresh": str(refresh),
-        }
+        return Response(registration_data(user), status=status.HTTP_201_CREATED)
 
-        user_data = UserDetailSerializer(user).data
-        return Response(
-            {"user": user_data, "tokens": tokens},
-            status=status.HTTP_201_CREATED
+
+def json_response(data, status_code):
+    return HttpResponse(FastJSONRenderer().render(data), content_type="application/json", status=status_code)
+
+
+@csrf_exempt
+@require_POST
+async def register_async(request):
+    """
+    Inscription asynchrone (corps JSON) : même réponse que RegisterView, le mot de passe
+    étant haché dans le pool de users.hashing sans occuper de worker pendant le hachage.
+    """
+    if request.content_type != "application/json":
+        return json_response(
+            {"detail": f'Unsupported media type "{request.content_type}" in request.'},
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
         )
+    try:
+        data = FastJSONParser().parse(BytesIO(request.body))
+    except ParseError as exc:
+        return json_response({"detail": exc.detail}, status.HTTP_400_BAD_REQUEST)
+
+    context = {}
+    serializer = RegisterSerializer(data=data, context=context)
+    # l'unicité du nom d'utilisateur est vérifiée en base
+    if not await sync_to_async(serializer.is_valid)():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    context["encoded_password"] = await ahash_password(serializer.validated_data["password"])
+    body = await sync_to_async(lambda: registration_data(serializer.save()))()
+    return json_response(body, status.HTTP_201_CREATED)